@@ -8,7 +8,10 @@ from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import json
 import asyncio
-from utils.account_general_generator import generate_account_general_svg
+from utils.endpoints import parse_account_general_params, resolve_username
+from utils.responses import response_started, send_svg
+from utils.background import drain_background_tasks
+from utils.account_general_generator import render_account_general_svg
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -17,8 +20,8 @@ class handler(BaseHTTPRequestHandler):
             parsed_url = urlparse(self.path)
             query_params = parse_qs(parsed_url.query)
             
-            # Get username from environment
-            username = os.getenv('GITHUB_USERNAME')
+            # Get username from environment (or the `username` parameter in multi-user mode)
+            username = resolve_username(query_params)
             if not username:
                 self.send_response(500)
                 self.send_header('Content-type', 'application/json')
@@ -30,69 +33,29 @@ class handler(BaseHTTPRequestHandler):
                 }).encode())
                 return
             
-            # Available slot options
-            slot_options = [
-                'stars', 'commits_total', 'commits_current_year', 'commits_6_months', 'pull_requests', 
-                'code_reviews', 'issues', 'external_contributions'
-            ]
-            
-            # Available icon options  
-            icon_options = [
-                'user', 'github', 'streak', 'user+github', 
-                'user+streak', 'github+streak'
-            ]
-            
-            # Get parameters with defaults
-            theme = query_params.get('theme', ['dark'])[0]
-            icon = query_params.get('icon', ['user'])[0]
-            animation_time = float(query_params.get('animation_time', ['8'])[0])
-            slot1 = query_params.get('slot1', [None])[0]
-            slot2 = query_params.get('slot2', [None])[0]
-            slot3 = query_params.get('slot3', [None])[0]
-            slot4 = query_params.get('slot4', [None])[0]
-            slot5 = query_params.get('slot5', [None])[0]
-            
-            # Validate parameters
-            if theme not in ['light', 'dark']:
-                raise ValueError(f"Invalid theme: {theme}")
-            
-            if icon not in icon_options:
-                raise ValueError(f"Invalid icon: {icon}")
-            
-            if animation_time < 1 or animation_time > 30:
-                raise ValueError(f"Invalid animation_time: {animation_time}. Must be between 1 and 30 seconds.")
-            
-            for slot_name, slot_value in [('slot1', slot1), ('slot2', slot2), ('slot3', slot3), ('slot4', slot4), ('slot5', slot5)]:
-                if slot_value is not None and slot_value not in slot_options:
-                    raise ValueError(f"Invalid {slot_name}: {slot_value}")
-            
+            # Parse and validate parameters
+            params = parse_account_general_params(query_params)
+
             # Generate SVG
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            
 
-            # Combine slot parameters into a list (preserve None for missing slots)
-            slots = [slot1, slot2, slot3, slot4, slot5]
-
-            svg_content = loop.run_until_complete(generate_account_general_svg(
+            rendered_svg = loop.run_until_complete(render_account_general_svg(
                 username=username,
-                theme=theme,
-                icon=icon,
-                animation_time=animation_time,
-                slots=slots
+                **params
             ))
             
-            loop.close()
-            
             # Return SVG with proper headers
-            self.send_response(200)
-            self.send_header('Content-type', 'image/svg+xml')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-            self.end_headers()
-            self.wfile.write(svg_content.encode('utf-8'))
+            send_svg(self, rendered_svg, 'account-general')
+
+            # Finish background work (refreshing stale data served above, probing GitHub) before the loop is closed
+            loop.run_until_complete(drain_background_tasks())
+            loop.close()
             
         except Exception as e:
+            if response_started(self):
+                print(f"Error after the account-general response started: {e}")
+                return
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
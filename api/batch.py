@@ -0,0 +1,85 @@
+import sys
+import os
+
+# Add the current directory to Python path for local imports
+sys.path.append(os.path.dirname(__file__))
+
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+import asyncio
+from utils.batch import parse_batch, render_batch, to_query_params
+from utils.endpoints import resolve_username
+from utils.responses import prepare_json_response
+from utils.background import drain_background_tasks
+
+# Request bodies above this size are rejected
+MAX_BODY_BYTES = 64 * 1024
+
+class handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        # Card list as JSON body: {"cards": [...]}
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self.send_json({"error": "Invalid request parameters", "message": "Invalid Content-Length"}, 400)
+            return
+        if length > MAX_BODY_BYTES:
+            self.send_json({"error": "Invalid request parameters", "message": "Request body too large"}, 413)
+            return
+        body = self.rfile.read(length) if length else b''
+        self.handle_batch(lambda: json.loads(body or b'null'))
+
+    def do_GET(self):
+        # Card list as JSON in the `cards` query parameter: ?cards=[...]
+        query_params = parse_qs(urlparse(self.path).query)
+        self.handle_batch(lambda: {
+            "cards": json.loads(query_params.get('cards', ['null'])[0]),
+            "username": query_params.get('username', [None])[0]
+        })
+
+    def handle_batch(self, load_payload):
+        try:
+            payload = load_payload()
+            cards = parse_batch(payload)
+            # Get username from environment (or the batch's `username` in multi-user mode)
+            username = resolve_username(to_query_params({'username': payload.get('username')}))
+        except Exception as e:
+            self.send_json({"error": "Invalid request parameters", "message": str(e)}, 400)
+            return
+
+        if not username:
+            self.send_json({
+                "error": "GitHub username not configured",
+                "message": "GITHUB_USERNAME environment variable is required"
+            }, 500)
+            return
+
+        # Render all cards on one event loop, sharing fetched data
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        results = loop.run_until_complete(render_batch(cards, username, self.headers.get('User-Agent', '')))
+
+        self.send_json({"cards": results})
+
+        # Finish background work (refreshing stale data served above, probing GitHub) before the loop is closed
+        loop.run_until_complete(drain_background_tasks())
+        loop.close()
+
+    def send_json(self, payload: dict, status: int = 200):
+        status, headers, body = prepare_json_response(self.headers, payload, status)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -1 +1,5 @@
 # Utils Package
+from .env import load_local_env
+
+# Load .env before any utils module reads its settings at import time
+load_local_env()
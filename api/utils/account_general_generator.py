@@ -10,18 +10,26 @@ This module provides functionality to:
 """
 
 import asyncio
-import aiohttp
 import base64
+import math
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any
-from dotenv import load_dotenv
+from typing import Dict, List, Optional, Any, Tuple
+from .contribution_calendar import calculate_streaks, recent_days
+from .fetch_scope import scope_hint
+from .github_client import graphql_request, iter_pages, token_pool
+from .http_session import client_session
+from .query_builder import build_user_query
+from .render_cache import RenderedSVG, card_fingerprint, fingerprint, render_cache
+from .svg_output import encode_svg
+from .user_cache import cached_fetch
 
-# Load environment variables
-load_dotenv()
+# Highest estimated cost (see estimate_query_cost) of one all-time stats query; costlier
+# plans are split into smaller queries sent in parallel to avoid GitHub timeouts
+QUERY_MAX_COST = float(os.getenv('QUERY_MAX_COST', 7))
 
-# Constants
-GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+# Log the estimated cost of the all-time stats queries next to the cost GitHub reports for them
+QUERY_COST_LOG = os.getenv('QUERY_COST_LOG', 'false').lower() == 'true'
 
 # Theme configurations for light and dark modes
 THEMES = {
@@ -45,55 +53,109 @@ THEMES = {
     }
 }
 
-# Stat type configurations with labels and descriptions
+# Stat type configurations with labels and descriptions ({year} is filled in per request, see stat_label);
+# query_cost is the estimated cost, in GraphQL points, of one alias of the stat in the all-time query:
+# one per year of contributions it scans (0 for stats that aren't fetched there)
 STAT_CONFIGS = {
     'commits_6_months': {
         'label': 'Commits (6 months)',
         'description': 'Commits in the last 6 months',
-        'expensive': False
+        'query_cost': 0.5
     },
     'stars': {
         'label': 'Total Stars',
         'description': 'Total stars across all repositories',
-        'expensive': False
+        'query_cost': 0
     },
     'commits_total': {
         'label': 'Total Commits',
         'description': 'All-time commits (requires year-by-year API calls)',
-        'expensive': True
+        'query_cost': 1
     },
     'commits_current_year': {
-        'label': f'Commits ({datetime.now().year})',
+        'label': 'Commits ({year})',
         'description': 'Commits in current year',
-        'expensive': False
+        'query_cost': 1
     },
     'pull_requests': {
         'label': 'Pull Requests',
         'description': 'Total pull requests created',
-        'expensive': False
+        'query_cost': 0
     },
     'code_reviews': {
         'label': 'Code Reviews',
         'description': 'All-time pull request reviews (requires year-by-year API calls)',
-        'expensive': True
+        'query_cost': 1
     },
     'issues': {
         'label': 'Issues',
         'description': 'Total issues created',
-        'expensive': False
+        'query_cost': 0
     },
     'external_contributions': {
         'label': 'Contributed to',
         'description': 'Repositories contributed to',
-        'expensive': False
+        'query_cost': 0
     },
     'streak': {
         'label': 'Current Streak',
-        'description': 'Current contribution streak (requires calendar processing)',
-        'expensive': True
+        'description': 'Current contribution streak (from the contribution calendar)',
+        'query_cost': 0
     }
 }
 
+# Selections of the basic user query for the stats that need one (name, avatar and
+# creation date are always selected)
+BASIC_STAT_SELECTIONS = {
+    'stars': 'repositories(ownerAffiliations: OWNER, first: 100) { totalCount pageInfo { hasNextPage endCursor } nodes { stargazerCount } }',
+    'external_contributions': 'repositoriesContributedTo(first: 1, contributionTypes: [COMMIT, ISSUE, PULL_REQUEST, REPOSITORY]) { totalCount }',
+    'pull_requests': 'pullRequests(first: 1) { totalCount }',
+    'issues': 'issues(first: 1) { totalCount }',
+}
+
+# Further pages of the repositories, for accounts with more than 100
+STARS_PAGE_SELECTION = ('repositories(ownerAffiliations: OWNER, first: 100, after: $cursor) '
+                        '{ pageInfo { hasNextPage endCursor } nodes { stargazerCount } }')
+
+def estimate_query_cost(stats: List[str]) -> float:
+    """
+    Estimated cost, in GraphQL points, of one all-time stats query holding an alias of each of the given stats.
+
+    Every query costs at least one point; each contributionsCollection alias adds the
+    query_cost of its stat in STAT_CONFIGS, as it scans the contributions of its period
+    (a year per alias of the year-by-year stats). Costly queries are the ones that time out.
+    Set QUERY_COST_LOG to compare the estimates with the cost GitHub reports.
+    """
+    return 1 + sum(STAT_CONFIGS[stat]['query_cost'] for stat in stats)
+
+def plan_alltime_queries(parts: List[Tuple[str, str]], max_cost: float = None) -> List[List[str]]:
+    """
+    Group the (stat type, alias) parts of the all-time data into the queries to send.
+
+    A single aliased query is sent while its estimated cost stays within max_cost, as it
+    is the cheapest plan; otherwise the aliases are spread over the fewest queries that
+    each stay within it (every split query adds its own base point), balanced by cost.
+    """
+    max_cost = max_cost or QUERY_MAX_COST
+    if not parts:
+        return []
+    if estimate_query_cost([stat for stat, _ in parts]) <= max_cost:
+        return [[alias for _, alias in parts]]
+
+    ordered = sorted(parts, key=lambda part: -STAT_CONFIGS[part[0]]['query_cost'])
+    alias_costs = sum(STAT_CONFIGS[stat]['query_cost'] for stat, _ in parts)
+    count = max(2, math.ceil(alias_costs / max(max_cost - 1, 1)))
+    while True:
+        # Costliest aliases first, each into the cheapest query so far
+        chunks = [([], []) for _ in range(count)]
+        for stat, alias in ordered:
+            stats, aliases = min(chunks, key=lambda chunk: estimate_query_cost(chunk[0]))
+            stats.append(stat)
+            aliases.append(alias)
+        if count >= len(parts) or all(estimate_query_cost(stats) <= max_cost for stats, _ in chunks):
+            return [aliases for _, aliases in chunks if aliases]
+        count += 1
+
 class GitHubAccountStatsAPI:
     """
     GitHub API client for fetching comprehensive account statistics.
@@ -103,33 +165,23 @@ class GitHubAccountStatsAPI:
     """
     
     def __init__(self):
-        self.token = os.getenv('GITHUB_TOKEN')
-        if not self.token:
+        if not token_pool().budgets:
             raise ValueError("GITHUB_TOKEN environment variable is required")
-        
-        self.headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json',
-        }
 
-    async def _make_graphql_request(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
-        """Make a GraphQL request to GitHub API with error handling."""
-        payload = {"query": query, "variables": variables}
+    async def _make_graphql_request(self, query: str, variables: Dict[str, Any],
+                                    costs: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Make a GraphQL request to GitHub API with error handling, adding the reported point cost to costs."""
+        data = await graphql_request(query, variables)
+        if costs is not None:
+            costs.append(data.get('rateLimit', {}).get('cost') or 0)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(GITHUB_GRAPHQL_URL, headers=self.headers, json=payload) as response:
-                if response.status != 200:
-                    raise Exception(f"GraphQL API error: {response.status}")
-                
-                data = await response.json()
-                
-                if 'errors' in data:
-                    error_msg = data['errors'][0].get('message', 'GraphQL error')
-                    if 'NOT_FOUND' in str(data['errors'][0]):
-                        raise Exception(f"User not found")
-                    raise Exception(f"GraphQL error: {error_msg}")
-                
-                return data['data']
+        if 'errors' in data:
+            error_msg = data['errors'][0].get('message', 'GraphQL error')
+            if 'NOT_FOUND' in str(data['errors'][0]):
+                raise Exception(f"User not found")
+            raise Exception(f"GraphQL error: {error_msg}")
+        
+        return data['data']
 
     async def fetch_avatar_as_data_uri(self, avatar_url: str) -> Optional[str]:
         """Fetch avatar image and convert to base64 data URI for embedding."""
@@ -137,7 +189,7 @@ class GitHubAccountStatsAPI:
             return None
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with client_session() as session:
                 async with session.get(avatar_url) as response:
                     if response.status == 200:
                         image_data = await response.read()
@@ -148,126 +200,117 @@ class GitHubAccountStatsAPI:
         
         return None
 
+    async def _count_stars(self, username: str, first_page: Optional[Dict[str, Any]]) -> int:
+        """Sum the stars of all repositories, starting from the first page."""
+        if first_page is None:
+            return 0
+        query = build_user_query('userRepositoryStars', (STARS_PAGE_SELECTION,))
+        
+        async def fetch_page(cursor: str) -> Dict[str, Any]:
+            page = await self._make_graphql_request(query, {"login": username, "cursor": cursor})
+            return page['user']['repositories']
+        
+        # Pages are summed as they arrive, so only one page is held at a time
+        total_stars = 0
+        async for page in iter_pages(fetch_page, first_page):
+            total_stars += sum(repo['stargazerCount'] for repo in page['nodes'])
+        return total_stars
+
     async def fetch_account_stats(self, username: str, needed_stats: set = None) -> Dict[str, Any]:
         """
-        Fetch comprehensive account statistics using exactly TWO GraphQL queries:
-        1. Basic user data (user, repos, PRs, issues, repositories contributed to)
-        2. All-time data (commits, code reviews, contribution calendar for streak)
+        Fetch comprehensive account statistics using two stages of GraphQL queries:
+        1. Basic user data (user, plus repos, PRs, issues or repositories contributed to
+           for the stats that need them)
+        2. All-time data (commits, code reviews), as one query or several parallel
+           ones (see plan_alltime_queries), and for the streak the contribution
+           calendar shared with the contributions graph (see recent_days)
         """
         if needed_stats is None:
             needed_stats = set()
         
-        # FIRST QUERY: Basic user information
-        basic_query = """
-        query userBasicInfo($login: String!) {
-          user(login: $login) {
-            login
-            name
-            avatarUrl
-            createdAt
-            followers { totalCount }
-            following { totalCount }
-            repositories(ownerAffiliations: OWNER, first: 100) {
-              totalCount
-              nodes {
-                stargazers { totalCount }
-                forkCount
-                isPrivate
-                primaryLanguage { name }
-              }
-            }
-            repositoriesContributedTo(first: 100, contributionTypes: [COMMIT, ISSUE, PULL_REQUEST, REPOSITORY]) {
-              totalCount
-            }
-            pullRequests(first: 1) { totalCount }
-            issues(first: 1) { totalCount }
-          }
-        }
-        """
+        # FIRST QUERY: Basic user information, with the connections of the needed stats only
+        basic_query = build_user_query('userBasicInfo', tuple(
+            ['login', 'name', 'avatarUrl', 'createdAt'] +
+            [selection for stat, selection in BASIC_STAT_SELECTIONS.items() if stat in needed_stats]
+        ))
         
         # Execute first query
         basic_data = await self._make_graphql_request(basic_query, {"login": username})
         user_data = basic_data['user']
         
-        # Extract creation date for second query
-        created_at = user_data['createdAt']
-        creation_date = created_at.split('T')[0] + 'T00:00:00Z'  # Account creation date
+        # The first page of repositories for the stars; further pages are fetched with the second stage
+        first_stars_page = user_data.pop('repositories', None)
         
         # Get current date and year ranges for second query
         today = datetime.now().replace(tzinfo=timezone.utc)
-        current_date = today.isoformat()
-        
-        # Current year start for commits_year stat
         current_year = datetime.now().year
-        current_year_start = datetime(current_year, 1, 1).replace(tzinfo=timezone.utc).isoformat()
-        
-        # For contribution calendar (one year ago to today)
-        one_year_ago = today - timedelta(days=365)
-        year_start = one_year_ago.isoformat()
+        variables = {
+            "login": username,
+            # Current year start for commits_year stat
+            "currentYearStart": datetime(current_year, 1, 1).replace(tzinfo=timezone.utc).isoformat(),
+            "sixMonthsAgo": (today - timedelta(days=183)).isoformat(),
+        }
         
-        # Build second query parts based on needed stats
+        # Build second query parts based on needed stats, as (stat type, alias) pairs
         second_query_parts = []
         
         # Always include current year commits if commits_current_year is needed
         if 'commits_current_year' in needed_stats:
-            second_query_parts.append(f"""currentYearCommits: contributionsCollection(from: "{current_year_start}") {{
-              totalCommitContributions
-            }}""")
+            second_query_parts.append(('commits_current_year', """currentYearCommits: contributionsCollection(from: $currentYearStart) {
+  totalCommitContributions
+}"""))
         # Add last 6 months commits if needed
         if 'commits_6_months' in needed_stats:
-            six_months_ago = (today - timedelta(days=183)).isoformat()
-            second_query_parts.append(f"""last6MonthsCommits: contributionsCollection(from: "{six_months_ago}") {{
-              totalCommitContributions
-            }}""")
+            second_query_parts.append(('commits_6_months', """last6MonthsCommits: contributionsCollection(from: $sixMonthsAgo) {
+  totalCommitContributions
+}"""))
         
         # Add all-time data if needed (year by year chunks)
         if 'commits_total' in needed_stats or 'code_reviews' in needed_stats:
             # Extract creation year from creation date
-            creation_year = int(created_at[:4])
-            current_year = datetime.now().year
+            creation_year = int(user_data['createdAt'][:4])
+            
+            year_parts = []
+            if 'commits_total' in needed_stats:
+                year_parts.append("totalCommitContributions")
+            if 'code_reviews' in needed_stats:
+                year_parts.append("totalPullRequestReviewContributions")
             
             # Build year-by-year queries for all-time data
+            year_stat = 'commits_total' if 'commits_total' in needed_stats else 'code_reviews'
             for year in range(creation_year, current_year + 1):
-                year_from = f"{year}-01-01T00:00:00Z"
-                year_to = f"{year}-12-31T23:59:59Z"
-                
-                year_parts = []
-                if 'commits_total' in needed_stats:
-                    year_parts.append("totalCommitContributions")
-                if 'code_reviews' in needed_stats:
-                    year_parts.append("totalPullRequestReviewContributions")
-                
-                second_query_parts.append(f"""year{year}Data: contributionsCollection(from: "{year_from}", to: "{year_to}") {{
-                  {chr(10).join(['                  ' + part for part in year_parts])}
-                }}""")
+                second_query_parts.append((year_stat, f"""year{year}Data: contributionsCollection(from: "{year}-01-01T00:00:00Z", to: "{year}-12-31T23:59:59Z") {{
+  {' '.join(year_parts)}
+}}"""))
+        
+        # SECOND QUERY: All-time and current year data (only if needed), split by the planner
+        plan = plan_alltime_queries(second_query_parts)
+        alltime_queries = [build_user_query('userAllTimeData', tuple(parts)) for parts in plan]
+        reported_costs = []
         
-        # Add contribution calendar for streak if needed
+        # Execute the second stage queries, the further star pages and the streak's calendar in parallel
+        fetches = [self._count_stars(username, first_stars_page)]
+        fetches += [self._make_graphql_request(query, {
+            name: value for name, value in variables.items() if f'${name}' in query
+        }, reported_costs) for query in alltime_queries]
         if 'streak' in needed_stats:
-            second_query_parts.append(f"""contributionCalendar: contributionsCollection(from: "{year_start}") {{
-              contributionCalendar {{
-                totalContributions
-                weeks {{
-                  contributionDays {{
-                    contributionCount
-                    date
-                  }}
-                }}
-              }}
-            }}""")
+            fetches.append(recent_days(username))
+        total_stars, *results = await asyncio.gather(*fetches)
+        calendar = results.pop() if 'streak' in needed_stats else None
+        if first_stars_page is not None:
+            user_data['totalStars'] = total_stars
         
-        # SECOND QUERY: All-time and current year data (only if needed)
-        if second_query_parts:
-            alltime_query = f"""
-            query userAllTimeData($login: String!) {{
-              user(login: $login) {{
-                {chr(10).join(['                ' + part for part in second_query_parts])}
-              }}
-            }}
-            """
+        if plan:
+            if QUERY_COST_LOG:
+                stat_of = {alias: stat for stat, alias in second_query_parts}
+                predicted = sum(estimate_query_cost([stat_of[alias] for alias in parts]) for parts in plan)
+                print(f"All-time stats cost for {username}: predicted {predicted:g}, "
+                      f"reported {sum(reported_costs)} ({len(plan)} queries)")
             
-            # Execute second query
-            alltime_data = await self._make_graphql_request(alltime_query, {"login": username})
-            alltime_user = alltime_data['user']
+            # Merge the aliases of the second stage queries
+            alltime_user = {}
+            for alltime_data in results:
+                alltime_user.update(alltime_data['user'])
             
             # Add current year commits to user_data
             if 'commits_current_year' in needed_stats and 'currentYearCommits' in alltime_user:
@@ -296,14 +339,20 @@ class GitHubAccountStatsAPI:
                         if year_key in alltime_user and 'totalPullRequestReviewContributions' in alltime_user[year_key]:
                             total_reviews += alltime_user[year_key]['totalPullRequestReviewContributions']
                     user_data['totalCodeReviews'] = total_reviews
-            
-            # Add streak data
-            if 'streak' in needed_stats and 'contributionCalendar' in alltime_user:
-                user_data['contributionCalendar'] = alltime_user['contributionCalendar']['contributionCalendar']
-                user_data['currentStreak'] = await calculate_streak(user_data['contributionCalendar'])
+
+        # Add streak data (a streak older than the calendar continues into the years before it;
+        # the longest streak only covers the calendar's year, see calculate_streaks)
+        if calendar is not None:
+            user_data['currentStreak'], user_data['longestStreakInWindow'] = await calculate_streaks(
+                username, calendar, int(user_data['createdAt'][:4]))
         
         return user_data
 
+def stat_label(stat_type: str) -> str:
+    """Display label for a stat type, resolved at render time so it follows the current year"""
+    label = STAT_CONFIGS.get(stat_type, {}).get('label', stat_type.replace('_', ' ').title())
+    return label.format(year=datetime.now().year)
+
 def calculate_basic_stats(user_data: Dict[str, Any]) -> Dict[str, int]:
     """
     Calculate all statistics from consolidated user data.
@@ -314,10 +363,9 @@ def calculate_basic_stats(user_data: Dict[str, Any]) -> Dict[str, int]:
     """
     stats = {}
     
-    # Total stars across all repositories
-    total_stars = sum(repo['stargazers']['totalCount'] 
-                     for repo in user_data['repositories']['nodes'])
-    stats['stars'] = total_stars
+    # Total stars across all repositories (if requested in the first query)
+    if 'totalStars' in user_data:
+        stats['stars'] = user_data['totalStars']
     
     # Total commits (if available from second query)
     if 'totalCommits' in user_data:
@@ -344,8 +392,9 @@ def calculate_basic_stats(user_data: Dict[str, Any]) -> Dict[str, int]:
     # Issues (use all-time data from issues field)
     stats['issues'] = user_data.get('issues', {}).get('totalCount', 0)
     
-    # External contributions (repositories contributed to)
-    stats['external_contributions'] = user_data['repositoriesContributedTo']['totalCount']
+    # External contributions (repositories contributed to, if requested in the first query)
+    if 'repositoriesContributedTo' in user_data:
+        stats['external_contributions'] = user_data['repositoriesContributedTo']['totalCount']
     
     # Current streak (if available from second query)
     if 'currentStreak' in user_data:
@@ -353,45 +402,6 @@ def calculate_basic_stats(user_data: Dict[str, Any]) -> Dict[str, int]:
     
     return stats
 
-
-async def calculate_streak(contributions_calendar: Dict) -> int:
-    """
-    Calculate current contribution streak from calendar data.
-
-    Start from yesterday and count backwards, then add 1 if today has contributions.
-    This approach is more accurate as it doesn't include today's incomplete day in the base streak.
-    """
-    weeks = contributions_calendar.get('weeks', [])
-    if not weeks:
-        return 0
-    
-    # Flatten all days and sort by date (newest first)
-    all_days = []
-    for week in weeks:
-        for day in week.get('contributionDays', []):
-            all_days.append(day)
-    
-    all_days.sort(key=lambda x: x['date'], reverse=True)
-    
-    today = datetime.now().date()
-    
-    # Start streak calculation from yesterday, going backwards
-    streak = 0
-    
-    for day in all_days:
-        day_date = datetime.fromisoformat(day['date'].replace('Z', '+00:00')).date()
-        
-        if day_date == today:
-            # If today has contributions, count it as part of the streak
-            if day['contributionCount'] > 0:
-                streak += 1
-        else:
-            # If we hit a day without contributions, stop counting
-            if day['contributionCount'] == 0:
-                break
-            streak += 1
-    return streak       
-
 def format_number(num: int) -> str:
     """Format numbers for display (e.g., 1000 -> 1k, 1500000 -> 1.5M)."""
     if num >= 1000000:
@@ -401,12 +411,31 @@ def format_number(num: int) -> str:
     else:
         return str(num)
 
-async def generate_icon_svg(icon_type: str, username: str, theme: str, x: int, y: int, 
-                           avatar_url: str = None, size: int = 80, streak_value: int = 0) -> str:
+async def fetch_avatar_data_uri(username: str, avatar_url: Optional[str]) -> Optional[str]:
+    """Avatar as data URI for the 'user' icon, or None (initials fallback) when it can't be fetched"""
+    if not avatar_url:
+        return None
+    api = GitHubAccountStatsAPI()
+
+    async def fetch() -> str:
+        data_uri = await api.fetch_avatar_as_data_uri(avatar_url)
+        if data_uri is None:
+            # Raised rather than returned, so that a failed fetch isn't cached
+            raise Exception("Avatar unavailable")
+        return data_uri
+
+    try:
+        return await cached_fetch(username, ('avatar', avatar_url), fetch)
+    except Exception:
+        return None
+
+def build_icon_svg(icon_type: str, username: str, theme: str, x: int, y: int, 
+                   avatar_data_uri: str = None, size: int = 80, streak_value: int = 0) -> str:
     """
     Generate SVG for different icon types including user avatar, GitHub logo, and streak.
     
-    Supports various icon types with consistent sizing and positioning.
+    Supports various icon types with consistent sizing and positioning. The avatar
+    is passed in already fetched (see fetch_avatar_data_uri).
     """
     colors = THEMES[theme]
     radius = size // 2 - 5
@@ -423,11 +452,7 @@ async def generate_icon_svg(icon_type: str, username: str, theme: str, x: int, y
     
     elif icon_type == "user":
         # User avatar with fallback
-        api = GitHubAccountStatsAPI()
-        try:
-            data_uri = await api.fetch_avatar_as_data_uri(avatar_url) if avatar_url else None
-        except Exception:
-            data_uri = None
+        data_uri = avatar_data_uri
         
         if data_uri:
             return f'''<g transform="translate({x}, {y})">
@@ -478,14 +503,20 @@ async def generate_icon_svg(icon_type: str, username: str, theme: str, x: int, y
     
     return ""  # Unknown icon type
 
+async def generate_icon_svg(icon_type: str, username: str, theme: str, x: int, y: int, 
+                           avatar_url: str = None, size: int = 80, streak_value: int = 0) -> str:
+    """Fetch the avatar if the icon shows it, then build the icon SVG"""
+    data_uri = await fetch_avatar_data_uri(username, avatar_url) if icon_type == "user" else None
+    return build_icon_svg(icon_type, username, theme, x, y, data_uri, size, streak_value)
 
-async def create_rotating_icon_svg(icon1: str, icon2: str, username: str, theme: str, 
-                                 x: int, y: int, avatar_url: str = None, size: int = 80, 
-                                 streak_value: int = 0, animation_time: float = 8) -> str:
+
+def build_rotating_icon_svg(icon1: str, icon2: str, username: str, theme: str, 
+                            x: int, y: int, avatar_data_uri: str = None, size: int = 80, 
+                            streak_value: int = 0, animation_time: float = 8) -> str:
     """Create a rotating coin-like icon with two sides (Y-axis flip animation)."""
     # Generate both icon sides with proper streak value
-    icon1_content = await generate_icon_svg(icon1, username, theme, 0, 0, avatar_url, size, streak_value)
-    icon2_content = await generate_icon_svg(icon2, username, theme, 0, 0, avatar_url, size, streak_value)
+    icon1_content = build_icon_svg(icon1, username, theme, 0, 0, avatar_data_uri, size, streak_value)
+    icon2_content = build_icon_svg(icon2, username, theme, 0, 0, avatar_data_uri, size, streak_value)
     
     return f'''<g transform="translate({x}, {y})">
         <g class="coin-container">
@@ -522,6 +553,13 @@ async def create_rotating_icon_svg(icon1: str, icon2: str, username: str, theme:
         }}
     </style>'''
 
+async def create_rotating_icon_svg(icon1: str, icon2: str, username: str, theme: str, 
+                                 x: int, y: int, avatar_url: str = None, size: int = 80, 
+                                 streak_value: int = 0, animation_time: float = 8) -> str:
+    """Fetch the avatar if either side shows it, then build the rotating icon SVG"""
+    data_uri = await fetch_avatar_data_uri(username, avatar_url) if "user" in (icon1, icon2) else None
+    return build_rotating_icon_svg(icon1, icon2, username, theme, x, y, data_uri, size, streak_value, animation_time)
+
 def get_stat_icon_svg(stat_type: str, theme: str) -> str:
     """Generate SVG icons for different stat types (GitHub-style icons)."""
     colors = THEMES[theme]
@@ -615,53 +653,32 @@ def create_account_general_svg(
         {icon_svg}
     </svg>'''
 
-async def generate_account_general_svg(
+def layout_account_general_svg(
     username: str,
-    icon: str = "user",
-    slots: List[str] = None,
+    user_data: Dict[str, Any],
+    stats: Dict[str, int],
+    icon: str,
+    slots: List[str],
     theme: str = "dark",
-    animation_time: float = 8
+    animation_time: float = 8,
+    avatar_data_uri: Optional[str] = None
 ) -> str:
     """
-    Generate account general stats SVG with optimized single-query performance.
+    Lay out the account general card from already fetched data (no I/O).
     
     Args:
         username: GitHub username
+        user_data: Fetched account data (name)
+        stats: Stats from calculate_basic_stats()
         icon: Icon type ('user', 'github', 'streak', 'user+github', etc.)
-        slots: List of stats to display (max 5)
+        slots: Exactly 5 slots, None for empty ones
         theme: Theme ('dark' or 'light')
-        animation_duration: Duration of icon animation in seconds (default: 8)
-    
-    Returns:
-        SVG string with user stats and icon
+        animation_time: Duration of icon animation in seconds
+        avatar_data_uri: Avatar for the 'user' icon (see fetch_avatar_data_uri)
     """
-    # Set default slots if none provided
-    if slots is None:
-        slots = ['stars', 'commits_total', 'commits_current_year', 'pull_requests', 'issues']
-    
-    # Ensure exactly 5 slots, padding with None if needed
-    while len(slots) < 5:
-        slots.append(None)
-    slots = slots[:5]
-    
-    # Fixed card dimensions for consistent layout
-    width, height = 400, 200
+    width = 400
     colors = THEMES[theme]
     
-    # Determine which stats are needed
-    needed_stats = {slot for slot in slots if slot is not None}
-    
-    # Check if streak is needed for icon display
-    if 'streak' in icon or '+streak' in icon:
-        needed_stats.add('streak')
-    
-    # Initialize API and fetch ALL data in one consolidated query
-    api = GitHubAccountStatsAPI()
-    user_data = await api.fetch_account_stats(username, needed_stats)
-    
-    # Calculate all stats from the consolidated data
-    stats = calculate_basic_stats(user_data)
-    
     # Layout positioning
     padding = 20
     title_height = 35
@@ -677,18 +694,17 @@ async def generate_account_general_svg(
     icon_y = third_row_y - (icon_size // 2) + 5
     
     # Generate icon SVG
-    avatar_url = user_data.get('avatarUrl')
     streak_value = stats.get('streak', 0)
     
     if '+' in icon:
         # Rotating icon
         icon1, icon2 = icon.split('+')
-        icon_svg = await create_rotating_icon_svg(
-            icon1, icon2, username, theme, icon_x, icon_y, avatar_url, icon_size, streak_value, animation_time)
+        icon_svg = build_rotating_icon_svg(
+            icon1, icon2, username, theme, icon_x, icon_y, avatar_data_uri, icon_size, streak_value, animation_time)
     else:
         # Single icon
-        icon_svg = await generate_icon_svg(
-            icon, username, theme, icon_x, icon_y, avatar_url, icon_size, streak_value)
+        icon_svg = build_icon_svg(
+            icon, username, theme, icon_x, icon_y, avatar_data_uri, icon_size, streak_value)
     
     # Create stat items
     stat_items = []
@@ -699,7 +715,7 @@ async def generate_account_general_svg(
             continue
         
         value = stats.get(slot, 0)
-        label = STAT_CONFIGS.get(slot, {}).get('label', slot.replace('_', ' ').title())
+        label = stat_label(slot)
         formatted_value = format_number(value)
         
         x = stats_x
@@ -708,3 +724,111 @@ async def generate_account_general_svg(
         stat_items.append(create_stat_item_svg(label, formatted_value, slot, x, y, theme, stats_width))
     
     return create_account_general_svg(username, user_data, icon_svg, stat_items, title_x, colors)
+
+def needed_account_stats(slots: List[str], icon: str) -> set:
+    """Stats that have to be fetched for the given slots and icon"""
+    needed_stats = {slot for slot in slots if slot is not None}
+    
+    # Check if streak is needed for icon display
+    if 'streak' in icon or '+streak' in icon:
+        needed_stats.add('streak')
+    return needed_stats
+
+async def render_account_general_svg(
+    username: str,
+    icon: str = "user",
+    slots: List[str] = None,
+    theme: str = "dark",
+    animation_time: float = 8
+) -> RenderedSVG:
+    """
+    Generate the encoded account general stats SVG, reusing cached output when data and parameters are unchanged.
+    When fetching fails, the card last served with the same parameters is returned if there is one.
+    
+    Args:
+        username: GitHub username
+        icon: Icon type ('user', 'github', 'streak', 'user+github', etc.)
+        slots: List of stats to display (max 5)
+        theme: Theme ('dark' or 'light')
+        animation_duration: Duration of icon animation in seconds (default: 8)
+    
+    Returns:
+        RenderedSVG with user stats and icon
+    """
+    # Set default slots if none provided
+    if slots is None:
+        slots = ['stars', 'commits_total', 'commits_current_year', 'pull_requests', 'issues']
+    
+    # Ensure exactly 5 slots, padding with None if needed
+    while len(slots) < 5:
+        slots.append(None)
+    slots = slots[:5]
+    
+    # Determine which stats are needed (in a batch, the union over all account cards, fetched once)
+    needed_stats = needed_account_stats(slots, icon) | scope_hint('account_stats', set())
+    
+    card = card_fingerprint('account-general', username, {
+        'icon': icon,
+        'slots': slots,
+        'theme': theme,
+        'animation_time': float(animation_time),
+    })
+    
+    # Initialize API and fetch ALL data in one consolidated query
+    api = GitHubAccountStatsAPI()
+    try:
+        user_data = await cached_fetch(username, ('account-stats', username, frozenset(needed_stats)),
+                                       lambda: api.fetch_account_stats(username, needed_stats))
+    except Exception:
+        # GitHub failing and nothing cached to render from: the card as last served, if any
+        last_good = render_cache.last_good(card)
+        if last_good is None:
+            raise
+        return last_good
+    
+    # Calculate all stats from the consolidated data
+    stats = calculate_basic_stats(user_data)
+    
+    # Everything the card shows is derived from name, avatar and stats
+    key = fingerprint('account-general', {
+        'name': user_data.get('name', username),
+        'avatarUrl': user_data.get('avatarUrl'),
+        'stats': stats,
+    }, {
+        'username': username,
+        'icon': icon,
+        'slots': slots,
+        'theme': theme,
+        'animation_time': float(animation_time),
+    })
+    render_cache.remember(card, key)
+    cached = render_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    avatar_data_uri = None
+    if 'user' in icon.split('+'):
+        avatar_data_uri = await fetch_avatar_data_uri(username, user_data.get('avatarUrl'))
+        if avatar_data_uri is None and user_data.get('avatarUrl'):
+            # The avatar couldn't be fetched: the initials fallback isn't cached, so the next request tries again
+            return RenderedSVG(None, encode_svg(layout_account_general_svg(
+                username, user_data, stats, icon, slots, theme, animation_time, None)))
+    
+    return render_cache.put(key, layout_account_general_svg(
+        username, user_data, stats, icon, slots, theme, animation_time, avatar_data_uri))
+
+async def generate_account_general_svg(
+    username: str,
+    icon: str = "user",
+    slots: List[str] = None,
+    theme: str = "dark",
+    animation_time: float = 8
+) -> str:
+    """
+    Generate account general stats SVG with optimized single-query performance.
+    
+    Returns:
+        SVG string with user stats and icon
+    """
+    rendered = await render_account_general_svg(username, icon, slots, theme, animation_time)
+    return rendered.text
@@ -0,0 +1,34 @@
+"""
+Background Tasks
+Work a request starts but doesn't wait for, such as refreshing stale data
+(user_cache) or probing a failing upstream (circuit_breaker). At most one task
+runs per key.
+
+The serverless handlers run every request on a fresh event loop, so they drain the
+loop's background tasks (drain_background_tasks) after responding and before
+closing it; the long-running server drains them on shutdown.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# key -> running task
+_tasks: Dict[Hashable, "asyncio.Task"] = {}
+
+def run_in_background(key: Hashable, start: Callable[[], Awaitable[Any]]) -> bool:
+    """Run start() in a task of the current event loop unless a task with the same key is running; returns whether it started"""
+    loop = asyncio.get_running_loop()
+    task = _tasks.get(key)
+    # A task of another (serverless, since closed) event loop will never finish
+    if task is not None and not task.done() and task.get_loop() is loop:
+        return False
+    task = _tasks[key] = loop.create_task(start())
+    task.add_done_callback(lambda done: _tasks.pop(key) if _tasks.get(key) is done else None)
+    return True
+
+async def drain_background_tasks():
+    """Wait for the background tasks running on the current event loop"""
+    loop = asyncio.get_running_loop()
+    tasks = [task for task in list(_tasks.values()) if task.get_loop() is loop and not task.done()]
+    if tasks:
+        await asyncio.wait(tasks)
@@ -0,0 +1,99 @@
+"""
+Batch Rendering
+Renders several cards for one request: shared GitHub data is fetched once per batch
+(see fetch_scope) and the cards are rendered concurrently with the same render_*
+coroutines and parameter validation as the single-card endpoints.
+
+A batch is a JSON object {"cards": [{"type": "top-languages", "params": {...}, "id": "..."}, ...]}.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List
+
+from .account_general_generator import needed_account_stats, render_account_general_svg
+from .contributions_graph_generator import render_contributions_svg
+from .endpoints import (
+    parse_account_general_params, parse_contributions_graph_params,
+    parse_top_languages_params, parse_views_counter_params,
+)
+from .fetch_scope import fetch_scope
+from .top_languages_generator import render_top_languages_svg
+from .views_counter_generator import render_views_counter_svg
+
+# Upper bound for cards in one batch request
+BATCH_MAX_CARDS = int(os.getenv('BATCH_MAX_CARDS', 50))
+
+# Card type -> (parameter parser, render coroutine)
+CARD_TYPES = {
+    'account-general': (parse_account_general_params, render_account_general_svg),
+    'top-languages': (parse_top_languages_params, render_top_languages_svg),
+    'contributions-graph': (parse_contributions_graph_params, render_contributions_svg),
+    'views-counter': (parse_views_counter_params, render_views_counter_svg),
+}
+
+def to_query_params(params: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Convert JSON card parameters to parse_qs() form, so the endpoint parsers validate them"""
+    query_params = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = 'true' if value else 'false'
+        elif isinstance(value, (list, tuple)):
+            value = ','.join(str(item) for item in value)
+        query_params[name] = [str(value)]
+    return query_params
+
+def parse_batch(payload: Any) -> List[Dict[str, Any]]:
+    """Validate the batch request body and return its card specs"""
+    cards = payload.get('cards') if isinstance(payload, dict) else None
+    if not isinstance(cards, list) or not cards:
+        raise ValueError("Batch request needs a non-empty 'cards' list")
+    if len(cards) > BATCH_MAX_CARDS:
+        raise ValueError(f"Too many cards: {len(cards)} (max {BATCH_MAX_CARDS})")
+    for card in cards:
+        if not isinstance(card, dict) or not isinstance(card.get('params', {}), dict):
+            raise ValueError("Each card must be an object with 'type' and optional 'params' object")
+    return cards
+
+async def render_card(card_type: str, params: Dict[str, Any], username: str, user_agent: str) -> Dict[str, Any]:
+    """Render one validated card and return its batch result"""
+    render = CARD_TYPES[card_type][1]
+    if card_type == 'views-counter':
+        rendered = await render(user_agent=user_agent, username=username, **params)
+    else:
+        rendered = await render(username=username, **params)
+    return {'status': 200, 'etag': rendered.etag(), 'svg': rendered.text}
+
+async def render_batch(cards: List[Dict[str, Any]], username: str, user_agent: str = '') -> List[Dict[str, Any]]:
+    """Render all cards of a batch concurrently; invalid cards get an error entry instead of failing the batch"""
+    results, jobs = [], []
+    account_stats = set()
+    for index, card in enumerate(cards):
+        result = {'id': card.get('id', index), 'type': card.get('type')}
+        results.append(result)
+        try:
+            if card.get('type') not in CARD_TYPES:
+                raise ValueError(f"Invalid card type: {card.get('type')}")
+            params = CARD_TYPES[card['type']][0](to_query_params(card.get('params', {})))
+        except Exception as e:
+            result.update({'status': 400, 'error': str(e)})
+            continue
+        if card['type'] == 'account-general':
+            account_stats |= needed_account_stats(params['slots'], params['icon'])
+        jobs.append((result, card['type'], params))
+
+    # Every account card fetches the union of the needed stats, so they share one fetch
+    with fetch_scope(account_stats=account_stats):
+        outcomes = await asyncio.gather(
+            *(render_card(card_type, params, username, user_agent) for _, card_type, params in jobs),
+            return_exceptions=True
+        )
+
+    for (result, _, _), outcome in zip(jobs, outcomes):
+        if isinstance(outcome, Exception):
+            result.update({'status': 500, 'error': str(outcome)})
+        else:
+            result.update(outcome)
+    return results
@@ -0,0 +1,108 @@
+"""
+Circuit Breaker
+Stops calling an upstream (GitHub's GraphQL API) after CIRCUIT_FAILURE_THRESHOLD
+consecutive failures, so requests fail at once instead of each waiting for it to
+time out. While the circuit is open, cards are served from what is already there:
+cached data (user_cache.cached_fetch) or the last SVG rendered for the same card
+(render_cache.last_good).
+
+Meanwhile a request starts a probe in the background every CIRCUIT_PROBE_INTERVAL
+seconds; the circuit closes as soon as one succeeds.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .background import run_in_background
+
+# Consecutive failures after which an upstream isn't called anymore
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+
+# Seconds between recovery probes of an upstream while its circuit is open
+CIRCUIT_PROBE_INTERVAL = float(os.getenv('CIRCUIT_PROBE_INTERVAL', 30))
+
+class UpstreamError(Exception):
+    """An upstream didn't answer: unreachable, timed out or failing with a server error"""
+
+class CircuitOpen(UpstreamError):
+    """An upstream isn't called, as it kept failing"""
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        super().__init__(f"{upstream} is failing, not called until it recovers")
+
+class CircuitBreaker:
+    """Failure count and open/closed state of one upstream, with its recovery probe"""
+
+    def __init__(self, upstream: str, probe: Callable[[], Awaitable[Any]],
+                 failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, probe_interval: float = CIRCUIT_PROBE_INTERVAL):
+        self.upstream = upstream
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._next_probe = 0.0
+        self._lock = threading.Lock()
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self):
+        """Raise CircuitOpen while the circuit is open, starting a background probe when one is due"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            self.rejected += 1
+            now = time.monotonic()
+            probe_due = now >= self._next_probe
+            if probe_due:
+                self._next_probe = now + self.probe_interval
+        if probe_due:
+            run_in_background(('probe', self.upstream), self._probe)
+        raise CircuitOpen(self.upstream)
+
+    async def _probe(self):
+        try:
+            await self.probe()
+        except Exception as e:
+            print(f"Probe of {self.upstream} failed: {e}")
+            return
+        self.record_success()
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print(f"{self.upstream} recovered, circuit closed")
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is None and self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._next_probe = self.opened_at + self.probe_interval
+                self.trips += 1
+                print(f"{self.upstream} failed {self.failures} times in a row, circuit opened")
+
+    def reset(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'upstream': self.upstream,
+                'state': 'open' if self.opened_at is not None else 'closed',
+                'open_for': round(time.monotonic() - self.opened_at, 1) if self.opened_at is not None else None,
+                'failures': self.failures,
+                'trips': self.trips,
+                'rejected': self.rejected,
+            }
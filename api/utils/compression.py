@@ -0,0 +1,84 @@
+"""
+Response Compression
+gzip (and brotli, when the optional `brotli` package is installed) encoders plus
+Accept-Encoding negotiation for the SVG endpoints.
+"""
+
+import gzip
+import zlib
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed (headers would eat the savings)
+COMPRESSION_MIN_BYTES = 512
+
+# Supported encodings in order of preference
+SUPPORTED_ENCODINGS = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress body with the given content-coding ('identity' returns it unchanged)"""
+    if encoding == 'gzip':
+        # Fixed mtime keeps the compressed bytes deterministic for identical input
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(body, quality=11)
+    return body
+
+class _BrotliStream:
+    """Adapter giving brotli's incremental compressor the zlib compressobj interface"""
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=11)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+def stream_compressor(encoding: str):
+    """Incremental compressor (compress/flush) for a content-coding, or None for identity"""
+    if encoding == 'gzip':
+        # wbits=31 produces a gzip container (header mtime is 0, so output is deterministic)
+        return zlib.compressobj(9, zlib.DEFLATED, 31)
+    if encoding == 'br' and brotli is not None:
+        return _BrotliStream()
+    return None
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q-value}"""
+    preferences = {}
+    for item in (header or '').split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        preferences[coding] = q
+    return preferences
+
+def negotiate_encoding(header: Optional[str], body_size: int = COMPRESSION_MIN_BYTES) -> str:
+    """Pick the best supported content-coding for an Accept-Encoding header"""
+    if body_size < COMPRESSION_MIN_BYTES:
+        return 'identity'
+
+    preferences = parse_accept_encoding(header)
+    wildcard = preferences.get('*', 0.0)
+    best_encoding, best_q = 'identity', 0.0
+    # Highest q-value wins, ties go to the earlier (better compressing) encoding
+    for encoding in SUPPORTED_ENCODINGS:
+        q = preferences.get(encoding, wildcard)
+        if q > best_q:
+            best_encoding, best_q = encoding, q
+    return best_encoding
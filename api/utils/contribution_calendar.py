@@ -0,0 +1,147 @@
+"""
+Contribution Calendar
+Daily contribution counts kept as compact arrays ({'start': 'YYYY-MM-DD', 'counts': [...]},
+oldest day first) instead of GraphQL week/day objects, and the streaks computed from them.
+
+The last year's calendar is shared by every card that needs it (the contributions graph
+and the account streak), so a page showing both fetches and parses it once (see
+recent_days). Calendars of completed years don't change, so they are fetched once per
+user and kept for as long as the user stays in the per-user cache (see fetch_year_days).
+Any other range of days is assembled from those year calendars (see range_days).
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .github_client import graphql_request
+from .query_builder import build_user_query
+from .user_cache import cached_fetch, user_cache
+
+# Selection of a contributionsCollection's calendar (days are consecutive, oldest first)
+CALENDAR_SELECTION = """contributionCalendar {
+  weeks {
+    contributionDays {
+      contributionCount
+      date
+    }
+  }
+}"""
+
+def calendar_query(operation: str, collection: str) -> str:
+    """Query for the calendar of a user's contributionsCollection (with its arguments, if any)"""
+    calendar = '\n'.join('  ' + line for line in CALENDAR_SELECTION.splitlines())
+    return build_user_query(operation, (f'{collection} {{\n{calendar}\n}}',))
+
+async def fetch_calendar(query: str, username: str) -> Dict[str, Any]:
+    """Daily counts of a calendar query's contributionsCollection"""
+    data = await graphql_request(query, {'login': username})
+    if 'errors' in data:
+        raise Exception(f"GraphQL errors: {data['errors']}")
+    return calendar_days(data['data']['user']['contributionsCollection']['contributionCalendar'])
+
+def calendar_days(calendar: Dict[str, Any]) -> Dict[str, Any]:
+    """Daily counts of a GraphQL contributionCalendar; only the first date is parsed, as the days are consecutive"""
+    counts = []
+    start = None
+    for week in calendar.get('weeks', []):
+        for day in week.get('contributionDays', []):
+            if start is None:
+                start = day['date'][:10]
+            counts.append(day['contributionCount'])
+    return {'start': start, 'counts': counts}
+
+def day_index(days: Dict[str, Any], day: date) -> int:
+    """Position of a date in a calendar's counts (negative or past the end if outside it)"""
+    if days['start'] is None:
+        return -1
+    return (day - date.fromisoformat(days['start'])).days
+
+def count_streaks(counts: List[int], today: int) -> Tuple[int, int]:
+    """
+    (current, longest) streak of consecutive days with contributions up to counts[today],
+    in one pass. Today not having contributions (yet) doesn't end the current streak.
+    """
+    current = longest = run = 0
+    for index in range(min(today + 1, len(counts))):
+        run = run + 1 if counts[index] else 0
+        if run > longest:
+            longest = run
+        if index == today - 1:
+            # Streak through yesterday
+            current = run
+    if 0 <= today < len(counts) and counts[today]:
+        current = run
+    return current, longest
+
+async def fetch_year_days(username: str, year: int) -> Dict[str, Any]:
+    """Calendar of one year; completed years are kept (as expired data is) for as long as the user is cached"""
+    key = ('contributions-year', username, year)
+    if year < datetime.now(timezone.utc).year:
+        days = user_cache.get(username, key, stale=True)
+        if days is not None:
+            return days
+
+    query = calendar_query('userYearCalendar', f'contributionsCollection(from: "{year}-01-01T00:00:00Z", to: "{year}-12-31T23:59:59Z")')
+    return await cached_fetch(username, key, lambda: fetch_calendar(query, username))
+
+def join_days(chunks: List[Dict[str, Any]], first: date, last: date) -> Dict[str, Any]:
+    """Calendar of the days from first to last out of calendar chunks (days none of them cover count 0)"""
+    counts = [0] * max(0, (last - first).days + 1)
+    for chunk in chunks:
+        if chunk['start'] is None:
+            continue
+        # Position of the chunk's first day in the range, and the part of the chunk inside it
+        offset = -day_index(chunk, first)
+        begin, end = max(0, -offset), min(len(chunk['counts']), len(counts) - offset)
+        if begin < end:
+            counts[offset + begin:offset + end] = chunk['counts'][begin:end]
+    return {'start': first.isoformat(), 'counts': counts}
+
+async def range_days(username: str, first: date, last: date) -> Dict[str, Any]:
+    """Calendar of the days from first to last, from the year calendars covering them (fetched concurrently)"""
+    chunks = await asyncio.gather(*(fetch_year_days(username, year) for year in range(first.year, last.year + 1)))
+    return join_days(chunks, first, last)
+
+async def fetch_recent_days(username: str) -> Dict[str, Any]:
+    """Calendar of the last year, ending today (GitHub's default contribution window)"""
+    return await fetch_calendar(calendar_query('userContributions', 'contributionsCollection'), username)
+
+async def recent_days(username: str, fetch: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+    """The last year's calendar of a user, fetched once (by fetch, or fetch_recent_days) for every card showing it"""
+    return await cached_fetch(username, ('contributions', username), fetch or (lambda: fetch_recent_days(username)))
+
+async def calculate_streaks(username: str, days: Dict[str, Any], first_year: Optional[int] = None) -> Tuple[int, int]:
+    """
+    (current, longest) contribution streak from a calendar ending today. A current streak
+    running into the calendar's first day continues through the calendars of the years
+    before it (down to first_year, e.g. the account's creation), fetched only then.
+
+    The longest streak is windowed: the longest within the calendar, or the current streak
+    if that is longer. Older streaks would need every year since first_year fetched.
+    """
+    if not days['counts']:
+        return 0, 0
+    today = day_index(days, datetime.now(timezone.utc).date())
+    current, longest = count_streaks(days['counts'], today)
+
+    # The streak covers every day up to today (or yesterday): it may have started earlier
+    last = today if 0 <= today < len(days['counts']) and days['counts'][today] else today - 1
+    if current and current == last + 1:
+        edge = date.fromisoformat(days['start'])
+        year = (edge - timedelta(days=1)).year
+        while first_year is None or year >= first_year:
+            year_days = await fetch_year_days(username, year)
+            before_edge = year_days['counts'][:max(0, day_index(year_days, edge))]
+            run = 0
+            for count in reversed(before_edge):
+                if not count:
+                    break
+                run += 1
+            current += run
+            # Only a streak covering the whole year (from January 1st) continues into the year before
+            if not before_edge or run < len(before_edge) or year_days['start'] != f'{year}-01-01':
+                break
+            edge, year = date(year, 1, 1), year - 1
+        longest = max(longest, current)
+    return current, longest
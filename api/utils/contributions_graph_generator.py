@@ -1,24 +1,24 @@
 """
 GitHub Contributions SVG Generator
 Creates an SVG representation of GitHub contributions graph exactly like on GitHub
+
+By default the graph shows the last 53 weeks (GitHub's profile graph); a calendar year or
+a from/to range of days can be shown instead (see contributions_range).
 """
 
 import asyncio
-import aiohttp
+import html
 import json
 import math
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 import calendar
-import os
-from dotenv import load_dotenv
+from functools import lru_cache
 from .chars_patterns import generate_text_pattern
-
-# Load environment variables
-load_dotenv()
-
-# GitHub API endpoint for contributions
-GITHUB_API_URL = "https://api.github.com/graphql"
+from .contribution_calendar import day_index, fetch_recent_days, range_days, recent_days
+from .github_client import token_pool
+from .render_cache import PendingSVG, RenderedSVG, card_fingerprint, fingerprint, render_cache
+from .svg_output import encode_svg
 
 # Exact GitHub colors for contributions
 GITHUB_COLORS = {
@@ -38,67 +38,33 @@ GITHUB_COLORS = {
     }
 }
 
-# GraphQL query for contributions
-CONTRIBUTIONS_QUERY = """
-query userInfo($login: String!) {
-  user(login: $login) {
-    contributionsCollection {
-      contributionCalendar {
-        colors
-        totalContributions
-        weeks {
-          contributionDays {
-            color
-            contributionCount
-            date
-            weekday
-          }
-        }
-      }
-    }
-  }
-}
-"""
+# Contribution calendars start with GitHub's launch; longer ranges make the graph unreadably wide
+MIN_CONTRIBUTIONS_YEAR = 2008
+MAX_CONTRIBUTIONS_DAYS = 5 * 366
+
+class InvalidContributionsRange(ValueError):
+    """A year or from/to range the contributions graph can't show"""
 
 class GitHubContributionsAPI:
     """GitHub API client for fetching contributions data"""
     
     def __init__(self):
-        self.token = os.getenv('GITHUB_TOKEN')
-        if not self.token:
+        if not token_pool().budgets:
             raise ValueError("GITHUB_TOKEN environment variable is required")
 
     async def fetch_contributions(self, username: str) -> Dict:
-        """Fetch contributions data from GitHub API"""
-        headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json',
-        }
-        
-        variables = {'login': username}
-        payload = {
-            'query': CONTRIBUTIONS_QUERY,
-            'variables': variables
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(GITHUB_API_URL, 
-                                   headers=headers, 
-                                   json=payload) as response:
-                if response.status != 200:
-                    raise Exception(f"GitHub API error: {response.status}")
-                
-                data = await response.json()
-                
-                if 'errors' in data:
-                    raise Exception(f"GraphQL errors: {data['errors']}")
-                
-                return data['data']['user']['contributionsCollection']['contributionCalendar']
-
-def get_contributions_year_range() -> Tuple[datetime, datetime]:
+        """Fetch the last year's daily contribution counts from GitHub API (see contribution_calendar)"""
+        return await fetch_recent_days(username)
+
+    async def fetch_contributions_range(self, username: str, first_day: date, last_day: date) -> Dict:
+        """Fetch the daily contribution counts from first_day to last_day (see contribution_calendar.range_days)"""
+        return await range_days(username, first_day, last_day)
+
+def get_contributions_year_range(today: Optional[date] = None) -> Tuple[datetime, datetime]:
     """Get the start and end dates for the contributions calendar
     GitHub shows exactly 53 weeks ending with today (not padded to end of week)"""
-    today = datetime.now(timezone.utc).date()
+    if today is None:
+        today = datetime.now(timezone.utc).date()
     
     # Calculate current Sunday (GitHub weeks start on Sunday)
     # weekday(): Monday=0, Sunday=6, so we need to adjust
@@ -113,22 +79,63 @@ def get_contributions_year_range() -> Tuple[datetime, datetime]:
     return datetime.combine(start_date, datetime.min.time(), timezone.utc), \
            datetime.combine(today, datetime.max.time(), timezone.utc)
 
-def generate_contributions_grid(contributions_data: Dict, theme: str = "light") -> Tuple[List[List[Dict]], int, int]:
-    """Generate contributions grid - 52 full weeks + current partial week"""
+def range_date(name: str, value: Optional[str]) -> Optional[date]:
+    """Optional YYYY-MM-DD bound of a from/to range"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise InvalidContributionsRange(f"Invalid {name}: {value}. Use YYYY-MM-DD.")
+
+def contributions_range(year: Optional[int] = None, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[date, date]:
+    """First and last day shown: a calendar year, a from/to range (to defaults to today, from to
+    the 53 weeks ending with to) or, without any of them, the last 53 weeks. Never past today.
+
+    Raises InvalidContributionsRange for a year or range that can't be shown: before
+    MIN_CONTRIBUTIONS_YEAR, in the future, reversed or longer than MAX_CONTRIBUTIONS_DAYS."""
+    today = datetime.now(timezone.utc).date()
+    if year is not None:
+        if date_from or date_to:
+            raise InvalidContributionsRange("year can't be combined with from/to")
+        if not (MIN_CONTRIBUTIONS_YEAR <= year <= today.year):
+            raise InvalidContributionsRange(f"Invalid year: {year}. Must be between {MIN_CONTRIBUTIONS_YEAR} and {today.year}.")
+        return date(year, 1, 1), min(date(year, 12, 31), today)
+
+    first_day, last_day = range_date('from', date_from), range_date('to', date_to)
+    for name, value in (('from', first_day), ('to', last_day)):
+        if value and not (date(MIN_CONTRIBUTIONS_YEAR, 1, 1) <= value <= today):
+            raise InvalidContributionsRange(f"Invalid {name}: {value}. Must be between {MIN_CONTRIBUTIONS_YEAR}-01-01 and today.")
+    last_day = last_day or today
+    if first_day is None:
+        start_date, end_date = get_contributions_year_range(last_day)
+        return start_date.date(), end_date.date()
+    if first_day > last_day:
+        raise InvalidContributionsRange(f"Invalid range: from {first_day} is after to {last_day}")
+    if (last_day - first_day).days + 1 > MAX_CONTRIBUTIONS_DAYS:
+        raise InvalidContributionsRange(f"Invalid range: {first_day} to {last_day}. At most {MAX_CONTRIBUTIONS_DAYS} days.")
+    return first_day, last_day
+
+def generate_contributions_grid(contributions_data: Dict, theme: str = "light", first_day: Optional[date] = None, last_day: Optional[date] = None) -> Tuple[List[List[Dict]], int, int]:
+    """Generate contributions grid - full weeks + the last (partial) week, by default 52 + the current week.
+    Days of the first week before first_day stay empty."""
     colors = GITHUB_COLORS[theme]
     
     # Get the date range and calculate actual weeks needed
-    start_date, end_date = get_contributions_year_range()
-    today = datetime.now(timezone.utc).date()
+    if first_day is None or last_day is None:
+        first_day, last_day = contributions_range()
+    # GitHub weeks start on Sunday (weekday(): Monday=0, Sunday=6)
+    start_date = first_day - timedelta(days=(first_day.weekday() + 1) % 7)
+    grid_days = (last_day - start_date).days + 1
+    weeks = max(1, math.ceil(grid_days / 7))
     
-    # Calculate how many days are in the current (partial) week
-    days_since_sunday = (today.weekday() + 1) % 7
-    current_week_days = days_since_sunday + 1  # +1 because we include today
+    # Calculate how many days are in the last (partial) week
+    current_week_days = grid_days - (weeks - 1) * 7
     
     grid = []
     
-    # Add 52 full weeks
-    for week in range(52):
+    # Add the full weeks
+    for week in range(weeks - 1):
         grid.append([{"count": 0, "color": colors["bg"], "date": ""} for _ in range(7)])
     
     # Add partial current week (only the days that have passed)
@@ -137,323 +144,319 @@ def generate_contributions_grid(contributions_data: Dict, theme: str = "light")
         current_week.append({"count": 0, "color": colors["bg"], "date": ""})
     grid.append(current_week)
     
-    total_contributions = contributions_data.get('totalContributions', 0)
-    weeks = contributions_data.get('weeks', [])    # Process GitHub's weeks data
-    for week_data in weeks:
-        days = week_data.get('contributionDays', [])
+    # Daily counts from the first displayed day; positions count from the grid's first Sunday,
+    # so they map to weeks and weekdays
+    counts = contributions_data.get('counts', [])
+    offset = day_index(contributions_data, first_day) if counts else 0
+    lead = (first_day - start_date).days
+    shown = range(max(0, -offset), min(grid_days - lead, len(counts) - offset))
+    total_contributions = sum(counts[offset + index] for index in shown)
+    for index in shown:
+        count = counts[offset + index]
+        position = lead + index
+        if count == 0:
+            color = colors["bg"]
+        elif count <= 2:
+            color = colors["level1"]
+        elif count <= 5:
+            color = colors["level2"]
+        elif count <= 8:
+            color = colors["level3"]
+        else:
+            color = colors["level4"]
         
-        for day in days:
-            date_str = day.get('date', '')
-            if not date_str:
-                continue
-                
-            # Parse the date
-            try:
-                # GitHub returns dates in YYYY-MM-DD format, convert to timezone-aware datetime
-                if 'T' in date_str:
-                    day_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                else:
-                    # If it's just a date string (YYYY-MM-DD), parse it and add timezone
-                    day_date = datetime.strptime(date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-            except:
-                continue
-            
-            # Check if this date falls within our display range
-            if not (start_date <= day_date <= end_date):
-                continue
-            
-            # Calculate which week this belongs to (from our start date)
-            days_from_start = (day_date.date() - start_date.date()).days
-            week_idx = days_from_start // 7
-            weekday = day.get('weekday', 0)  # 0 = Sunday, 6 = Saturday
-            
-            # Check bounds - for the last week, only include days that exist
-            if week_idx < len(grid) and weekday < len(grid[week_idx]):
-                count = day.get('contributionCount', 0)
-                
-                # Determine color based on contribution count
-                if count == 0:
-                    color = colors["bg"]
-                elif count <= 2:
-                    color = colors["level1"] 
-                elif count <= 5:
-                    color = colors["level2"]
-                elif count <= 8:
-                    color = colors["level3"]
-                else:
-                    color = colors["level4"]
-                
-                grid[week_idx][weekday] = {
-                    "count": count,
-                    "color": color,
-                    "date": date_str[:10]  # YYYY-MM-DD format
-                }
+        grid[position // 7][position % 7] = {
+            "count": count,
+            "color": color,
+            "date": (start_date + timedelta(days=position)).isoformat()  # YYYY-MM-DD format
+        }
     
     return grid, total_contributions, current_week_days
 
-def create_contributions_svg(username: str, contributions_data: Dict, theme: str = "dark", text: str = "ADBREEKER", line_color: str = "#000000", line_alpha: float = 0.5, square_size: int = 11, animation_time: float = 8.0, pause_time: float = 0.0) -> str:
-    """Create SVG representation of GitHub contributions"""
-    colors = GITHUB_COLORS[theme]
-    grid, total_contributions, current_week_days = generate_contributions_grid(contributions_data, theme)
-      # SVG dimensions - calculate based on actual grid structure
+# Text square states inside the animation skeleton
+TEXT_NONE = 0      # Square is outside the text area
+TEXT_BLANK = 1     # Square is inside the text area but not part of a letter
+TEXT_ACTIVE = 2    # Square is written by the lines as part of a letter
+
+# Number of distinct (square_size, text, timing, weekday, weeks) skeletons kept in memory
+SKELETON_CACHE_SIZE = 64
+
+@lru_cache(maxsize=SKELETON_CACHE_SIZE)
+def build_contributions_skeleton(square_size: int, text: str, animation_time: float, pause_time: float, current_week_days: int, weeks: int = 53) -> Dict:
+    """Build the data-independent part of the contributions SVG (positions, keyTimes, line animation).
+
+    The result only depends on the arguments, so it is cached and shared between requests.
+    It must be treated as read-only - per-request colours are filled in by create_contributions_svg.
+    """
+    # SVG dimensions - calculate based on actual grid structure
     # Calculate margin as 20% of square size (maintains GitHub-like spacing at any size)
     square_margin = max(1, math.ceil(square_size * 0.20))
-      # Calculate total dimensions based on actual grid
-    # 52 full weeks + partial current week
-    grid_width = 52 * (square_size + square_margin) + (square_size + square_margin) - square_margin
+    # Calculate total dimensions based on actual grid
+    # Full weeks + partial last week
+    grid_width = weeks * (square_size + square_margin) - square_margin
     grid_height = 7 * (square_size + square_margin) - square_margin
     line_height = grid_height + square_size   # One square taller on each side
-    line_width = square_size/2    # Generate custom text pattern for animation
+    line_width = square_size/2
     padding_x = square_margin + line_width  # Padding around the grid
     padding_y = (square_margin + square_size) / 2
     total_width = grid_width + 2 * padding_x  # Add space for eating line
     total_height = grid_height + 2 * padding_y  # Add space for eating line
     # Animation parameters
     animation_duration = f"{animation_time+pause_time}s"  # Extended duration for smooth sequence
-    middle_column = len(grid) // 2  # Middle of the grid
+    week_lengths = [7] * (weeks - 1) + [current_week_days]
+    total_columns = len(week_lengths)
+    middle_column = max(1, total_columns // 2)  # Middle of the grid (a one-week range still has a line path)
+    # Generate custom text pattern for animation
     text_patterns = generate_text_pattern(text)
     # Calculate total width needed for all letters
     total_text_width = max(text_patterns.keys()) + 4 if text_patterns else 0
     text_start_column = max(0, middle_column - total_text_width // 2)  # Center the text
     text_start_row = 1  # Start from row 1 (0-6, so 1-5 will be the text area)
-      # Start building SVG with animation
-    svg_parts = [
-        f'<svg width="{total_width}" height="{total_height}" xmlns="http://www.w3.org/2000/svg">',
-        f'<defs>',
-        f'<style>',
-        f'.contrib-square {{ stroke-width: 1; stroke: rgba(27,31,35,0.06); rx: 2; ry: 2; }}',
-        f'.eating-line {{ fill: {line_color}; }}',  # Customizable line color
-        f'</style>',
-        f'</defs>',
-    ]# Add contribution squares with animation
 
     phase_time = 100 * (1/4) * (animation_time / (animation_time + pause_time))  # Total time of single phase
     small_delay = 0.25 / middle_column * phase_time # quater of the time for each column to move
     print(f"Phase time: {phase_time:.2f}s, Small delay: {small_delay:.2f}s")
-    for week_idx, week in enumerate(grid):
-        for day_idx, day_data in enumerate(week):
+
+    def animation_tail(keyframes: List[float]) -> str:
+        # Convert to keyTimes format (0-1) - everything after the animated colour values
+        key_times_str = ';'.join([f'{t/100:.3f}' for t in keyframes])
+        return f'" dur="{animation_duration}" keyTimes="{key_times_str}" repeatCount="indefinite"/>'
+
+    def clamp(keyframes: List[float]) -> List[float]:
+        # Clamp intermediate keyframes to ensure valid sequence
+        for i in range(1, len(keyframes) - 1):
+            keyframes[i] = max(keyframes[i-1], min(keyframes[i], keyframes[i+1]))
+        return keyframes
+
+    squares = []
+    for week_idx, week_length in enumerate(week_lengths):
+        for day_idx in range(week_length):
             x = padding_x + week_idx * (square_size + square_margin)
             y = padding_y + day_idx * (square_size + square_margin)
-            
-            # Format the tooltip text
-            if day_data["date"]:
-                # Parse date and format it nicely
-                try:
-                    date_obj = datetime.fromisoformat(day_data["date"]).date()
-                    formatted_date = date_obj.strftime("%b %d, %Y")
-                except:
-                    formatted_date = day_data["date"]
-                
-                count_text = "No contributions" if day_data["count"] == 0 else f"{day_data['count']} contribution{'s' if day_data['count'] != 1 else ''}"
-                tooltip_text = f"{count_text} on {formatted_date}"
-            else:
-                tooltip_text = "No data"
-              # Check if this square should be part of ADBREEKER text
-            is_text_square = False
-            text_square_active = False
-            
+
+            # Check if this square should be part of the text
+            text_state = TEXT_NONE
+
             # Check if we're in the text area (5 rows starting from text_start_row)
             if (day_idx >= text_start_row and day_idx < text_start_row + 5 and
                 week_idx >= text_start_column):
-                
+
                 # Calculate which letter and position within the letter
                 relative_col = week_idx - text_start_column
                 relative_row = day_idx - text_start_row
-                  # Find which letter this column belongs to
+                # Find which letter this column belongs to
                 for letter_start_col, letter_pattern in text_patterns.items():
-                    if (relative_col >= letter_start_col and 
+                    if (relative_col >= letter_start_col and
                         relative_col < letter_start_col + 4):  # Each letter is 4 cols wide
-                        
+
                         letter_col = relative_col - letter_start_col
-                        is_text_square = True
-                        text_square_active = letter_pattern[relative_row][letter_col] == 1
+                        text_state = TEXT_ACTIVE if letter_pattern[relative_row][letter_col] == 1 else TEXT_BLANK
                         break
-            
-            # Create the square with eating animation effect
-            square_id = f"square-{week_idx}-{day_idx}"
-            original_color = day_data["color"]
-            empty_color = colors["bg"]
-            text_color = colors["level3"]  # Use level 3 color for text
-            
-            svg_parts.append(
-                f'<rect id="{square_id}" x="{x}" y="{y}" width="{square_size}" height="{square_size}" '
-                f'fill="{original_color}" class="contrib-square">'
-                f'<title>{tooltip_text}</title>'            )
-            
-            # Add eating animation - for contribution squares and text squares
-            has_contribution = day_data["count"] > 0
-            
-            if has_contribution or is_text_square:
-                # Animation sequence (updated for 6-phase line movement):
-                # Start
-                # Phase 1: Lines come in, eat original squares (contributions only)
-                # Phase 2: Lines go out, write text (text squares appear)
-                # Phase 3: Lines come back in, eat text (text squares disappear)
-                # Phase 4: Lines go out, restore original squares (contributions only)
-                # Pause
-                
-                # Calculate timing based on column position
-                total_columns = len(grid)
-                
-                if week_idx <= middle_column:
-                    # Left line territory (columns 0 to middle_column inclusive)
-                    eat_progress = week_idx / middle_column
-                else:
-                    # Right line territory (columns after middle_column)
-                    columns_from_right = total_columns - 1 - week_idx
-                    max_columns_right = total_columns - middle_column - 1
-                    eat_progress = columns_from_right / max_columns_right
-
-                eat_time = eat_progress * phase_time  
-                restore_time = 3 * phase_time + (1 - eat_progress) * phase_time   
-                
-                # Different animation sequences for different square types
-                if is_text_square and text_square_active:
-                    # Text squares: get written by lines during phase 2 (20-40%)
-                    # Calculate when this square gets written based on distance from center
-                    distance_from_center = abs(week_idx - middle_column)
-                    max_distance = middle_column if week_idx <= middle_column else (len(grid) - 1 - middle_column)
-                    
-                    if max_distance > 0:
-                        write_progress = distance_from_center / max_distance
-                    else:
-                        write_progress = 0
-                    
-                    # Text appears as lines move out during phase 2 (20-40%)
-                    write_time = phase_time + write_progress * phase_time
-                    
-                    keyframes = [
-                        0,                # Start: empty
-                        1 * phase_time,               # Phase 1 end: still empty
-                        write_time,       # Just before writing
-                        write_time + small_delay, # Just after writing (text appears)
-                        2 * phase_time,               # Phase 2 end: text visible
-                        eat_time + 2 * phase_time,    # Just before eating in phase 3 (40-60%)
-                        eat_time + 2 * phase_time + small_delay,  # Just after eating (empty)
-                        4 * phase_time,               # End: empty (pause phase)
-                        100
-                    ]
-                    
-                    # Clamp intermediate keyframes to ensure valid sequence
-                    for i in range(1, len(keyframes) - 1):
-                        keyframes[i] = max(keyframes[i-1], min(keyframes[i], keyframes[i+1]))
-                    
-                    colors_sequence = [
-                        empty_color,      # Start: empty
-                        empty_color,      # Phase 1 end: still empty
-                        empty_color,      # Just before writing
-                        text_color,       # Text appears (written by line)
-                        text_color,       # Text visible through phase 2
-                        text_color,       # Just before eating
-                        empty_color,      # Just after eating
-                        empty_color,       # End: empty
-                        empty_color       # Pause phase: stay empty
-                    ]
-                elif has_contribution:
-                    # Regular contribution squares: normal eating and restoring (updated timing)
-                    keyframes = [
-                        0,                # Start: original color
-                        eat_time,         # Just before eating (phase 1: 0-20%)
-                        eat_time + small_delay,   # Just after eating (empty)
-                        3 * phase_time,               # Stay empty until restore phase (phase 4: 60-80%)
-                        restore_time,     # Just before restoring 
-                        restore_time + small_delay, # Just after restoring (original)
-                        4 * phase_time,               # End: original color (pause phase)
-                        100
-                    ]
-
-                    # Clamp intermediate keyframes to ensure valid sequence
-                    for i in range(1, len(keyframes) - 1):
-                        keyframes[i] = max(keyframes[i-1], min(keyframes[i], keyframes[i+1]))
-                    
-                    colors_sequence = [
-                        original_color,  # Start
-                        original_color,  # Just before eating
-                        empty_color,     # Just after eating
-                        empty_color,     # Stay empty through phases 2 and 3
-                        empty_color,     # Just before restoring
-                        original_color,  # Just after restoring
-                        original_color,   # End
-                        original_color,
-                    ]
-                else:
-                    # Empty text squares (spaces): stay empty throughout
-                    keyframes = [0, 100]  # Updated to match pause phase
-                    colors_sequence = [empty_color, empty_color]
-                # Convert to keyTimes format (0-1) and apply animation
-                key_times = [t/100 for t in keyframes]
-                key_times_str = ';'.join([f'{t:.3f}' for t in key_times])
-                colors_str = ';'.join(colors_sequence)
-                
-                svg_parts.append(
-                    f'<animate attributeName="fill" '
-                    f'values="{colors_str}" '
-                    f'dur="{animation_duration}" '
-                    f'keyTimes="{key_times_str}" '
-                    f'repeatCount="indefinite"/>'                
-                )
-            
-            svg_parts.append('</rect>')
+
+            # Animation sequence (6-phase line movement):
+            # Phase 1: Lines come in, eat original squares (contributions only)
+            # Phase 2: Lines go out, write text (text squares appear)
+            # Phase 3: Lines come back in, eat text (text squares disappear)
+            # Phase 4: Lines go out, restore original squares (contributions only)
+            # Pause
+            if week_idx <= middle_column:
+                # Left line territory (columns 0 to middle_column inclusive)
+                eat_progress = week_idx / middle_column
+            else:
+                # Right line territory (columns after middle_column)
+                columns_from_right = total_columns - 1 - week_idx
+                max_columns_right = total_columns - middle_column - 1
+                eat_progress = columns_from_right / max_columns_right
+
+            eat_time = eat_progress * phase_time
+            restore_time = 3 * phase_time + (1 - eat_progress) * phase_time
+
+            text_tail = None
+            if text_state == TEXT_ACTIVE:
+                # Text squares: get written by lines during phase 2
+                # Calculate when this square gets written based on distance from center
+                distance_from_center = abs(week_idx - middle_column)
+                max_distance = middle_column if week_idx <= middle_column else (total_columns - 1 - middle_column)
+                write_progress = distance_from_center / max_distance if max_distance > 0 else 0
+
+                # Text appears as lines move out during phase 2
+                write_time = phase_time + write_progress * phase_time
+                text_tail = animation_tail(clamp([
+                    0,                # Start: empty
+                    1 * phase_time,               # Phase 1 end: still empty
+                    write_time,       # Just before writing
+                    write_time + small_delay, # Just after writing (text appears)
+                    2 * phase_time,               # Phase 2 end: text visible
+                    eat_time + 2 * phase_time,    # Just before eating in phase 3
+                    eat_time + 2 * phase_time + small_delay,  # Just after eating (empty)
+                    4 * phase_time,               # End: empty (pause phase)
+                    100
+                ]))
+
+            # Regular contribution squares: normal eating and restoring
+            contribution_tail = animation_tail(clamp([
+                0,                # Start: original color
+                eat_time,         # Just before eating (phase 1)
+                eat_time + small_delay,   # Just after eating (empty)
+                3 * phase_time,               # Stay empty until restore phase (phase 4)
+                restore_time,     # Just before restoring
+                restore_time + small_delay, # Just after restoring (original)
+                4 * phase_time,               # End: original color (pause phase)
+                100
+            ]))
+
+            rect_open = (
+                f'<rect id="square-{week_idx}-{day_idx}" x="{x}" y="{y}" width="{square_size}" height="{square_size}" '
+                f'fill="'
+            )
+            squares.append((week_idx, day_idx, rect_open, text_state, text_tail, contribution_tail))
 
     lines_key_frames = [0, 1 * phase_time, 2 * phase_time, 3 * phase_time, 4 * phase_time, 100]
-    lines_key_times = [t/100 for t in lines_key_frames]
-    lines_key_times_str = ';'.join([f'{t:.3f}' for t in lines_key_times])
-    
-    # Add the eating lines (visual indicators) - smooth movement
-    line_start_y = (total_height - line_height) / 2
-    line_end_x = padding_x  + middle_column * (square_size + square_margin)
-    # Left eating line
-    left_line_start_x = padding_x - line_width - square_margin
-    
-    svg_parts.append(
-        f'<rect class="eating-line" x="{left_line_start_x}" y="{line_start_y}" '
-        f'width="{line_width}" height="{line_height}" rx="2" opacity="{line_alpha}">'
-        f'<animateTransform attributeName="transform" type="translate" '
-        f'values="0,0;{line_end_x - left_line_start_x},0;0,0;{line_end_x - left_line_start_x},0;0,0;0,0" '
-        f'dur="{animation_duration}" '
-        f'keyTimes="{lines_key_times_str}" '
-        f'repeatCount="indefinite"/>'
-        f'</rect>'
-    )
-    # Right eating line  
-    right_line_start_x = padding_x + grid_width + square_margin
-
-    svg_parts.append(
-        f'<rect class="eating-line" x="{right_line_start_x}" y="{line_start_y}" '
-        f'width="{line_width}" height="{line_height}" rx="2" opacity="{line_alpha}">'
-        f'<animateTransform attributeName="transform" type="translate" '
-        f'values="0,0;{line_end_x - right_line_start_x},0;0,0;{line_end_x - right_line_start_x},0;0,0;0,0" '
-        f'dur="{animation_duration}" '
-        f'keyTimes="{lines_key_times_str}" '
-        f'repeatCount="indefinite"/>'
-        f'</rect>'
-    )
-    
-    svg_parts.append('</svg>')
-    
-    return '\n'.join(svg_parts)
 
-async def generate_contributions_svg(username: str, theme: str = "light", text: str = "ADBREEKER", line_color: str = "#ff8c00", line_alpha: float = 0.7, square_size: int = 11, animation_time: float = 8.0, pause_time: float = 0.0) -> str:
-    """Main function to generate contributions SVG"""
+    # Eating lines (visual indicators) - smooth movement
+    line_end_x = padding_x + middle_column * (square_size + square_margin)
+
+    return {
+        'total_width': total_width,
+        'total_height': total_height,
+        'squares': tuple(squares),
+        # Empty text squares (spaces) stay empty throughout
+        'static_tail': animation_tail([0, 100]),
+        'animation_duration': animation_duration,
+        'lines_key_times': ';'.join([f'{t/100:.3f}' for t in lines_key_frames]),
+        'line_start_y': (total_height - line_height) / 2,
+        'line_width': line_width,
+        'line_height': line_height,
+        'line_end_x': line_end_x,
+        'left_line_start_x': padding_x - line_width - square_margin,
+        'right_line_start_x': padding_x + grid_width + square_margin,
+    }
+
+@lru_cache(maxsize=1024)
+def format_tooltip_date(date_str: str) -> str:
+    """Format a YYYY-MM-DD date for square tooltips (e.g. Jan 05, 2025)"""
+    try:
+        return datetime.fromisoformat(date_str).date().strftime("%b %d, %Y")
+    except:
+        return date_str
+
+def iter_contributions_svg(username: str, contributions_data: Dict, theme: str = "dark", text: str = "ADBREEKER", line_color: str = "#000000", line_alpha: float = 0.5, square_size: int = 11, animation_time: float = 8.0, pause_time: float = 0.0, year: Optional[int] = None, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Iterator[str]:
+    """Yield the SVG representation of GitHub contributions fragment by fragment"""
+    colors = GITHUB_COLORS[theme]
+    first_day, last_day = contributions_range(year, date_from, date_to)
+    grid, total_contributions, current_week_days = generate_contributions_grid(contributions_data, theme, first_day, last_day)
+    skeleton = build_contributions_skeleton(square_size, text, animation_time, pause_time, current_week_days, len(grid))
+
+    empty_color = colors["bg"]
+    text_color = colors["level3"]  # Use level 3 color for text
+    text_values = ';'.join([empty_color] * 3 + [text_color] * 3 + [empty_color] * 3)
+    static_animation = f'<animate attributeName="fill" values="{empty_color};{empty_color}{skeleton["static_tail"]}'
+
+    # Start building SVG with animation
+    yield '\n'.join([
+        f'<svg width="{skeleton["total_width"]}" height="{skeleton["total_height"]}" xmlns="http://www.w3.org/2000/svg">',
+        f'<defs>',
+        f'<style>',
+        f'.contrib-square {{ stroke-width: 1; stroke: rgba(27,31,35,0.06); rx: 2; ry: 2; }}',
+        f'.eating-line {{ fill: {line_color}; }}',  # Customizable line color
+        f'</style>',
+        f'</defs>',
+    ])
+
+    # Add contribution squares - only colours and tooltips depend on the user's data
+    for week_idx, day_idx, rect_open, text_state, text_tail, contribution_tail in skeleton['squares']:
+        day_data = grid[week_idx][day_idx]
+        count = day_data["count"]
+
+        # Format the tooltip text
+        if day_data["date"]:
+            formatted_date = format_tooltip_date(day_data["date"])
+            count_text = "No contributions" if count == 0 else f"{count} contribution{'s' if count != 1 else ''}"
+            tooltip_text = f"{count_text} on {formatted_date}"
+        else:
+            tooltip_text = "No data"
+
+        original_color = day_data["color"]
+        square = f'\n{rect_open}{original_color}" class="contrib-square"><title>{tooltip_text}</title>'
+
+        # Add eating animation - for contribution squares and text squares
+        if text_state == TEXT_ACTIVE:
+            square += f'\n<animate attributeName="fill" values="{text_values}{text_tail}'
+        elif count > 0:
+            contribution_values = ';'.join([original_color] * 2 + [empty_color] * 3 + [original_color] * 3)
+            square += f'\n<animate attributeName="fill" values="{contribution_values}{contribution_tail}'
+        elif text_state == TEXT_BLANK:
+            square += f'\n{static_animation}'
+
+        yield square + '\n</rect>'
+
+    # Left and right eating lines
+    for line_start_x in (skeleton['left_line_start_x'], skeleton['right_line_start_x']):
+        yield (
+            f'\n<rect class="eating-line" x="{line_start_x}" y="{skeleton["line_start_y"]}" '
+            f'width="{skeleton["line_width"]}" height="{skeleton["line_height"]}" rx="2" opacity="{line_alpha}">'
+            f'<animateTransform attributeName="transform" type="translate" '
+            f'values="0,0;{skeleton["line_end_x"] - line_start_x},0;0,0;{skeleton["line_end_x"] - line_start_x},0;0,0;0,0" '
+            f'dur="{skeleton["animation_duration"]}" '
+            f'keyTimes="{skeleton["lines_key_times"]}" '
+            f'repeatCount="indefinite"/>'
+            f'</rect>'
+        )
+
+    yield '\n</svg>'
+
+def create_contributions_svg(username: str, contributions_data: Dict, theme: str = "dark", text: str = "ADBREEKER", line_color: str = "#000000", line_alpha: float = 0.5, square_size: int = 11, animation_time: float = 8.0, pause_time: float = 0.0, year: Optional[int] = None, date_from: Optional[str] = None, date_to: Optional[str] = None) -> str:
+    """Create SVG representation of GitHub contributions (of the last 53 weeks, a year or a from/to range)"""
+    return ''.join(iter_contributions_svg(username, contributions_data, theme, text, line_color, line_alpha, square_size, animation_time, pause_time, year, date_from, date_to))
+
+def normalize_contributions_data(contributions_data: Dict, first_day: Optional[date] = None, last_day: Optional[date] = None) -> List:
+    """Reduce calendar data to what the renderer uses (dates and counts) for cache fingerprinting"""
+    if first_day is None or last_day is None:
+        first_day, last_day = contributions_range()
+    # The displayed window moves with the current date, so it is part of the fingerprint too
+    return [first_day.isoformat(), last_day.isoformat(),
+            contributions_data.get('start'), contributions_data.get('counts', [])]
+
+async def fetch_contributions_days(api: GitHubContributionsAPI, username: str, first_day: date, last_day: date, ranged: bool) -> Dict:
+    """Daily counts of the displayed days: the shared last-year calendar, or the year calendars of a range"""
+    if not ranged:
+        return await recent_days(username, lambda: api.fetch_contributions(username))
+    return await api.fetch_contributions_range(username, first_day, last_day)
+
+async def render_contributions_svg(username: str, theme: str = "light", text: str = "ADBREEKER", line_color: str = "#ff8c00", line_alpha: float = 0.7, square_size: int = 11, animation_time: float = 8.0, pause_time: float = 0.0, year: Optional[int] = None, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Union[RenderedSVG, PendingSVG]:
+    """Fetch contributions and return the encoded SVG, reusing cached output when data and parameters are unchanged.
+    When fetching fails, the graph last served with the same parameters is returned if there is one."""
+    params = {
+        'theme': theme,
+        'text': text,
+        'line_color': line_color,
+        'line_alpha': float(line_alpha),
+        'square_size': int(square_size),
+        'animation_time': float(animation_time),
+        'pause_time': float(pause_time),
+    }
+    card = card_fingerprint('contributions-graph', username, dict(params, year=year, date_from=date_from, date_to=date_to))
+    try:
+        first_day, last_day = contributions_range(year, date_from, date_to)
+    except InvalidContributionsRange as e:
+        return error_card("Invalid parameters", str(e), "Check year, from and to")
     try:
         api = GitHubContributionsAPI()
-        contributions_data = await api.fetch_contributions(username)
-        return create_contributions_svg(username, contributions_data, theme, text, line_color, line_alpha, square_size, animation_time, pause_time)
-    except ValueError as e:
-        # Token-related errors
-        return f'''<svg width="500" height="100" xmlns="http://www.w3.org/2000/svg">
-            <rect width="500" height="100" fill="#f6f8fa" stroke="#d1d5da"/>
-            <text x="250" y="35" text-anchor="middle" fill="#d73a49" 
-                  font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
-                  font-size="14" font-weight="600">GitHub Token Error</text>
-            <text x="250" y="55" text-anchor="middle" fill="#586069" 
-                  font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
-                  font-size="12">Set GITHUB_TOKEN environment variable</text>
-            <text x="250" y="75" text-anchor="middle" fill="#586069" 
-                  font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
-                  font-size="11">Create token at github.com/settings/tokens</text>
-        </svg>'''
+    except ValueError:
+        return error_card("GitHub Token Error", "Set GITHUB_TOKEN environment variable", "Create token at github.com/settings/tokens")
+    try:
+        ranged = year is not None or bool(date_from or date_to)
+        contributions_data = await fetch_contributions_days(api, username, first_day, last_day, ranged)
+        key = fingerprint('contributions-graph', normalize_contributions_data(contributions_data, first_day, last_day), params)
+        render_cache.remember(card, key)
+        return render_cache.get_or_stream(key, lambda: iter_contributions_svg(
+            username, contributions_data, theme, text, line_color, line_alpha, square_size, animation_time, pause_time,
+            year, date_from, date_to))
     except Exception as e:
+        # GitHub failing: the graph as last served beats an error card
+        last_good = render_cache.last_good(card)
+        if last_good is not None:
+            return last_good
         # Other errors with more details
         error_msg = str(e)
         if "offset-naive and offset-aware" in error_msg:
@@ -465,17 +468,26 @@ async def generate_contributions_svg(username: str, theme: str = "light", text:
         else:
             error_msg = error_msg[:60] + "..." if len(error_msg) > 60 else error_msg
             
-        return f'''<svg width="500" height="100" xmlns="http://www.w3.org/2000/svg">
+        return error_card("Error generating contributions", error_msg, "Check username and token")
+
+def error_card(title: str, message: str, hint: str) -> RenderedSVG:
+    """Small card shown instead of the graph, with the problem and how to fix it"""
+    return RenderedSVG(None, encode_svg(f'''<svg width="500" height="100" xmlns="http://www.w3.org/2000/svg">
             <rect width="500" height="100" fill="#f6f8fa" stroke="#d1d5da"/>
             <text x="250" y="35" text-anchor="middle" fill="#d73a49" 
                   font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
-                  font-size="14" font-weight="600">Error generating contributions</text>
+                  font-size="14" font-weight="600">{title}</text>
             <text x="250" y="55" text-anchor="middle" fill="#586069" 
                   font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
-                  font-size="12">{error_msg}</text>
+                  font-size="12">{html.escape(message)}</text>
             <text x="250" y="75" text-anchor="middle" fill="#586069" 
                   font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
-                  font-size="11">Check username and token</text>
-        </svg>'''
+                  font-size="11">{hint}</text>
+        </svg>'''))
+
+async def generate_contributions_svg(username: str, theme: str = "light", text: str = "ADBREEKER", line_color: str = "#ff8c00", line_alpha: float = 0.7, square_size: int = 11, animation_time: float = 8.0, pause_time: float = 0.0, year: Optional[int] = None, date_from: Optional[str] = None, date_to: Optional[str] = None) -> str:
+    """Main function to generate contributions SVG"""
+    rendered = await render_contributions_svg(username, theme, text, line_color, line_alpha, square_size, animation_time, pause_time, year, date_from, date_to)
+    return rendered.text
 
 
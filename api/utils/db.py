@@ -1,5 +1,4 @@
 import os
-import psycopg2
 
 # Get Neon database connection URL from environment variable
 
@@ -7,6 +6,8 @@ import psycopg2
 def get_db_connection(connection_url=None):
     if connection_url is None:
         raise ValueError("Database connection URL must be provided either as an argument or via the environment variable.")
+    # Imported lazily so deployments without a database never load libpq
+    import psycopg2
     return psycopg2.connect(connection_url, sslmode='require')
 
 def get_or_create_user_views(db_conn, user: str) -> int:
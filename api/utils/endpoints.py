@@ -0,0 +1,172 @@
+"""
+Endpoint Parameters
+Query parameter parsing and validation for the SVG endpoints, shared by the
+serverless handlers (api/*.py) and the long-running server (server.py).
+
+Each parser takes parse_qs() output and returns the keyword arguments for the
+endpoint's render_* coroutine, raising ValueError for invalid values.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from .contributions_graph_generator import contributions_range
+
+# Usernames accepted in the `username` query parameter (comma-separated), or * for any user.
+# Unset, the parameter is disabled and every card shows GITHUB_USERNAME.
+ALLOWED_USERNAMES = {name.strip().lower() for name in os.getenv('ALLOWED_USERNAMES', '').split(',') if name.strip()}
+
+# GitHub login: alphanumerics and single inner hyphens, at most 39 characters
+USERNAME_PATTERN = re.compile(r'^[A-Za-z0-9](?:[A-Za-z0-9]|-(?=[A-Za-z0-9])){0,38}$')
+
+# Available slot options
+SLOT_OPTIONS = [
+    'stars', 'commits_total', 'commits_current_year', 'commits_6_months', 'pull_requests',
+    'code_reviews', 'issues', 'external_contributions'
+]
+
+# Available icon options
+ICON_OPTIONS = [
+    'user', 'github', 'streak', 'user+github',
+    'user+streak', 'github+streak'
+]
+
+# Available weightings of the top languages (see top_languages_generator.LANGUAGE_WEIGHTS)
+WEIGHT_OPTIONS = ['bytes', 'repos', 'recent', 'sqrt']
+
+def resolve_username(query_params: Dict[str, List[str]]) -> Optional[str]:
+    """User a card is rendered for: the `username` parameter (multi-user mode) or GITHUB_USERNAME.
+
+    Returns None if neither is available, i.e. the deployment isn't configured.
+    """
+    default = os.getenv('GITHUB_USERNAME')
+    username = query_params.get('username', [None])[0]
+    if not username:
+        if not default and ALLOWED_USERNAMES:
+            raise ValueError("Missing username parameter")
+        return default
+
+    if not USERNAME_PATTERN.match(username):
+        raise ValueError(f"Invalid username: {username}")
+    if default and username.lower() == default.lower():
+        return username
+    if not ALLOWED_USERNAMES:
+        raise ValueError("The username parameter is not enabled (set ALLOWED_USERNAMES)")
+    if '*' not in ALLOWED_USERNAMES and username.lower() not in ALLOWED_USERNAMES:
+        raise ValueError(f"Username not allowed: {username}")
+    return username
+
+def validate_theme(theme: str) -> str:
+    if theme not in ['light', 'dark']:
+        raise ValueError(f"Invalid theme: {theme}")
+    return theme
+
+def parse_account_general_params(query_params: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Parameters for render_account_general_svg"""
+    theme = validate_theme(query_params.get('theme', ['dark'])[0])
+    icon = query_params.get('icon', ['user'])[0]
+    animation_time = float(query_params.get('animation_time', ['8'])[0])
+    # Preserve None for missing slots
+    slots = [query_params.get(f'slot{i}', [None])[0] for i in range(1, 6)]
+
+    if icon not in ICON_OPTIONS:
+        raise ValueError(f"Invalid icon: {icon}")
+
+    if animation_time < 1 or animation_time > 30:
+        raise ValueError(f"Invalid animation_time: {animation_time}. Must be between 1 and 30 seconds.")
+
+    for i, slot_value in enumerate(slots, start=1):
+        if slot_value is not None and slot_value not in SLOT_OPTIONS:
+            raise ValueError(f"Invalid slot{i}: {slot_value}")
+
+    return {
+        'theme': theme,
+        'icon': icon,
+        'animation_time': animation_time,
+        'slots': slots,
+    }
+
+def parse_top_languages_params(query_params: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Parameters for render_top_languages_svg"""
+    theme = validate_theme(query_params.get('theme', ['dark'])[0])
+    languages_count = int(query_params.get('languages_count', [5])[0])
+    decimal_places = int(query_params.get('decimal_places', [1])[0])
+    count_other_languages = query_params.get('count_other_languages', ['false'])[0].lower() == 'true'
+    exclude_languages = query_params.get('exclude_languages', [''])[0].split(',') if query_params.get('exclude_languages', [''])[0] else []
+    exclude_repos = query_params.get('exclude_repos', [''])[0].split(',') if query_params.get('exclude_repos', [''])[0] else []
+    weight = query_params.get('weight', ['bytes'])[0]
+    width = int(query_params.get('width', [400])[0])
+    height = int(query_params.get('height', [300])[0])
+
+    if not (1 <= languages_count <= 20):
+        raise ValueError(f"Invalid languages_count: {languages_count}")
+
+    if not (0 <= decimal_places <= 5):
+        raise ValueError(f"Invalid decimal_places: {decimal_places}")
+
+    if weight not in WEIGHT_OPTIONS:
+        raise ValueError(f"Invalid weight: {weight}")
+
+    if not (200 <= width <= 1000):
+        raise ValueError(f"Invalid width: {width}")
+
+    if not (150 <= height <= 800):
+        raise ValueError(f"Invalid height: {height}")
+
+    return {
+        'theme': theme,
+        'languages_count': languages_count,
+        'decimal_places': decimal_places,
+        'count_other_languages': count_other_languages,
+        'exclude_languages': exclude_languages,
+        'width': width,
+        'height': height,
+        'exclude_repos': exclude_repos,
+        'weight': weight,
+    }
+
+def parse_contributions_graph_params(query_params: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Parameters for render_contributions_svg"""
+    theme = validate_theme(query_params.get('theme', ['dark'])[0])
+    text = query_params.get('text', ['ADBREEKER'])[0]
+    animation_time = float(query_params.get('animation_time', [8.0])[0])
+    pause_time = float(query_params.get('pause_time', [0.0])[0])
+    line_color = query_params.get('line_color', ['#ff8c00'])[0]
+    line_alpha = float(query_params.get('line_alpha', [0.7])[0])
+    square_size = int(query_params.get('square_size', [11])[0])
+    year = query_params.get('year', [None])[0]
+    year = int(year) if year else None
+    date_from = query_params.get('from', [None])[0] or None
+    date_to = query_params.get('to', [None])[0] or None
+
+    if not (0.0 <= line_alpha <= 1.0):
+        raise ValueError(f"Invalid line_alpha: {line_alpha}")
+
+    if square_size < 1 or square_size > 30:
+        raise ValueError(f"Invalid square_size: {square_size}")
+
+    # Raises InvalidContributionsRange (a ValueError) for a year or range the graph can't show
+    first_day, last_day = contributions_range(year, date_from, date_to)
+
+    return {
+        'theme': theme,
+        'text': text,
+        'animation_time': animation_time,
+        'pause_time': pause_time,
+        'line_color': line_color,
+        'line_alpha': line_alpha,
+        'square_size': square_size,
+        'year': year,
+        'date_from': first_day.isoformat() if date_from else None,
+        'date_to': last_day.isoformat() if date_to else None,
+    }
+
+def parse_views_counter_params(query_params: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Parameters for render_views_counter_svg (user_agent comes from the request headers)"""
+    theme = validate_theme(query_params.get('theme', ['dark'])[0])
+    animated = query_params.get('animated', ['true'])[0].lower() == 'true'
+    return {
+        'theme': theme,
+        'animated': animated,
+    }
@@ -0,0 +1,23 @@
+"""
+Environment Loading
+Loads a local .env file before any module reads its settings. Deployments configure
+the environment directly, so python-dotenv is not even imported there (it is on the
+cold-start path of every serverless function).
+"""
+
+import os
+
+_loaded = False
+
+def is_production() -> bool:
+    """True when running on Vercel (which sets VERCEL / VERCEL_ENV) or when LOAD_DOTENV=false"""
+    return bool(os.getenv('VERCEL') or os.getenv('VERCEL_ENV')) or os.getenv('LOAD_DOTENV', 'true').lower() == 'false'
+
+def load_local_env():
+    """Load .env once for local runs; no-op in production"""
+    global _loaded
+    if _loaded or is_production():
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+    _loaded = True
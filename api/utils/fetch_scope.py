@@ -0,0 +1,39 @@
+"""
+Request-Scoped Fetch Sharing
+Inside a fetch_scope() (e.g. one batch request), identical GitHub fetches made by
+several cards run once: the first caller starts the fetch, the others await the
+same task. Outside a scope every call fetches as before.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar('fetch_scope', default=None)
+
+@contextmanager
+def fetch_scope(**hints):
+    """Share fetches between all coroutines started inside the block; hints are readable via scope_hint()"""
+    token = _scope.set({'hints': hints, 'fetches': {}})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+def scope_hint(name: str, default: Any = None) -> Any:
+    """Return a hint given to the enclosing fetch_scope(), or default outside a scope"""
+    scope = _scope.get()
+    if scope is None:
+        return default
+    return scope['hints'].get(name, default)
+
+async def shared_fetch(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Await fetch(), or the already running fetch with the same key in the current scope"""
+    scope = _scope.get()
+    if scope is None:
+        return await fetch()
+    task = scope['fetches'].get(key)
+    if task is None:
+        task = scope['fetches'][key] = asyncio.ensure_future(fetch())
+    return await task
@@ -0,0 +1,245 @@
+"""
+GitHub GraphQL Client
+Shared request path of all generators. Requests are spread over a pool of tokens
+(GITHUB_TOKENS, plus GITHUB_TOKEN): every query asks for its rateLimit, and each
+request goes to the token with the most remaining points.
+
+When every token is exhausted, requests wait for the earliest reset if it is close
+(RATE_LIMIT_MAX_WAIT); otherwise RateLimitExceeded is raised, and the per-user
+cache serves the last fetched data instead (see user_cache.cached_fetch). The same
+happens while GitHub is unreachable or failing (see circuit_breaker).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .circuit_breaker import CircuitBreaker, UpstreamError
+from .http_session import client_session
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Longest wait (seconds) for a token's reset when all tokens are exhausted, before giving up
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', 5))
+
+# GraphQL points per hour of a token whose budget hasn't been seen yet
+DEFAULT_RATE_LIMIT = 5000
+
+class RateLimitExceeded(Exception):
+    """All tokens are out of GraphQL points until reset_at (epoch seconds)"""
+
+    def __init__(self, reset_at: float):
+        self.reset_at = reset_at
+        reset = datetime.fromtimestamp(reset_at, timezone.utc).strftime('%H:%M')
+        super().__init__(f"GitHub API rate limit exhausted until {reset} UTC")
+
+class TokenBudget:
+    """Known GraphQL budget and usage of one token"""
+
+    def __init__(self, token: str):
+        self.token = token
+        self.headers = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json',
+        }
+        self.limit = DEFAULT_RATE_LIMIT
+        self.remaining: Optional[int] = None  # Unknown until the first response
+        self.reset_at = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.cost = 0
+        self.rate_limited = 0
+
+    def headroom(self, now: float) -> int:
+        """Points this token can still spend, counting requests in flight"""
+        if self.remaining is None or self.reset_at <= now:
+            return self.limit - self.in_flight
+        return self.remaining - self.in_flight
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'token': f"...{self.token[-4:]}",
+            'remaining': self.remaining,
+            'limit': self.limit,
+            'reset_at': datetime.fromtimestamp(self.reset_at, timezone.utc).isoformat() if self.reset_at else None,
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'cost': self.cost,
+            'rate_limited': self.rate_limited,
+        }
+
+class TokenPool:
+    """Routes requests to the token with the most headroom and tracks each token's budget"""
+
+    def __init__(self, tokens: List[str]):
+        self.budgets = [TokenBudget(token) for token in dict.fromkeys(tokens)]
+        self._lock = threading.Lock()
+
+    def acquire(self, exclude=()) -> TokenBudget:
+        """Reserve the token with the most headroom, or raise RateLimitExceeded if none has any"""
+        now = time.time()
+        with self._lock:
+            candidates = [budget for budget in self.budgets if budget not in exclude]
+            best = max(candidates, key=lambda budget: budget.headroom(now), default=None)
+            if best is None or best.headroom(now) <= 0:
+                if any(budget.headroom(now) + budget.in_flight > 0 for budget in candidates):
+                    # The points left are only reserved by requests in flight, which may not need them all
+                    raise RateLimitExceeded(now)
+                waiting = [budget.reset_at for budget in candidates] or [budget.reset_at for budget in self.budgets]
+                raise RateLimitExceeded(min(waiting))
+            best.in_flight += 1
+            best.requests += 1
+            return best
+
+    def release(self, budget: TokenBudget):
+        with self._lock:
+            budget.in_flight -= 1
+
+    def record(self, budget: TokenBudget, rate_limit: Dict[str, Any]):
+        """Update a token's budget from a response's rateLimit selection"""
+        with self._lock:
+            budget.cost += rate_limit.get('cost') or 0
+            if rate_limit.get('remaining') is not None:
+                budget.remaining = rate_limit['remaining']
+            if rate_limit.get('resetAt'):
+                budget.reset_at = datetime.fromisoformat(rate_limit['resetAt'].replace('Z', '+00:00')).timestamp()
+
+    def record_headers(self, budget: TokenBudget, headers) -> bool:
+        """Update a token's budget from X-RateLimit-* response headers; returns whether it is exhausted"""
+        with self._lock:
+            if headers.get('X-RateLimit-Limit'):
+                budget.limit = int(headers['X-RateLimit-Limit'])
+            if headers.get('X-RateLimit-Remaining'):
+                budget.remaining = int(headers['X-RateLimit-Remaining'])
+            if headers.get('X-RateLimit-Reset'):
+                budget.reset_at = float(headers['X-RateLimit-Reset'])
+            return budget.remaining == 0
+
+    def exhaust(self, budget: TokenBudget, retry_after: Optional[float] = None):
+        """Take a token out of rotation after GitHub rejected it for rate limiting"""
+        with self._lock:
+            budget.rate_limited += 1
+            budget.remaining = 0
+            if retry_after is not None:
+                budget.reset_at = max(budget.reset_at, time.time() + retry_after)
+            elif budget.reset_at <= time.time():
+                budget.reset_at = time.time() + 60
+
+    async def wait_for_token(self, exclude=()) -> TokenBudget:
+        """acquire(), waiting up to RATE_LIMIT_MAX_WAIT for a reset when all tokens are exhausted"""
+        while True:
+            try:
+                return self.acquire(exclude)
+            except RateLimitExceeded as e:
+                delay = e.reset_at - time.time()
+                if delay > RATE_LIMIT_MAX_WAIT:
+                    raise
+                await asyncio.sleep(max(delay, 0.05))
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [budget.metrics() for budget in self.budgets]
+
+_token_pool: Optional[TokenPool] = None
+
+def token_pool() -> TokenPool:
+    """The process-wide token pool, built from GITHUB_TOKENS and GITHUB_TOKEN on first use"""
+    global _token_pool
+    if _token_pool is None:
+        tokens = [token.strip() for token in os.getenv('GITHUB_TOKENS', '').split(',') if token.strip()]
+        if os.getenv('GITHUB_TOKEN'):
+            tokens.append(os.getenv('GITHUB_TOKEN'))
+        _token_pool = TokenPool(tokens)
+    return _token_pool
+
+# Cheapest query answered by GitHub, to probe whether it is back
+GRAPHQL_PROBE_QUERY = "query { rateLimit { cost remaining resetAt } }"
+
+async def _probe_graphql():
+    try:
+        await _send_graphql(GRAPHQL_PROBE_QUERY, {})
+    except RateLimitExceeded:
+        # Out of points, but answering
+        pass
+
+graphql_circuit = CircuitBreaker('GitHub GraphQL API', _probe_graphql)
+
+async def graphql_request(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """POST a GraphQL query and return the response JSON.
+
+    Queries should select `rateLimit { cost remaining resetAt }`; it is moved from
+    the returned data to the top level of the result and used to track the token's budget.
+    While GitHub keeps failing, CircuitOpen is raised without calling it.
+    """
+    graphql_circuit.check()
+    try:
+        result = await _send_graphql(query, variables)
+    except UpstreamError:
+        graphql_circuit.record_failure()
+        raise
+    graphql_circuit.record_success()
+    return result
+
+async def _send_graphql(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """graphql_request() without the circuit breaker; failures to get an answer raise UpstreamError"""
+    # Imported on first use, like the session itself (see http_session)
+    import aiohttp
+
+    pool = token_pool()
+    rejected = set()
+    while True:
+        budget = await pool.wait_for_token(rejected)
+        try:
+            async with client_session() as session:
+                async with session.post(GITHUB_GRAPHQL_URL, headers=budget.headers,
+                                        json={"query": query, "variables": variables}) as response:
+                    exhausted = pool.record_headers(budget, response.headers)
+                    if response.status in (403, 429) and (exhausted or 'Retry-After' in response.headers):
+                        # Rate limited: retry on another token
+                        retry_after = response.headers.get('Retry-After')
+                        pool.exhaust(budget, float(retry_after) if retry_after else None)
+                        rejected.add(budget)
+                        if len(rejected) < len(pool.budgets):
+                            continue
+                        raise RateLimitExceeded(min(b.reset_at for b in pool.budgets))
+                    if response.status >= 500:
+                        raise UpstreamError(f"GraphQL API error: {response.status}")
+                    if response.status != 200:
+                        raise Exception(f"GraphQL API error: {response.status}")
+                    result = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise UpstreamError(f"GitHub unreachable: {e or type(e).__name__}") from e
+        finally:
+            pool.release(budget)
+
+        rate_limit = (result.get('data') or {}).pop('rateLimit', None)
+        if rate_limit:
+            pool.record(budget, rate_limit)
+            result['rateLimit'] = rate_limit
+        return result
+
+async def iter_pages(fetch_page: Callable[[Optional[str]], Awaitable[Dict[str, Any]]],
+                     first_page: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the pages of a cursor-paginated connection, fetched by fetch_page(cursor).
+
+    Each page must select `pageInfo { hasNextPage endCursor }`. The next page is
+    requested as soon as a page arrives, so it is in flight while the caller
+    aggregates the current one; pages are not kept after they are yielded.
+    """
+    page = first_page if first_page is not None else await fetch_page(None)
+    while True:
+        info = page['pageInfo']
+        next_page = asyncio.ensure_future(fetch_page(info['endCursor'])) if info['hasNextPage'] else None
+        try:
+            yield page
+        except BaseException:
+            # The caller stopped early: the prefetched page is not needed
+            if next_page is not None:
+                next_page.cancel()
+            raise
+        if next_page is None:
+            return
+        page = await next_page
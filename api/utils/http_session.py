@@ -0,0 +1,30 @@
+"""
+Shared HTTP Session
+The serverless handlers run every request on a fresh event loop, so each GitHub call
+opens (and closes) its own aiohttp session. The long-running server installs one
+pooled session at startup, which all generators then reuse across requests.
+"""
+
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
+
+_shared_session: Optional["aiohttp.ClientSession"] = None
+
+def set_shared_session(session: Optional["aiohttp.ClientSession"]):
+    """Install (or with None, remove) the session reused by all outgoing requests"""
+    global _shared_session
+    _shared_session = session
+
+@asynccontextmanager
+async def client_session() -> AsyncIterator["aiohttp.ClientSession"]:
+    """Yield the shared session when one is installed, otherwise a short-lived session"""
+    if _shared_session is not None and not _shared_session.closed:
+        yield _shared_session
+        return
+    # Imported on first use: aiohttp is the most expensive import on the cold-start path
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        yield session
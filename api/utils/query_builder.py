@@ -0,0 +1,45 @@
+"""
+GraphQL Query Builder
+Assembles queries from only the selections a request needs (e.g. the stats of the
+requested slots), instead of fixed queries that fetch every field any card uses.
+
+Query text is cached per shape, so each combination of slots, icon and options is
+built once per process; values that change between requests (dates) are passed as
+variables rather than being written into the query.
+"""
+
+import re
+from functools import lru_cache
+from typing import Tuple
+
+# GraphQL types of the variables used by the generators' selections
+VARIABLE_TYPES = {
+    'login': 'String!',
+    'currentYearStart': 'DateTime!',
+    'sixMonthsAgo': 'DateTime!',
+    'cursor': 'String',
+    'ids': '[ID!]!',
+}
+
+# Number of query shapes kept in memory
+QUERY_CACHE_SIZE = 256
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def build_query(operation: str, root: str, selections: Tuple[str, ...]) -> str:
+    """Query for `selections` of a root field (e.g. `nodes(ids: $ids)`), declaring only the variables used"""
+    body = '\n'.join(selections)
+    variables = ', '.join(
+        f'${name}: {type_}' for name, type_ in VARIABLE_TYPES.items()
+        if re.search(rf'\${name}\b', root + body)
+    )
+    indented = '\n'.join('    ' + line for line in body.splitlines())
+    return f"""query {operation}({variables}) {{
+  rateLimit {{ cost remaining resetAt }}
+  {root} {{
+{indented}
+  }}
+}}"""
+
+def build_user_query(operation: str, selections: Tuple[str, ...]) -> str:
+    """Query for `selections` of user(login: $login)"""
+    return build_query(operation, 'user(login: $login)', selections)
@@ -0,0 +1,270 @@
+"""
+Rendered SVG Output Cache
+Keeps encoded SVG documents in memory, keyed by a fingerprint of the normalised
+input data plus the canonical query parameters, so unchanged cards are never re-rendered.
+The fingerprint also covers RENDER_VERSION and the SVG output settings, as it is the
+documents' strong ETag: bytes rendered differently must not share it.
+Compressed variants of a body are stored next to it, so each one is compressed only once.
+On a miss the document can be streamed to the client while it is rendered (PendingSVG)
+and is stored once the last fragment has been produced.
+
+The cache is bounded by the total size of the stored bodies and evicts the
+least recently used entries first.
+
+It also remembers the document last served for each card (user + parameters), so
+that a card can still be served while GitHub is failing (see last_good).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+from . import svg_output
+from .compression import compress, stream_compressor
+from .svg_output import encode_svg
+
+# Upper bound for all cached SVG bodies (bytes)
+RENDER_CACHE_MAX_BYTES = int(os.getenv('RENDER_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+# Number of cards whose last served document is remembered
+LAST_GOOD_MAX_CARDS = 4096
+
+# Bump whenever a change to a generator changes the documents it renders for the same data and
+# parameters, so clients holding the previous ones don't get a 304 for them
+RENDER_VERSION = 1
+
+def fingerprint(kind: str, data: Any, params: Dict[str, Any]) -> str:
+    """Hash the normalised input data and canonicalised parameters of a card, with the render version
+    and output settings, into a cache key"""
+    output = [RENDER_VERSION, svg_output.SVG_COMPACT, svg_output.SVG_PRECISION]
+    payload = json.dumps([output, kind, data, params], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def card_fingerprint(kind: str, username: str, params: Dict[str, Any]) -> str:
+    """Hash a card's user and canonicalised parameters (without its data), to find its last served document"""
+    return fingerprint(f'{kind}-card', username.lower(), params)
+
+class RenderedSVG:
+    """Encoded SVG document, ready to be written to the response stream"""
+
+    __slots__ = ('key', 'body', 'variants')
+
+    def __init__(self, key: Optional[str], body: bytes):
+        self.key = key  # None for documents that must not be cached (e.g. error cards)
+        self.body = body
+        self.variants: Dict[str, bytes] = {}  # Compressed bodies by content-coding
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(variant) for variant in self.variants.values())
+
+    def encoded(self, encoding: str) -> bytes:
+        """Return the body in the given content-coding, compressing it only once"""
+        if encoding == 'identity':
+            return self.body
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = compress(self.body, encoding)
+            self.variants[encoding] = variant
+        return variant
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8')
+
+    def etag(self, encoding: str = 'identity') -> str:
+        """Strong ETag for the given content-coding of this document"""
+        # The cache key already fingerprints data + parameters; uncached documents hash their content
+        tag = (self.key or hashlib.sha256(self.body).hexdigest())[:32]
+        if encoding != 'identity':
+            tag = f"{tag}-{encoding}"
+        return f'"{tag}"'
+
+class PendingSVG:
+    """SVG being rendered for a cache miss - streamed fragment by fragment or materialised on demand
+
+    Only a document rendered to its end is stored in the cache. After a stream that was
+    too large to keep or that stopped partway, the document is rendered again from
+    render() when it is needed as a whole.
+    """
+
+    def __init__(self, cache: "RenderCache", key: str, render: Callable[[], Iterable[str]]):
+        self.cache = cache
+        self.key = key
+        self._render = render
+        self._entry: Optional[RenderedSVG] = None
+
+    def etag(self, encoding: str = 'identity') -> str:
+        """Strong ETag, available before rendering since it only depends on the key"""
+        tag = self.key[:32] if encoding == 'identity' else f"{self.key[:32]}-{encoding}"
+        return f'"{tag}"'
+
+    def stream(self, encoding: str = 'identity') -> Iterator[bytes]:
+        """Render and yield the document in the given content-coding, caching it when complete"""
+        if self._entry is not None:
+            yield self.cache.encoded(self._entry, encoding)
+            return
+
+        compressor = stream_compressor(encoding)
+        body_parts, compressed_parts = [], []
+        collected = 0
+        for fragment in self._render():
+            data = encode_svg(fragment)
+            if not data:
+                continue
+            # Keep the body only while it can still fit into the cache
+            collected += len(data)
+            if collected <= self.cache.max_bytes:
+                body_parts.append(data)
+            if compressor is None:
+                yield data
+            else:
+                chunk = compressor.compress(data)
+                if chunk:
+                    compressed_parts.append(chunk)
+                    yield chunk
+        if compressor is not None:
+            chunk = compressor.flush()
+            compressed_parts.append(chunk)
+            yield chunk
+
+        if collected <= self.cache.max_bytes:
+            variants = {encoding: b''.join(compressed_parts)} if compressor is not None else {}
+            self._entry = self.cache.store(self.key, b''.join(body_parts), variants)
+
+    def materialize(self) -> RenderedSVG:
+        """Render the whole document at once and store it in the cache"""
+        if self._entry is None:
+            self._entry = self.cache.store(self.key, b''.join(encode_svg(fragment) for fragment in self._render()))
+        return self._entry
+
+    @property
+    def body(self) -> bytes:
+        return self.materialize().body
+
+    @property
+    def size(self) -> int:
+        return self.materialize().size
+
+    @property
+    def text(self) -> str:
+        return self.materialize().text
+
+class RenderCache:
+    """Byte-bounded LRU cache of RenderedSVG entries"""
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, RenderedSVG]" = OrderedDict()
+        self._bytes = 0
+        # card fingerprint -> key of the document last served for it
+        self._last_good: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[RenderedSVG]:
+        """Return the cached entry for key (marking it as recently used) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, svg: str) -> RenderedSVG:
+        """Compact, encode and store a rendered SVG"""
+        return self.store(key, encode_svg(svg))
+
+    def store(self, key: str, body: bytes, variants: Optional[Dict[str, bytes]] = None) -> RenderedSVG:
+        """Store an encoded body (and compressed variants), evicting least recently used entries if needed"""
+        entry = RenderedSVG(key, body)
+        entry.variants.update(variants or {})
+        if entry.size > self.max_bytes:
+            return entry
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return entry
+
+    def encoded(self, entry: Union[RenderedSVG, PendingSVG], encoding: str) -> bytes:
+        """Return entry's body in the given content-coding, keeping the compressed variant in the cache"""
+        if isinstance(entry, PendingSVG):
+            entry = entry.materialize()
+        if encoding == 'identity' or encoding in entry.variants:
+            return entry.encoded(encoding)
+
+        # Compress outside the lock, then attach the variant and account for its size
+        variant = compress(entry.body, encoding)
+        with self._lock:
+            existing = entry.variants.get(encoding)
+            if existing is not None:
+                return existing
+            entry.variants[encoding] = variant
+            # Only account for entries that are still cached (not evicted or uncacheable)
+            if entry.key is not None and self._entries.get(entry.key) is entry:
+                self._bytes += len(variant)
+                while self._bytes > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= evicted.size
+        return variant
+
+    def get_or_render(self, key: str, render: Callable[[], str]) -> RenderedSVG:
+        """Return the cached entry for key, rendering and storing it on a miss"""
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, render())
+        return entry
+
+    def get_or_stream(self, key: str, render: Callable[[], Iterable[str]]) -> Union[RenderedSVG, PendingSVG]:
+        """Return the cached entry for key, or a PendingSVG that renders (and stores) the fragments on a miss"""
+        entry = self.get(key)
+        if entry is None:
+            return PendingSVG(self, key, render)
+        return entry
+
+    def remember(self, card: str, key: str):
+        """Record key as the document last served for a card (see card_fingerprint)"""
+        with self._lock:
+            self._last_good[card] = key
+            self._last_good.move_to_end(card)
+            while len(self._last_good) > LAST_GOOD_MAX_CARDS:
+                self._last_good.popitem(last=False)
+
+    def last_good(self, card: str) -> Optional[RenderedSVG]:
+        """The document last served for a card, if it is still cached"""
+        with self._lock:
+            key = self._last_good.get(card)
+            return self._entries.get(key) if key is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._last_good.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+# Shared cache used by all SVG generators
+render_cache = RenderCache()
@@ -0,0 +1,176 @@
+"""
+SVG Response Helpers
+Shared response writing for the SVG (and batch JSON) endpoint handlers: content-coding negotiation,
+ETag / If-None-Match handling and per-endpoint Cache-Control policies, with
+compressed bodies served from the render cache.
+
+Cache misses on HTTP/1.1 requests are streamed with chunked transfer encoding while
+the SVG is being rendered, so the first bytes leave before the document is complete.
+"""
+
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .compression import COMPRESSION_MIN_BYTES, compress, negotiate_encoding
+from .render_cache import PendingSVG, RenderedSVG, render_cache
+
+# Stream cache misses with chunked transfer encoding (set SVG_STREAMING=false to always send Content-Length)
+SVG_STREAMING = os.getenv('SVG_STREAMING', 'true').lower() == 'true'
+
+# Rendered bytes are buffered up to this size before a chunk is written
+STREAM_CHUNK_BYTES = 16 * 1024
+
+# Default Cache-Control per endpoint, overridable with CACHE_CONTROL_<ENDPOINT> environment variables
+# (e.g. CACHE_CONTROL_TOP_LANGUAGES="public, max-age=300, stale-while-revalidate=3600")
+CACHE_POLICIES = {
+    # Always revalidate, but let clients keep the body so unchanged cards come back as 304
+    'account-general': 'no-cache',
+    'top-languages': 'no-cache',
+    'contributions-graph': 'no-cache',
+    # Every view has to reach the server to be counted
+    'views-counter': 'max-age=0, no-cache, no-store, must-revalidate',
+}
+
+class ChunkedWriter:
+    """Buffered HTTP/1.1 chunked transfer-encoding writer over a handler's wfile"""
+
+    def __init__(self, wfile, chunk_size: int = STREAM_CHUNK_BYTES):
+        self.wfile = wfile
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def write(self, data: bytes):
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(self._buffer), bytes(self._buffer)))
+            self._buffer.clear()
+        self.wfile.flush()
+
+    def close(self):
+        """Write any buffered data and the terminating zero-length chunk"""
+        self.flush()
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+def cache_policy(endpoint: str) -> str:
+    """Return the Cache-Control header value configured for an endpoint"""
+    env_name = 'CACHE_CONTROL_' + endpoint.upper().replace('-', '_')
+    return os.getenv(env_name) or CACHE_POLICIES.get(endpoint, 'no-cache')
+
+def etag_matches(if_none_match: Optional[str], rendered: Union[RenderedSVG, PendingSVG], encoding: str) -> bool:
+    """Check an If-None-Match header against the document's ETags (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    current = {rendered.etag('identity'), rendered.etag(encoding)}
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag in current:
+            return True
+    return False
+
+def can_stream(handler, rendered: Union[RenderedSVG, PendingSVG]) -> bool:
+    """Chunked streaming needs a cache miss and an HTTP/1.1 client"""
+    return SVG_STREAMING and isinstance(rendered, PendingSVG) and handler.request_version == 'HTTP/1.1'
+
+def prepare_svg_response(request_headers, rendered: Union[RenderedSVG, PendingSVG], endpoint: str,
+                         extra_headers: Optional[Dict[str, str]] = None, streaming: bool = False
+                         ) -> Tuple[int, List[Tuple[str, str]], Union[bytes, Iterator[bytes]]]:
+    """Build (status, headers, body) for a rendered SVG independently of the HTTP server in use
+
+    With streaming the body is an iterator of encoded chunks and no Content-Length is set;
+    the caller is responsible for the transfer framing.
+    """
+    # A streamed body's size is unknown up front; SVG cards are well above the compression threshold
+    body_size = COMPRESSION_MIN_BYTES if streaming else len(rendered.body)
+    encoding = negotiate_encoding(request_headers.get('Accept-Encoding'), body_size)
+    etag = rendered.etag(encoding)
+
+    if etag_matches(request_headers.get('If-None-Match'), rendered, encoding):
+        return 304, [
+            ('Access-Control-Allow-Origin', '*'),
+            ('Cache-Control', cache_policy(endpoint)),
+            ('ETag', etag),
+            ('Vary', 'Accept-Encoding'),
+        ], b''
+
+    headers = [
+        ('Content-type', 'image/svg+xml'),
+        ('Access-Control-Allow-Origin', '*'),
+        ('Cache-Control', cache_policy(endpoint)),
+    ]
+    headers.extend((extra_headers or {}).items())
+    headers.append(('ETag', etag))
+    headers.append(('Vary', 'Accept-Encoding'))
+    if encoding != 'identity':
+        headers.append(('Content-Encoding', encoding))
+
+    if streaming:
+        return 200, headers, rendered.stream(encoding)
+
+    body = render_cache.encoded(rendered, encoding)
+    headers.append(('Content-Length', str(len(body))))
+    return 200, headers, body
+
+def prepare_json_response(request_headers, payload, status: int = 200) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """Build (status, headers, body) for a JSON response, compressed when the client accepts it"""
+    body = json.dumps(payload).encode('utf-8')
+    encoding = negotiate_encoding(request_headers.get('Accept-Encoding'), len(body))
+    body = compress(body, encoding)
+    headers = [
+        ('Content-type', 'application/json'),
+        ('Access-Control-Allow-Origin', '*'),
+        ('Cache-Control', 'no-cache'),
+        ('Vary', 'Accept-Encoding'),
+    ]
+    if encoding != 'identity':
+        headers.append(('Content-Encoding', encoding))
+    headers.append(('Content-Length', str(len(body))))
+    return status, headers, body
+
+def send_svg(handler, rendered: Union[RenderedSVG, PendingSVG], endpoint: str, extra_headers: Optional[Dict[str, str]] = None):
+    """Write a rendered SVG to a BaseHTTPRequestHandler, honouring conditional requests and Accept-Encoding"""
+    streaming = can_stream(handler, rendered)
+    status, headers, body = prepare_svg_response(handler.headers, rendered, endpoint, extra_headers, streaming)
+
+    if status == 200 and streaming:
+        # Chunked encoding is HTTP/1.1 only; the connection is closed after the response
+        handler.protocol_version = 'HTTP/1.1'
+        handler.close_connection = True
+        headers += [('Transfer-Encoding', 'chunked'), ('Connection', 'close')]
+
+    handler.send_response(status)
+    for name, value in headers:
+        handler.send_header(name, value)
+    handler.end_headers()
+    handler.response_started = True
+
+    if status != 200:
+        return
+    if streaming:
+        writer = ChunkedWriter(handler.wfile)
+        try:
+            for chunk in body:
+                writer.write(chunk)
+        except Exception as e:
+            # The status line is out, so there's no error response to send anymore: the missing
+            # terminating chunk tells the client the body is incomplete, and the connection is closed
+            print(f"Streaming the {endpoint} SVG failed after the response started: {e}")
+            handler.close_connection = True
+            return
+        writer.close()
+    else:
+        handler.wfile.write(body)
+
+def response_started(handler) -> bool:
+    """Whether send_svg already sent the status line, after which no error response can follow"""
+    return getattr(handler, 'response_started', False)
@@ -0,0 +1,76 @@
+"""
+SVG Output Stage
+Compacts generated SVG documents before they are cached and sent: drops comments and
+insignificant whitespace, and rounds long decimal numbers in attribute values.
+
+The generators keep their readable triple-quoted templates; this stage is applied
+once per rendered document by the render cache.
+"""
+
+import os
+import re
+
+# Compact generated SVGs (set SVG_COMPACT=false to debug the raw templates)
+SVG_COMPACT = os.getenv('SVG_COMPACT', 'true').lower() == 'true'
+
+# Decimal places kept for numbers in attribute values (3 keeps keyTimes exact)
+SVG_PRECISION = int(os.getenv('SVG_PRECISION', 3))
+
+COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.DOTALL)
+TOKEN_PATTERN = re.compile(r'(<[^>]*>)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+TAG_END_PATTERN = re.compile(r'\s+(/?>)$')
+ATTRIBUTE_PATTERN = re.compile(r'="([^"]*)"')
+DECIMAL_PATTERN = re.compile(r'-?\d*\.\d+')
+
+def round_decimal(match: re.Match, precision: int) -> str:
+    """Round one decimal number, dropping trailing zeros (63.33333333333333 -> 63.333, 756.0 -> 756)"""
+    number = match.group(0)
+    rounded = f"{float(number):.{precision}f}"
+    if '.' in rounded:
+        rounded = rounded.rstrip('0').rstrip('.')
+    if rounded in ('-0', ''):
+        rounded = '0'
+    # Path data separates numbers by their sign or leading point alone ("1.229-.39", "17.125.9");
+    # a number that lost them needs a space to stay apart from its neighbours
+    value, start, end = match.string, match.start(), match.end()
+    if start > 0 and (value[start - 1].isdigit() or value[start - 1] == '.') and rounded[0].isdigit():
+        rounded = ' ' + rounded
+    if '.' not in rounded and value.startswith('.', end):
+        rounded += ' '
+    # Keep the shorter spelling (e.g. ".5" stays as written)
+    return rounded if len(rounded) < len(number) else number
+
+def compact_tag(tag: str, precision: int) -> str:
+    """Collapse whitespace inside a tag and round numbers in its attribute values"""
+    tag = TAG_END_PATTERN.sub(r'\1', WHITESPACE_PATTERN.sub(' ', tag))
+    if precision >= 0 and '.' in tag:
+        tag = ATTRIBUTE_PATTERN.sub(
+            lambda attribute: '="' + DECIMAL_PATTERN.sub(lambda m: round_decimal(m, precision), attribute.group(1)) + '"',
+            tag
+        )
+    return tag
+
+def compact_svg(svg: str, precision: int = None) -> str:
+    """Strip comments and insignificant whitespace and round coordinates to the given precision"""
+    if precision is None:
+        precision = SVG_PRECISION
+
+    parts = []
+    for token in TOKEN_PATTERN.split(COMMENT_PATTERN.sub('', svg)):
+        if not token:
+            continue
+        if token[0] == '<':
+            parts.append(compact_tag(token, precision))
+        else:
+            # SVG collapses whitespace in text content by default, so runs and edges are insignificant
+            text = WHITESPACE_PATTERN.sub(' ', token).strip()
+            if text:
+                parts.append(text)
+    return ''.join(parts)
+
+def encode_svg(svg: str) -> bytes:
+    """Final output stage for all generators: compact (unless disabled) and UTF-8 encode"""
+    if SVG_COMPACT:
+        svg = compact_svg(svg)
+    return svg.encode('utf-8')
@@ -0,0 +1,54 @@
+"""
+Text metrics for the card font
+Advance widths of the printable ASCII characters in Helvetica/Arial (the metric-compatible
+fonts the cards' font-family stack resolves to outside Apple and Windows system UIs), in
+1/1000 em, so labels can be measured instead of estimated from their length.
+"""
+
+# Printable ASCII, in the order of the width tables below
+_CHARACTERS = ''.join(chr(code) for code in range(32, 127))
+
+# Regular weight (400-500)
+_REGULAR_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,  # space to /
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,  # 0 to ?
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,  # @ to O
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,  # P to _
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,  # ` to o
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,  # p to ~
+]
+
+# Bold weight (600-700)
+_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,  # space to /
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,  # 0 to ?
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,  # @ to O
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,  # P to _
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,  # ` to o
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,  # p to ~
+]
+
+ADVANCE_WIDTHS = dict(zip(_CHARACTERS, _REGULAR_WIDTHS))
+BOLD_ADVANCE_WIDTHS = dict(zip(_CHARACTERS, _BOLD_WIDTHS))
+
+# Characters outside the tables: a no-break space is a space, emoji take a full em,
+# anything else (accented letters, CJK) is measured as a wide letter
+NO_BREAK_SPACE_WIDTH = 278
+EMOJI_WIDTH = 1000
+DEFAULT_WIDTH = 667
+
+def text_width(text: str, font_size: float, bold: bool = False) -> float:
+    """Rendered width (px) of text at font_size in the card font"""
+    widths = BOLD_ADVANCE_WIDTHS if bold else ADVANCE_WIDTHS
+    total = 0
+    for char in text:
+        width = widths.get(char)
+        if width is None:
+            if char == '\u00a0':
+                width = NO_BREAK_SPACE_WIDTH
+            elif ord(char) >= 0x1F000:
+                width = EMOJI_WIDTH
+            else:
+                width = DEFAULT_WIDTH
+        total += width
+    return total * font_size / 1000
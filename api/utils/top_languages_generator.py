@@ -3,22 +3,53 @@ GitHub Top Languages SVG Generator - GraphQL Implementation
 Creates an SVG representation of GitHub top languages with percentages
 Uses GraphQL for much faster data fetching compared to REST API
 """
-import aiohttp
 import asyncio
 import math
-import os
-from typing import Dict, List, Tuple
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# GitHub GraphQL API endpoint
-GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+from .github_client import graphql_request, iter_pages, token_pool
+from .query_builder import build_query, build_user_query
+from .render_cache import PendingSVG, RenderedSVG, card_fingerprint, fingerprint, render_cache
+from .svg_output import encode_svg
+from .text_metrics import text_width
+from .user_cache import cached_fetch, user_cache
 
 # Default color for unknown languages or when GitHub API doesn't provide a color
 DEFAULT_LANGUAGE_COLOR = "#858585"
 
+# Language edges fetched per repository. Always the full count, whatever a card shows:
+# a language can be small in every repository and still lead the totals
+MAX_LANGUAGE_EDGES = 10
+
+# Repositories per targeted languages query (GitHub's limit for nodes(ids:))
+LANGUAGE_FETCH_BATCH = 100
+
+# Cheap listing of the repositories, to find the ones pushed since their languages were fetched
+REPOSITORIES_SELECTION = """repositories(ownerAffiliations: OWNER, isFork: false, first: 100, after: $cursor) {
+  pageInfo {
+    hasNextPage
+    endCursor
+  }
+  nodes {
+    id
+    name
+    pushedAt
+  }
+}"""
+
+# Half-life (days since the last push) of a repository's weight in the `recent` weighting
+RECENCY_HALF_LIFE_DAYS = 365
+
+# Weight of one repository/language cell (size in bytes, days since the repository was pushed) per weighting mode
+LANGUAGE_WEIGHTS = {
+    'bytes': lambda size, age: size,
+    'repos': lambda size, age: 1,
+    'recent': lambda size, age: size * 0.5 ** (age / RECENCY_HALF_LIFE_DAYS),
+    'sqrt': lambda size, age: math.sqrt(size),
+}
+
 # SVG Themes
 THEMES = {
     "light": {
@@ -39,65 +70,172 @@ THEMES = {
 
 class GitHubLanguagesGraphQL:
     def __init__(self):
-        self.token = os.getenv('GITHUB_TOKEN')
-        if not self.token:
+        if not token_pool().budgets:
             raise ValueError("No GitHub token found in environment variables")
     
-    async def fetch_top_languages_graphql(self, username: str, exclude_repos: List[str] = None) -> Dict:
-        """Fetch top languages using GraphQL - much faster than REST API"""
-        if exclude_repos is None:
-            exclude_repos = []
-            
-        # GraphQL query based on github-readme-stats implementation
-        query = """
-        query userInfo($login: String!) {
-          user(login: $login) {
-            repositories(ownerAffiliations: OWNER, isFork: false, first: 100) {
-              nodes {
-                name
-                languages(first: 10, orderBy: {field: SIZE, direction: DESC}) {
-                  edges {
-                    size
-                    node {
-                      color
-                      name
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
+    async def _graphql(self, username: str, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Make a GraphQL request with error handling"""
+        data = await graphql_request(query, variables)
+        
+        if 'errors' in data:
+            error_msg = data['errors'][0].get('message', 'GraphQL error')
+            if 'NOT_FOUND' in str(data['errors'][0]):
+                raise Exception(f"User '{username}' not found")
+            raise Exception(f"GraphQL error: {error_msg}")
+        
+        return data['data']
+    
+    async def fetch_repository_languages(self, username: str, repo_ids: List[str]) -> Dict[str, Dict[str, List]]:
+        """Fetch the language breakdowns (see language_breakdown) of repositories by node id"""
+        query = build_query('repositoryLanguages', 'nodes(ids: $ids)', (f"""... on Repository {{
+  id
+  languages(first: {MAX_LANGUAGE_EDGES}, orderBy: {{field: SIZE, direction: DESC}}) {{
+    edges {{
+      size
+      node {{
+        color
+        name
+      }}
+    }}
+  }}
+}}""",))
+        data = await self._graphql(username, query, {"ids": repo_ids})
+        return {node['id']: language_breakdown(node) for node in data['nodes'] if node}
+    
+    async def fetch_top_languages_graphql(self, username: str) -> Dict[str, Any]:
         """
+        Fetch the language matrix (see language_matrix) of all repositories using GraphQL - much faster than REST API.
         
-        variables = {"login": username}
+        Each repository's language breakdown is kept per (repo id, pushedAt): a cheap
+        listing of the repositories finds the ones pushed since the last fetch, only
+        their languages are fetched, and the byte totals are updated by the difference.
+        """
+        # Breakdowns from the last fetch are still valid for repositories that weren't pushed since
+        state_key = ('repo-languages', username)
+        previous = user_cache.get(username, state_key, stale=True) or {'repos': {}, 'totals': {}}
+        list_query = build_user_query('userRepositories', (REPOSITORIES_SELECTION,))
+        
+        async def fetch_page(cursor: str) -> Dict[str, Any]:
+            data = await self._graphql(username, list_query, {"login": username, "cursor": cursor})
+            return data['user']['repositories']
         
-        headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json',
-        }
+        repos, changed, fetches = {}, [], []
+        try:
+            async for page in iter_pages(fetch_page):
+                for node in page['nodes']:
+                    cached = previous['repos'].get(node['id'])
+                    if cached is not None and cached['pushedAt'] == node['pushedAt']:
+                        repos[node['id']] = cached if cached['name'] == node['name'] else dict(cached, name=node['name'])
+                    else:
+                        repos[node['id']] = {'name': node['name'], 'pushedAt': node['pushedAt'], 'languages': {}}
+                        changed.append(node['id'])
+                # Languages of changed repositories are fetched while the next page is listed
+                while len(changed) >= LANGUAGE_FETCH_BATCH or (changed and not page['pageInfo']['hasNextPage']):
+                    batch, changed = changed[:LANGUAGE_FETCH_BATCH], changed[LANGUAGE_FETCH_BATCH:]
+                    fetches.append(asyncio.ensure_future(self.fetch_repository_languages(username, batch)))
+            for breakdowns in await asyncio.gather(*fetches):
+                for repo_id, breakdown in breakdowns.items():
+                    repos[repo_id]['languages'] = breakdown
+        except BaseException:
+            for fetch in fetches:
+                fetch.cancel()
+            raise
         
-        payload = {
-            "query": query,
-            "variables": variables
-        }
+        # Update the totals by the repositories that changed, were added or were removed
+        totals = {name: dict(entry) for name, entry in previous['totals'].items()}
+        for repo_id, repo in previous['repos'].items():
+            if repo_id not in repos or repos[repo_id]['languages'] is not repo['languages']:
+                apply_breakdown(totals, repo['languages'], -1)
+        for repo_id, repo in repos.items():
+            if repo_id not in previous['repos'] or previous['repos'][repo_id]['languages'] is not repo['languages']:
+                apply_breakdown(totals, repo['languages'])
+        user_cache.put(username, state_key, {'repos': repos, 'totals': totals})
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(GITHUB_GRAPHQL_URL, headers=headers, json=payload) as response:
-                if response.status != 200:
-                    raise Exception(f"GraphQL API error: {response.status}")
-                
-                data = await response.json()
-                
-                if 'errors' in data:
-                    error_msg = data['errors'][0].get('message', 'GraphQL error')
-                    if 'NOT_FOUND' in str(data['errors'][0]):
-                        raise Exception(f"User '{username}' not found")
-                    raise Exception(f"GraphQL error: {error_msg}")
-                
-                return data['data']['user']['repositories']['nodes']
+        return language_matrix(repos.values(), totals)
+
+def language_breakdown(repo: Dict[str, Any]) -> Dict[str, List]:
+    """A repository node's languages as {name: [size, color]}"""
+    return {edge['node']['name']: [edge['size'], edge['node']['color']] for edge in repo['languages']['edges']}
+
+def apply_breakdown(totals: Dict[str, Dict[str, Any]], breakdown: Dict[str, List], sign: int = 1) -> Dict[str, Dict[str, Any]]:
+    """Add (or with sign=-1, remove) a repository's language breakdown to per-language totals ({name: {'size', 'color'}})"""
+    for name, (size, color) in breakdown.items():
+        entry = totals.setdefault(name, {'size': 0, 'color': None})
+        entry['size'] += sign * size
+        # Store color (GitHub API provides the official color)
+        if entry['color'] is None and color:
+            entry['color'] = color
+        if sign < 0 and entry['size'] <= 0:
+            del totals[name]
+    return totals
 
-async def get_top_languages_graphql(username: str, languages_count: int = 5, exclude_languages: List[str] = None, count_other_languages: bool = False, exclude_repos: List[str] = None) -> List[Tuple[str, float, str]]:
+def language_matrix(repos: Iterable[Dict[str, Any]], totals: Dict[str, Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Repositories x languages matrix of language sizes, from repository entries
+    ({'name', 'pushedAt', 'languages': breakdown}).
+
+    Rows are sparse ([[column, size], ...]) and kept with each repository's name and
+    push time (epoch seconds), so exclusions and weightings are masks and reductions
+    over the rows (see weigh_languages). `totals` (as kept by apply_breakdown) give the
+    column order and byte sums; without them they are computed from the rows.
+    `built_at` tells rankings cached for an older matrix apart (see cached_language_ranking).
+    """
+    columns, colors = {}, []
+    for name, entry in (totals or {}).items():
+        columns[name] = len(colors)
+        colors.append(entry['color'])
+    
+    names, pushed_at, rows = [], [], []
+    for repo in repos:
+        row = []
+        for language, (size, color) in repo['languages'].items():
+            column = columns.get(language)
+            if column is None:
+                column = columns[language] = len(colors)
+                colors.append(color)
+            elif colors[column] is None and color:
+                colors[column] = color
+            row.append([column, size])
+        names.append(repo['name'])
+        pushed_at.append(datetime.fromisoformat(repo['pushedAt'].replace('Z', '+00:00')).timestamp() if repo.get('pushedAt') else None)
+        rows.append(row)
+    
+    if totals is None:
+        column_totals = [0] * len(colors)
+        for row in rows:
+            for column, size in row:
+                column_totals[column] += size
+    else:
+        column_totals = [totals[name]['size'] if name in totals else 0 for name in columns]
+    
+    return {'languages': list(columns), 'colors': colors, 'totals': column_totals,
+            'repos': names, 'pushed_at': pushed_at, 'rows': rows, 'built_at': time.time()}
+
+def weigh_languages(matrix: Dict[str, Any], weight: str = 'bytes', exclude_repos: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Per-language totals ({name: {'size', 'color'}}) of a language matrix in a weighting mode (see LANGUAGE_WEIGHTS), without the excluded repositories"""
+    exclude_set = set(exclude_repos or [])
+    if weight == 'bytes' and not exclude_set:
+        # Byte sums over every repository are kept with the matrix
+        column_totals = matrix['totals']
+    else:
+        cell_weight = LANGUAGE_WEIGHTS[weight]
+        now = time.time()
+        # None marks languages that only occur in excluded repositories
+        column_totals = [None] * len(matrix['languages'])
+        for name, pushed_at, row in zip(matrix['repos'], matrix['pushed_at'], matrix['rows']):
+            if name in exclude_set:
+                continue
+            age = (now - pushed_at) / 86400 if pushed_at else 0
+            for column, size in row:
+                column_totals[column] = (column_totals[column] or 0) + cell_weight(size, age)
+    
+    return {
+        name: {'size': total, 'color': color}
+        for name, color, total in zip(matrix['languages'], matrix['colors'], column_totals)
+        if total is not None
+    }
+
+async def get_top_languages_graphql(username: str, languages_count: int = 5, exclude_languages: List[str] = None, count_other_languages: bool = False, exclude_repos: List[str] = None, weight: str = 'bytes') -> List[Tuple[str, float, str]]:
     """Get top languages using GraphQL - much faster implementation"""
     if exclude_repos is None:
         exclude_repos = []
@@ -106,62 +244,74 @@ async def get_top_languages_graphql(username: str, languages_count: int = 5, exc
         
     api = GitHubLanguagesGraphQL()
     
-    # Get all repositories with languages in a single GraphQL query
-    repos = await api.fetch_top_languages_graphql(username, exclude_repos)
+    # Get the language matrix of all repositories; excluded repositories and the weighting apply to it
+    matrix = await cached_fetch(username, ('top-languages', username),
+                                lambda: api.fetch_top_languages_graphql(username))
     
-    # Filter out excluded repositories
-    exclude_set = set(exclude_repos)
-    filtered_repos = [repo for repo in repos if repo['name'] not in exclude_set]
-    
-    # Aggregate language data with colors
-    language_bytes = {}
-    language_colors = {}
-    exclude_languages_set = set(exclude_languages)
+    ranking = cached_language_ranking(username, matrix, weight, exclude_repos)
+    return aggregate_top_languages(ranking, languages_count, exclude_languages, count_other_languages)
+
+def rank_languages(totals: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Ranking of language totals (see weigh_languages): names by size, largest first,
+    with their sizes, colors and running totals ('prefix'[i] is the size of the
+    first i languages), so any top-k selection is a slice and a subtraction.
+    """
+    order = sorted(totals, key=lambda name: totals[name]['size'], reverse=True)
+    prefix = [0]
+    for name in order:
+        prefix.append(prefix[-1] + totals[name]['size'])
+    return {
+        'order': order,
+        'sizes': {name: entry['size'] for name, entry in totals.items()},
+        'colors': {name: entry['color'] or DEFAULT_LANGUAGE_COLOR for name, entry in totals.items()},
+        'prefix': prefix,
+    }
+
+def cached_language_ranking(username: str, matrix: Dict[str, Any], weight: str = 'bytes', exclude_repos: List[str] = None) -> Dict[str, Any]:
+    """rank_languages() of a fetched matrix, cached until the matrix is refetched, so every count and language exclusion reuses it"""
+    key = ('language-ranking', username, weight, tuple(exclude_repos or []))
+    cached = user_cache.get(username, key, stale=True)
+    if cached is not None and cached['built_at'] == matrix['built_at']:
+        return cached['ranking']
+    ranking = rank_languages(weigh_languages(matrix, weight, exclude_repos))
+    user_cache.put(username, key, {'built_at': matrix['built_at'], 'ranking': ranking})
+    return ranking
+
+def aggregate_top_languages(ranking: Dict[str, Any], languages_count: int = 5, exclude_languages: List[str] = None, count_other_languages: bool = False) -> List[Tuple[str, float, str]]:
+    """Aggregate a language ranking (see rank_languages) into (language, percentage, color) entries"""
+    order, sizes, prefix = ranking['order'], ranking['sizes'], ranking['prefix']
     
-    for repo in filtered_repos:
-        for language_edge in repo['languages']['edges']:
-            language_name = language_edge['node']['name']
-            
-            # Skip excluded languages
-            if language_name in exclude_languages_set:
-                continue
-                
-            language_size = language_edge['size']
-            language_color = language_edge['node']['color']
-            
-            # Store color (GitHub API provides the official color)
-            if language_name not in language_colors and language_color:
-                language_colors[language_name] = language_color
-            
-            if language_name in language_bytes:
-                language_bytes[language_name] += language_size
-            else:
-                language_bytes[language_name] = language_size
+    # Skip excluded languages: only the ranking up to the last selected language is walked
+    exclude_languages_set = set(exclude_languages or []) & sizes.keys()
+    if exclude_languages_set:
+        selected = []
+        for language in order:
+            if len(selected) == languages_count:
+                break
+            if language not in exclude_languages_set:
+                selected.append(language)
+        total_bytes = prefix[-1] - sum(sizes[language] for language in exclude_languages_set)
+        top_bytes = sum(sizes[language] for language in selected)
+    else:
+        selected = order[:languages_count]
+        total_bytes = prefix[-1]
+        top_bytes = prefix[len(selected)]
     
     # Calculate percentages
-    total_bytes = sum(language_bytes.values())
     if total_bytes == 0:
         return []
     
-    # Sort by bytes and get top languages
-    sorted_languages = sorted(language_bytes.items(), key=lambda x: x[1], reverse=True)
     top_languages = []
     
     # Handle "Other" category logic
-    if count_other_languages and len(sorted_languages) > languages_count:
-        # Get top N languages
-        top_n_languages = sorted_languages[:languages_count]
-        remaining_languages = sorted_languages[languages_count:]
-        
-        # Calculate percentages for top languages
-        top_bytes = sum(bytes_count for _, bytes_count in top_n_languages)
-        other_bytes = sum(bytes_count for _, bytes_count in remaining_languages)
+    if count_other_languages and len(order) - len(exclude_languages_set) > languages_count:
+        other_bytes = total_bytes - top_bytes
         
         # Add top languages with their actual percentages and colors
-        for language, bytes_count in top_n_languages:
-            percentage = (bytes_count / total_bytes) * 100
-            color = language_colors.get(language, DEFAULT_LANGUAGE_COLOR)
-            top_languages.append((language, percentage, color))
+        for language in selected:
+            percentage = (sizes[language] / total_bytes) * 100
+            top_languages.append((language, percentage, ranking['colors'][language]))
         
         # Add "Other" category if there are remaining languages
         if other_bytes > 0:
@@ -169,23 +319,26 @@ async def get_top_languages_graphql(username: str, languages_count: int = 5, exc
             top_languages.append(("Other", other_percentage, "#858585"))
     else:
         # Original behavior: redistribute 100% among top languages only
-        selected_languages = sorted_languages[:languages_count]
-        selected_total_bytes = sum(bytes_count for _, bytes_count in selected_languages)
-        
-        if selected_total_bytes > 0:
-            for language, bytes_count in selected_languages:
+        if top_bytes > 0:
+            for language in selected:
                 # Redistribute percentages to sum to 100%
-                percentage = (bytes_count / selected_total_bytes) * 100
-                color = language_colors.get(language, DEFAULT_LANGUAGE_COLOR)
-                top_languages.append((language, percentage, color))
+                percentage = (sizes[language] / top_bytes) * 100
+                top_languages.append((language, percentage, ranking['colors'][language]))
     
     return top_languages
 
-def create_language_bar_chart(languages: List[Tuple[str, float, str]], theme: str, width: int, height: int, decimal_places: int) -> str:
-    """Create responsive SVG bar chart for languages"""
-    colors = THEMES[theme]
-    title = "Most Used Languages"
-    
+# Number of distinct (width, height, language count, decimal places) chart layouts kept in memory
+LAYOUT_CACHE_SIZE = 256
+
+# Label of the top language: the name between trophies (non-breaking spaces, so SVG keeps them)
+TOP_LANGUAGE_LABEL = "🏆" + "\u00a0" * 5 + "{}" + "\u00a0" * 5 + "🏆"
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def build_language_chart_layout(width: int, height: int, language_count: int, decimal_places: int) -> Dict:
+    """Positions and sizes of the languages chart, which only depend on the arguments.
+
+    The result is cached and shared between requests, so it must be treated as read-only.
+    """
     # Improved responsive calculations
     # Base padding on smaller dimension to avoid extreme values
     min_dim = min(width, height)
@@ -203,33 +356,34 @@ def create_language_bar_chart(languages: List[Tuple[str, float, str]], theme: st
     language_font_size = max(8, min(min_dim * 0.04, 14))
     percentage_font_size = max(7, min(min_dim * 0.035, 12))
     
-    # Better text space calculation - ensure percentages have enough room
-    percentage_width = max(30, min(width * 0.12, 80))
+    # Text space: the responsive share of the width, or the widest percentage if it needs more
+    widest_percentage = "100%" if decimal_places == 0 else f"100.{'0' * decimal_places}%"
+    percentage_width = max(30, min(width * 0.12, 80), text_width(widest_percentage, percentage_font_size))
     text_gap = max(8, min(width * 0.02, 15))
     
     # Calculate bar dimensions with better spacing
-    if languages:
+    if language_count:
         # Ensure minimum spacing between bars
         min_bar_height = 8
         min_spacing = max(2, min(height * 0.01, 8))
         
         # Calculate optimal bar height
         available_height = chart_height
-        total_spacing = min_spacing * max(0, len(languages) - 1)
-        calculated_bar_height = (available_height - total_spacing) / len(languages)
+        total_spacing = min_spacing * max(0, language_count - 1)
+        calculated_bar_height = (available_height - total_spacing) / language_count
         
         # Apply constraints
         bar_height = max(min_bar_height, min(calculated_bar_height, height * 0.15))
         
         # Recalculate spacing if bars are too small
         if bar_height == min_bar_height:
-            remaining_space = available_height - (bar_height * len(languages))
-            bar_spacing = max(1, remaining_space / max(1, len(languages) - 1))
+            remaining_space = available_height - (bar_height * language_count)
+            bar_spacing = max(1, remaining_space / max(1, language_count - 1))
         else:
             bar_spacing = min_spacing
             
         # Ensure we don't exceed available height
-        total_used = (bar_height * len(languages)) + (bar_spacing * max(0, len(languages) - 1))
+        total_used = (bar_height * language_count) + (bar_spacing * max(0, language_count - 1))
         if total_used > available_height:
             # Scale down proportionally
             scale_factor = available_height / total_used
@@ -239,15 +393,46 @@ def create_language_bar_chart(languages: List[Tuple[str, float, str]], theme: st
         bar_height = 20
         bar_spacing = 10
     
-    # Maximum bar width (leave space for text)
-    max_bar_width = chart_width - percentage_width - text_gap
+    # Center the bars vertically with equal spacing; each row is (bar y, text baseline y)
+    total_content_height = (bar_height * language_count) + (bar_spacing * max(0, language_count - 1))
+    vertical_margin = max(0, (chart_height - total_content_height) / 2)
+    y_start = title_height + padding + vertical_margin
+    rows = tuple(
+        (y, y + bar_height/2 + language_font_size/3)
+        for y in (y_start + (i * (bar_height + bar_spacing)) for i in range(language_count))
+    )
     
-    # Border radius based on bar height
-    border_radius = max(1, min(bar_height * 0.25, 8))
-    svg_radius = max(3, min(min_dim * 0.02, 12))
+    return {
+        'padding': padding,
+        'title_height': title_height,
+        'title_font_size': title_font_size,
+        'language_font_size': language_font_size,
+        'percentage_font_size': percentage_font_size,
+        'empty_font_size': max(10, min(min_dim * 0.05, 16)),
+        'text_gap': text_gap,
+        'bar_height': bar_height,
+        # Maximum bar width (leave space for text)
+        'max_bar_width': chart_width - percentage_width - text_gap,
+        # Labels end before the percentages column
+        'label_end': width - padding - percentage_width - text_gap,
+        # Border radius based on bar height
+        'border_radius': max(1, min(bar_height * 0.25, 8)),
+        'svg_radius': max(3, min(min_dim * 0.02, 12)),
+        'rows': rows,
+    }
+
+def iter_language_bar_chart(languages: List[Tuple[str, float, str]], theme: str, width: int, height: int, decimal_places: int) -> Iterator[str]:
+    """Yield responsive SVG bar chart for languages fragment by fragment"""
+    colors = THEMES[theme]
+    layout = build_language_chart_layout(width, height, len(languages), decimal_places)
+    padding = layout['padding']
+    title_height = layout['title_height']
+    language_font_size = layout['language_font_size']
+    percentage_font_size = layout['percentage_font_size']
+    bar_height = layout['bar_height']
     
     # Start SVG with proper encoding declaration and animations
-    svg = f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
+    yield f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
     <defs>
         <style>
             .bar {{ transform-origin: left center; transform: scaleX(0); animation: growBar 1.5s ease-out forwards; }}
@@ -256,33 +441,26 @@ def create_language_bar_chart(languages: List[Tuple[str, float, str]], theme: st
             @keyframes fadeInText {{ from {{ opacity: 0; }} to {{ opacity: 1; }} }}
         </style>
     </defs>
-    <rect width="{width}" height="{height}" fill="{colors['bg_color']}" stroke="{colors['border_color']}" rx="{svg_radius}"/>
+    <rect width="{width}" height="{height}" fill="{colors['bg_color']}" stroke="{colors['border_color']}" rx="{layout['svg_radius']}"/>
     
     <!-- Title -->
     <text x="{width/2}" y="{title_height * 0.7}" text-anchor="middle" fill="{colors['title_color']}" 
           font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
-          font-size="{title_font_size}" font-weight="600">Most Used Languages</text>
+          font-size="{layout['title_font_size']}" font-weight="600">Most Used Languages</text>
     '''
     
     if not languages:
-        empty_font_size = max(10, min(min_dim * 0.05, 16))
-        svg += f'''
+        yield f'''
     <text x="{width/2}" y="{height/2}" text-anchor="middle" fill="{colors['subtitle_color']}" 
           font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
-          font-size="{empty_font_size}">No language data available</text>
+          font-size="{layout['empty_font_size']}">No language data available</text>
     '''
     else:
-        # Calculate starting position to center the content vertically with equal spacing
-        total_content_height = (bar_height * len(languages)) + (bar_spacing * max(0, len(languages) - 1))
-        available_space_for_chart = height - title_height - (2 * padding)
-        vertical_margin = max(0, (available_space_for_chart - total_content_height) / 2)
-        y_start = title_height + padding + vertical_margin
+        # Languages come ranked largest first; only "Other" (last) can be larger than the first
+        max_percentage = max(languages[0][1], languages[-1][1])
         
-        max_percentage = max(lang[1] for lang in languages)
-        
-        for i, (language, percentage, lang_color) in enumerate(languages):
-            y = y_start + (i * (bar_height + bar_spacing))
-            bar_width = (percentage / max_percentage) * max_bar_width
+        for i, ((language, percentage, lang_color), (y, text_y)) in enumerate(zip(languages, layout['rows'])):
+            bar_width = (percentage / max_percentage) * layout['max_bar_width']
             
             # Ensure minimum bar width for visibility
             bar_width = max(bar_width, 2)
@@ -294,75 +472,43 @@ def create_language_bar_chart(languages: List[Tuple[str, float, str]], theme: st
             # Use the color from GitHub API (already provided in the tuple)
             
             # Language bar with staggered animation
-            svg += f'''
+            yield f'''
     <rect x="{padding}" y="{y}" width="{bar_width}" height="{bar_height}" 
-          fill="{lang_color}" rx="{border_radius}" class="bar" 
+          fill="{lang_color}" rx="{layout['border_radius']}" class="bar" 
           style="animation-delay: {bar_delay}s;"/>
     '''
             
-            # Calculate text positions to avoid overlaps
-            text_y = y + bar_height/2 + language_font_size/3
-            
-            # Language name - always show full name, adjust position if needed
-            language_x = padding + bar_width + text_gap
-            
-            # Always display the full language name without truncation
-            display_language = language
-            
-            # Calculate character width for positioning
-            char_width = language_font_size * 0.5
+            # Language name - always the full name, right after the bar if it fits before the
+            # percentages, otherwise moved left (over the bar) to end where they start
+            label = TOP_LANGUAGE_LABEL.format(language) if i == 0 else language
+            label_width = text_width(label, language_font_size, bold=(i == 0))
+            language_x = padding + bar_width + layout['text_gap']
+            if language_x + label_width > layout['label_end']:
+                language_x = max(padding, layout['label_end'] - label_width)
             
-            # Special handling for top language with emojis
-            if i == 0:
-                # Calculate emoji text width (much wider than regular text)
-                emoji_text = f"🏆&#160;&#160;&#160;&#160;&#160;&#160;&#160;&#160;{display_language}&#160;&#160;&#160;&#160;&#160;&#160;&#160;&#160;🏆"
-                estimated_emoji_width = len(emoji_text) * char_width * 0.8  # Emojis are wider
-                
-                # Position emoji text to fit within graph bounds
-                max_x_for_emoji = width - padding - percentage_width - text_gap
-                if language_x + estimated_emoji_width > max_x_for_emoji:
-                    # Move text left to fit, but ensure it doesn't overlap with bar too much
-                    language_x = max(padding + bar_width * 0.5, max_x_for_emoji - estimated_emoji_width)
-            else:
-                # Regular positioning logic for non-emoji text
-                available_name_width = width - language_x - percentage_width - padding - text_gap
-                estimated_text_width = len(language) * char_width
-                
-                # If text is too wide, move it closer to the bar or use minimum position
-                if estimated_text_width > available_name_width:
-                    # Try positioning right after the bar with minimal gap
-                    min_gap = 5
-                    language_x = padding + bar_width + min_gap
-                    # If still doesn't fit, position at fixed location after padding
-                    available_name_width = width - language_x - percentage_width - padding - min_gap
-                    if estimated_text_width > available_name_width:
-                        # Use a fixed position that ensures percentage has space
-                        language_x = padding + max_bar_width * 0.6
-            
-            # Escape special characters for XML
-            display_language = display_language.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;').replace("'", '&#39;')
+            # Escape special characters for XML, and keep the spaces around the trophies
+            display_language = label.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;').replace("'", '&#39;').replace('\u00a0', '&#160;')
             
             # Special styling for the top language (first one)
             if i == 0:
-                # Add winner emoji and outlined text for top language (using non-breaking spaces for SVG)
-                display_language_with_emoji = f"🏆&#160;&#160;&#160;&#160;&#160;{display_language}&#160;&#160;&#160;&#160;&#160;🏆"
-                svg += f'''
+                # Winner emoji and outlined text for top language
+                yield f'''
     <!-- Top language outline (stroke) -->
     <text x="{language_x}" y="{text_y}" 
           fill="none" stroke="{colors['bg_color']}" stroke-width="3"
           font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
           font-size="{language_font_size}" font-weight="600" class="text"
-          style="animation-delay: {text_delay}s;">{display_language_with_emoji}</text>
+          style="animation-delay: {text_delay}s;">{display_language}</text>
     <!-- Top language text (fill) -->
     <text x="{language_x}" y="{text_y}" 
           fill="{colors['text_color']}" 
           font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
           font-size="{language_font_size}" font-weight="600" class="text"
-          style="animation-delay: {text_delay}s;">{display_language_with_emoji}</text>
+          style="animation-delay: {text_delay}s;">{display_language}</text>
     '''
             else:
                 # Regular styling for other languages
-                svg += f'''
+                yield f'''
     <!-- Language name -->
     <text x="{language_x}" y="{text_y}" 
           fill="{colors['text_color']}" 
@@ -380,7 +526,7 @@ def create_language_bar_chart(languages: List[Tuple[str, float, str]], theme: st
             # Percentage position - always at the right edge
             percentage_x = width - padding
             
-            svg += f'''
+            yield f'''
     <!-- Percentage -->
     <text x="{percentage_x}" y="{text_y}" text-anchor="end"
           fill="{colors['subtitle_color']}" 
@@ -389,22 +535,36 @@ def create_language_bar_chart(languages: List[Tuple[str, float, str]], theme: st
           style="animation-delay: {text_delay}s;">{percentage_text}</text>
     '''
     
-    svg += '</svg>'
-    return svg
+    yield '</svg>'
 
-async def create_top_languages_svg(username: str, theme: str = "dark", languages_count: int = 5, decimal_places: int = 1, count_other_languages: bool = False, exclude_languages: List[str] = None, width: int = 400, height: int = 300, exclude_repos: List[str] = None) -> str:
-    """Main function to generate top languages SVG using GraphQL"""
+def create_language_bar_chart(languages: List[Tuple[str, float, str]], theme: str, width: int, height: int, decimal_places: int) -> str:
+    """Create responsive SVG bar chart for languages"""
+    return ''.join(iter_language_bar_chart(languages, theme, width, height, decimal_places))
+
+async def render_top_languages_svg(username: str, theme: str = "dark", languages_count: int = 5, decimal_places: int = 1, count_other_languages: bool = False, exclude_languages: List[str] = None, width: int = 400, height: int = 300, exclude_repos: List[str] = None, weight: str = "bytes") -> Union[RenderedSVG, PendingSVG]:
+    """Fetch top languages and return the encoded SVG, reusing cached output when data and parameters are unchanged.
+    When fetching fails, the chart last served with the same parameters is returned if there is one."""
+    layout = {
+        'theme': theme,
+        'width': int(width),
+        'height': int(height),
+        'decimal_places': int(decimal_places),
+    }
+    card = card_fingerprint('top-languages', username, dict(
+        layout, languages_count=int(languages_count), count_other_languages=bool(count_other_languages),
+        exclude_languages=exclude_languages or [], exclude_repos=exclude_repos or [], weight=weight))
     try:
         # Get top languages data using GraphQL
-        languages = await get_top_languages_graphql(username, languages_count, exclude_languages, count_other_languages, exclude_repos)
+        languages = await get_top_languages_graphql(username, languages_count, exclude_languages, count_other_languages, exclude_repos, weight)
         
-        # Generate SVG
-        svg = create_language_bar_chart(languages, theme, width, height, decimal_places)
-        return svg
+        # The aggregated languages already reflect count/exclusion options, so only layout parameters remain
+        key = fingerprint('top-languages', languages, layout)
+        render_cache.remember(card, key)
+        return render_cache.get_or_stream(key, lambda: iter_language_bar_chart(languages, theme, width, height, decimal_places))
         
     except ValueError as e:
         # Token-related errors
-        return f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
+        return RenderedSVG(None, encode_svg(f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
             <rect width="{width}" height="{height}" fill="#f6f8fa" stroke="#d1d5da" rx="10"/>
             <text x="{width/2}" y="{height/2 - 20}" text-anchor="middle" fill="#d73a49" 
                   font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
@@ -415,8 +575,12 @@ async def create_top_languages_svg(username: str, theme: str = "dark", languages
             <text x="{width/2}" y="{height/2 + 20}" text-anchor="middle" fill="#586069" 
                   font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
                   font-size="11">Create token at github.com/settings/tokens</text>
-        </svg>'''
+        </svg>'''))
     except Exception as e:
+        # GitHub failing: the chart as last served beats an error card
+        last_good = render_cache.last_good(card)
+        if last_good is not None:
+            return last_good
         # Other errors
         error_msg = str(e)
         if "404" in error_msg or "Not Found" in error_msg:
@@ -424,7 +588,7 @@ async def create_top_languages_svg(username: str, theme: str = "dark", languages
         else:
             error_msg = error_msg[:40] + "..." if len(error_msg) > 40 else error_msg
             
-        return f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
+        return RenderedSVG(None, encode_svg(f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
             <rect width="{width}" height="{height}" fill="#f6f8fa" stroke="#d1d5da" rx="10"/>
             <text x="{width/2}" y="{height/2 - 10}" text-anchor="middle" fill="#d73a49" 
                   font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
@@ -432,4 +596,9 @@ async def create_top_languages_svg(username: str, theme: str = "dark", languages
             <text x="{width/2}" y="{height/2 + 10}" text-anchor="middle" fill="#586069" 
                   font-family="-apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif" 
                   font-size="12">{error_msg}</text>
-        </svg>'''
+        </svg>'''))
+
+async def create_top_languages_svg(username: str, theme: str = "dark", languages_count: int = 5, decimal_places: int = 1, count_other_languages: bool = False, exclude_languages: List[str] = None, width: int = 400, height: int = 300, exclude_repos: List[str] = None, weight: str = "bytes") -> str:
+    """Main function to generate top languages SVG using GraphQL"""
+    rendered = await render_top_languages_svg(username, theme, languages_count, decimal_places, count_other_languages, exclude_languages, width, height, exclude_repos, weight)
+    return rendered.text
@@ -0,0 +1,178 @@
+"""
+Per-User Data Cache
+Keeps the GitHub data fetched for a user for USER_DATA_TTL seconds, so repeated
+requests for the same profile (e.g. several cards on one README) reuse it instead
+of refetching.
+
+With multi-user mode one process serves many profiles, so the cache is bounded by
+the number of users and by the approximate size of their data; the least recently
+used user is evicted first, with all of their data. Expired data is kept until
+then, to be served when GitHub's rate limit is exhausted for all tokens.
+
+Data expired for at most USER_DATA_MAX_STALE seconds is served right away while a
+background task refetches it (stale-while-revalidate), so only a user's first request
+waits for GitHub. TTLs are jittered, so data fetched together doesn't expire together.
+
+When GitHub fails (rate limit exhausted for all tokens, or unreachable - see
+circuit_breaker), expired data of any age is served instead of an error.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .background import run_in_background
+from .circuit_breaker import UpstreamError
+from .fetch_scope import shared_fetch
+from .github_client import RateLimitExceeded
+
+# Seconds fetched GitHub data is reused (0 disables the cache)
+USER_DATA_TTL = float(os.getenv('USER_DATA_TTL', 300))
+
+# Fraction by which each entry's TTL is randomly shortened or lengthened
+USER_DATA_TTL_JITTER = float(os.getenv('USER_DATA_TTL_JITTER', 0.1))
+
+# Seconds after expiry data is still served while it is refreshed in the background (0 disables)
+USER_DATA_MAX_STALE = float(os.getenv('USER_DATA_MAX_STALE', 900))
+
+# Upper bounds for cached users and for the approximate size of all cached data (bytes)
+USER_CACHE_MAX_USERS = int(os.getenv('USER_CACHE_MAX_USERS', 1000))
+USER_CACHE_MAX_BYTES = int(os.getenv('USER_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+_MISSING = object()
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of fetched (JSON-shaped) data"""
+    return len(json.dumps(value, separators=(',', ':'), default=str))
+
+class UserDataCache:
+    """Fetched data per user with a TTL, LRU-evicted by user under a user count and byte budget"""
+
+    def __init__(self, ttl: float = USER_DATA_TTL, max_users: int = USER_CACHE_MAX_USERS,
+                 max_bytes: int = USER_CACHE_MAX_BYTES, jitter: float = USER_DATA_TTL_JITTER,
+                 max_stale: float = USER_DATA_MAX_STALE):
+        self.ttl = ttl
+        self.jitter = jitter
+        self.max_stale = max_stale
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        # username -> {key: (expires, size, value)}, least recently used user first
+        self._users: "OrderedDict[str, Dict[Hashable, Tuple[float, int, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def get(self, username: str, key: Hashable, default: Any = None, stale: bool = False) -> Any:
+        """Return the fresh (or with stale=True, any) cached value for one of a user's datasets, or default"""
+        username = username.lower()
+        with self._lock:
+            entries = self._users.get(username)
+            entry = entries.get(key) if entries else None
+            if entry is None or (entry[0] <= time.monotonic() and not stale):
+                self.misses += 1
+                return default
+            self._users.move_to_end(username)
+            self.hits += 1
+            return entry[2]
+
+    def lookup(self, username: str, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """(value, whether it is fresh) of one of a user's datasets expired at most max_stale seconds ago, or None"""
+        username = username.lower()
+        with self._lock:
+            entries = self._users.get(username)
+            entry = entries.get(key) if entries else None
+            now = time.monotonic()
+            if entry is None or entry[0] + self.max_stale <= now:
+                self.misses += 1
+                return None
+            self._users.move_to_end(username)
+            fresh = entry[0] > now
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return entry[2], fresh
+
+    def put(self, username: str, key: Hashable, value: Any):
+        """Store one of a user's datasets, evicting least recently used users if needed"""
+        if self.ttl <= 0:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        username = username.lower()
+        with self._lock:
+            entries = self._users.setdefault(username, {})
+            self._users.move_to_end(username)
+            previous = entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            ttl = self.ttl * (1 + random.uniform(-self.jitter, self.jitter))
+            entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+
+            while len(self._users) > self.max_users or self._bytes > self.max_bytes:
+                _, evicted = self._users.popitem(last=False)
+                self._bytes -= sum(entry[1] for entry in evicted.values())
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'bytes': self._bytes,
+                'max_users': self.max_users,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale_hits': self.stale_hits,
+                'evictions': self.evictions,
+            }
+
+# Shared cache used by all SVG generators
+user_cache = UserDataCache()
+
+async def _refresh(username: str, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+    try:
+        value = await fetch()
+    except Exception as e:
+        # The stale data stays cached; the next request past its expiry tries again
+        print(f"Background refresh of {key!r} failed: {e}")
+        return
+    user_cache.put(username, key, value)
+
+def refresh_in_background(username: str, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+    """Refetch one of a user's datasets in a background task, unless it is already being refetched"""
+    run_in_background(('refresh', username.lower(), key), lambda: _refresh(username, key, fetch))
+
+async def cached_fetch(username: str, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """shared_fetch() backed by the per-user cache, so fresh data is also reused across requests.
+    Recently expired data is returned immediately and refreshed in the background."""
+    cached = user_cache.lookup(username, key)
+    if cached is not None:
+        value, fresh = cached
+        if not fresh:
+            refresh_in_background(username, key, fetch)
+        return value
+    try:
+        value = await shared_fetch(key, fetch)
+    except (RateLimitExceeded, UpstreamError):
+        # Out of GitHub points, or GitHub failing: expired data is better than an error card
+        value = user_cache.get(username, key, _MISSING, stale=True)
+        if value is _MISSING:
+            raise
+        return value
+    user_cache.put(username, key, value)
+    return value
@@ -1,5 +1,9 @@
+import asyncio
 import os
+from typing import Iterator, Optional, Union
 from .db import get_db_connection, get_or_create_user_views, set_user_views
+from .fetch_scope import shared_fetch
+from .render_cache import PendingSVG, RenderedSVG, fingerprint, render_cache
 
 THEMES = {
     "light": {
@@ -14,29 +18,44 @@ THEMES = {
     }
 }
 
-async def generate_views_counter_svg(user_agent: str, theme: str, animated: bool = True) -> str:
+def count_view(user_agent: str, username: Optional[str] = None):
     """
-    Get or create user in DB (from env), increment views only if user_agent is github-camo, and return SVG with the new value.
+    Get or create user in DB (the given one, or from env) and increment views only if user_agent is github-camo (blocking).
     """
-    user = os.getenv('GITHUB_USERNAME', 'adbreeker')
+    user = username or os.getenv('GITHUB_USERNAME', 'adbreeker')
     NEON_DATABASE_URL = os.getenv('NEON_DATABASE_URL')
 
-    if NEON_DATABASE_URL:
-        db_conn = get_db_connection(NEON_DATABASE_URL)
-        try:
-            views = get_or_create_user_views(db_conn, user)
-            # Only increment if called by GitHub's user agent (github-camo)
-            if user_agent.lower().startswith('github-camo'):
-                views += 1
-                set_user_views(db_conn, user, views)
-        except Exception as e:
-            print("Database error:", e)
-            views = -1
-        finally:
-            db_conn.close()
-    else:
-        views = "a crapload"
-    
+    if not NEON_DATABASE_URL:
+        return "a crapload"
+
+    db_conn = get_db_connection(NEON_DATABASE_URL)
+    try:
+        views = get_or_create_user_views(db_conn, user)
+        # Only increment if called by GitHub's user agent (github-camo)
+        if user_agent.lower().startswith('github-camo'):
+            views += 1
+            set_user_views(db_conn, user, views)
+    except Exception as e:
+        print("Database error:", e)
+        views = -1
+    finally:
+        db_conn.close()
+    return views
+
+async def render_views_counter_svg(user_agent: str, theme: str, animated: bool = True,
+                                   username: Optional[str] = None) -> Union[RenderedSVG, PendingSVG]:
+    """
+    Count the view of the user's counter (GITHUB_USERNAME by default) and return the encoded SVG with the new value.
+    """
+    # psycopg2 is blocking, so keep it off the event loop (matters when the loop serves other requests);
+    # several counters of one user in one batch request count a single view
+    views = await shared_fetch(('views', username, user_agent), lambda: asyncio.to_thread(count_view, user_agent, username))
+
+    key = fingerprint('views-counter', views, {'theme': theme, 'animated': bool(animated)})
+    return render_cache.get_or_stream(key, lambda: iter_views_counter_svg(views, theme, animated))
+
+def iter_views_counter_svg(views, theme: str, animated: bool = True) -> Iterator[str]:
+    """Yield the slot-machine style SVG for a views value fragment by fragment"""
     # Modern SVG styling inspired by other generators
     width = len(str(views)) * 22 + 50
     height = 54
@@ -54,7 +73,7 @@ async def generate_views_counter_svg(user_agent: str, theme: str, animated: bool
     duration = 1.2  # total animation duration per char
     delay_step = 0.25  # delay between each char
     slot_chars = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
-    svg = f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
+    yield f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
     <defs>
         <style>
             .counter-bg {{ filter: drop-shadow({shadow}); }}
@@ -75,17 +94,29 @@ async def generate_views_counter_svg(user_agent: str, theme: str, animated: bool
             all_chars = slot_chars_list + [char]
             final_idx = len(all_chars) - 1
             # Group for animation, animate transform on group
-            svg += f'<g>'
-            svg += f'<animateTransform attributeName="transform" type="translate" '
-            svg += f'from="0 0" to="0 {-char_height * final_idx}" dur="{duration}s" begin="{begin}" fill="freeze" />'
+            yield (
+                f'<g>'
+                f'<animateTransform attributeName="transform" type="translate" '
+                f'from="0 0" to="0 {-char_height * final_idx}" dur="{duration}s" begin="{begin}" fill="freeze" />'
+            )
             for j, c in enumerate(all_chars):
                 y_pos = y + j * char_height
-                svg += f'<text x="{x}" y="{y_pos}" text-anchor="middle" class="slot-char">{c}</text>'
-            svg += '</g>'
+                yield f'<text x="{x}" y="{y_pos}" text-anchor="middle" class="slot-char">{c}</text>'
+            yield '</g>'
     else:
         # Static centered text
         for i, char in enumerate(views_str):
             x = start_x + i * char_width
-            svg += f'<text x="{x}" y="{y}" text-anchor="middle" class="counter-views">{char}</text>'
-    svg += '</svg>'
-    return svg
+            yield f'<text x="{x}" y="{y}" text-anchor="middle" class="counter-views">{char}</text>'
+    yield '</svg>'
+
+def create_views_counter_svg(views, theme: str, animated: bool = True) -> str:
+    """Create the slot-machine style SVG for a views value"""
+    return ''.join(iter_views_counter_svg(views, theme, animated))
+
+async def generate_views_counter_svg(user_agent: str, theme: str, animated: bool = True, username: Optional[str] = None) -> str:
+    """
+    Get or create user in DB (the given one, or from env), increment views only if user_agent is github-camo, and return SVG with the new value.
+    """
+    rendered = await render_views_counter_svg(user_agent, theme, animated, username)
+    return rendered.text
@@ -8,7 +8,9 @@ from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import json
 import asyncio
-from utils.views_counter_generator import generate_views_counter_svg
+from utils.endpoints import parse_views_counter_params, resolve_username
+from utils.responses import response_started, send_svg
+from utils.views_counter_generator import render_views_counter_svg
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -18,34 +20,32 @@ class handler(BaseHTTPRequestHandler):
             query_params = parse_qs(parsed_url.query)
 
             user_agent = self.headers.get('User-Agent', '')
-            theme = query_params.get('theme', ['dark'])[0]
-            animated = query_params.get('animated', ['true'])[0].lower() == 'true'
-
-            if theme not in ['light', 'dark']:
-                raise ValueError(f"Invalid theme: {theme}")
+            # Counter of the `username` parameter in multi-user mode, GITHUB_USERNAME's otherwise
+            username = resolve_username(query_params)
+            # Parse and validate parameters
+            params = parse_views_counter_params(query_params)
 
             # Generate SVG
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
-            svg_content = loop.run_until_complete(generate_views_counter_svg(
-                user_agent=user_agent, 
-                theme=theme, 
-                animated=animated
+            rendered_svg = loop.run_until_complete(render_views_counter_svg(
+                user_agent=user_agent,
+                username=username,
+                **params
             ))
 
             loop.close()
 
             # Return SVG with proper headers
-            self.send_response(200)
-            self.send_header('Content-type', 'image/svg+xml')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Cache-Control', 'max-age=0, no-cache, no-store, must-revalidate')
-            self.send_header('Pragma', 'no-cache')
-            self.send_header('Expires', '0')
-            self.end_headers()
-            self.wfile.write(svg_content.encode('utf-8'))
+            send_svg(self, rendered_svg, 'views-counter', {
+                'Pragma': 'no-cache',
+                'Expires': '0'
+            })
         except Exception as e:
+            if response_started(self):
+                print(f"Error after the views-counter response started: {e}")
+                return
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
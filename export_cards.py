@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Static Card Export
+Pre-renders cards to SVG files from a JSON manifest, e.g. for a scheduled job that
+publishes them to a profile repository or a CDN instead of serving them live.
+
+Each user's GitHub data is fetched once in this process; every card variant is then
+rendered in parallel worker processes with the generators' create_* functions and
+written atomically. Files whose content hash is unchanged are left untouched.
+
+Manifest:
+    {
+      "username": "octocat",
+      "output": "cards",
+      "cards": [
+        {"file": "stats-dark.svg", "type": "account-general", "params": {"theme": "dark"}},
+        {"file": "langs.svg", "type": "top-languages", "username": "torvalds", "params": {"languages_count": 8}}
+      ]
+    }
+
+"username" defaults to GITHUB_USERNAME and can be overridden per card, "output" is
+relative to the manifest, and "params" are the endpoint query parameters.
+
+Usage: python export_cards.py manifest.json [--output DIR] [--workers N]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Same import layout as the serverless handlers
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from utils.account_general_generator import (
+    GitHubAccountStatsAPI, calculate_basic_stats, fetch_avatar_data_uri,
+    layout_account_general_svg, needed_account_stats,
+)
+from utils.batch import to_query_params
+from utils.contributions_graph_generator import GitHubContributionsAPI, contributions_range, create_contributions_svg
+from utils.endpoints import (
+    parse_account_general_params, parse_contributions_graph_params, parse_top_languages_params,
+)
+from utils.http_session import set_shared_session
+from utils.svg_output import encode_svg
+from utils.top_languages_generator import (
+    GitHubLanguagesGraphQL, aggregate_top_languages, create_language_bar_chart, rank_languages,
+    weigh_languages,
+)
+
+# Card type -> parameter parser (the views counter counts live visits, so it can't be exported)
+EXPORT_TYPES = {
+    'account-general': parse_account_general_params,
+    'top-languages': parse_top_languages_params,
+    'contributions-graph': parse_contributions_graph_params,
+}
+
+def load_manifest(path: Path, output: Optional[str] = None) -> tuple:
+    """Validate a manifest and return (output directory, card jobs)"""
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('cards'), list) or not manifest['cards']:
+        raise ValueError("Manifest needs a non-empty 'cards' list")
+
+    output_dir = (path.parent / (output or manifest.get('output', 'cards'))).resolve()
+    default_username = manifest.get('username') or os.getenv('GITHUB_USERNAME')
+    jobs, files = [], set()
+    for index, card in enumerate(manifest['cards']):
+        if not isinstance(card, dict) or not isinstance(card.get('params', {}), dict):
+            raise ValueError(f"Card {index}: must be an object with 'file', 'type' and optional 'params' object")
+        if card.get('type') not in EXPORT_TYPES:
+            raise ValueError(f"Card {index}: invalid card type: {card.get('type')}")
+        username = card.get('username') or default_username
+        if not username:
+            raise ValueError(f"Card {index}: no username (set 'username' or GITHUB_USERNAME)")
+
+        # Keep every file inside the output directory
+        file = card.get('file')
+        target = (output_dir / str(file)).resolve() if file else None
+        if target is None or output_dir not in target.parents:
+            raise ValueError(f"Card {index}: invalid file: {file}")
+        if target in files:
+            raise ValueError(f"Card {index}: duplicate file: {file}")
+        files.add(target)
+
+        try:
+            params = EXPORT_TYPES[card['type']](to_query_params(card.get('params', {})))
+        except Exception as e:
+            raise ValueError(f"Card {index}: {e}") from e
+        jobs.append({'file': str(target), 'type': card['type'], 'username': username, 'params': params})
+    return output_dir, jobs
+
+def contributions_key(params: Dict[str, Any]) -> tuple:
+    """Fetched data of a contributions graph: the last 53 weeks, or its year or from/to range"""
+    return ('contributions', params.get('year'), params.get('date_from'), params.get('date_to'))
+
+async def fetch_user_data(username: str, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fetch everything the given cards of one user show, each dataset once"""
+    account_jobs = [job for job in jobs if job['type'] == 'account-general']
+    fetches = {}
+
+    if account_jobs:
+        needed_stats = set()
+        for job in account_jobs:
+            needed_stats |= needed_account_stats(job['params']['slots'], job['params']['icon'])
+        fetches['account'] = GitHubAccountStatsAPI().fetch_account_stats(username, needed_stats)
+    language_jobs = [job for job in jobs if job['type'] == 'top-languages']
+    if language_jobs:
+        fetches['languages'] = GitHubLanguagesGraphQL().fetch_top_languages_graphql(username)
+    for key in {contributions_key(job['params']) for job in jobs if job['type'] == 'contributions-graph'}:
+        if key == contributions_key({}):
+            fetches[key] = GitHubContributionsAPI().fetch_contributions(username)
+        else:
+            fetches[key] = GitHubContributionsAPI().fetch_contributions_range(username, *contributions_range(*key[1:]))
+
+    results = await asyncio.gather(*fetches.values(), return_exceptions=True)
+    data = dict(zip(fetches, results))
+
+    # The avatar needs the account data's URL, so it is the only second round trip
+    account = data.get('account')
+    if account is not None and not isinstance(account, Exception) and any(
+            'user' in job['params']['icon'].split('+') for job in account_jobs):
+        data['avatar'] = await fetch_avatar_data_uri(username, account.get('avatarUrl'))
+    return data
+
+async def fetch_all(jobs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Fetch the data of all users concurrently over one pooled session"""
+    import aiohttp
+
+    by_user = {}
+    for job in jobs:
+        by_user.setdefault(job['username'], []).append(job)
+
+    async with aiohttp.ClientSession() as session:
+        set_shared_session(session)
+        try:
+            results = await asyncio.gather(*(fetch_user_data(username, user_jobs) for username, user_jobs in by_user.items()))
+        finally:
+            set_shared_session(None)
+    return dict(zip(by_user, results))
+
+def job_data(job: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a user's fetched data one card needs (sent to its worker)"""
+    if job['type'] == 'account-general':
+        return {'account': user_data['account'], 'avatar': user_data.get('avatar')}
+    if job['type'] == 'top-languages':
+        return {'languages': user_data['languages']}
+    return {'contributions': user_data[contributions_key(job['params'])]}
+
+def render_card(job: Dict[str, Any], data: Dict[str, Any]) -> bytes:
+    """Render one card from fetched data, as served by its endpoint"""
+    username, params = job['username'], job['params']
+    if job['type'] == 'account-general':
+        user_data = data['account']
+        svg = layout_account_general_svg(
+            username, user_data, calculate_basic_stats(user_data), params['icon'], params['slots'],
+            params['theme'], params['animation_time'], data['avatar'])
+    elif job['type'] == 'top-languages':
+        languages = aggregate_top_languages(
+            rank_languages(weigh_languages(data['languages'], params['weight'], params['exclude_repos'])),
+            params['languages_count'], params['exclude_languages'], params['count_other_languages'])
+        svg = create_language_bar_chart(languages, params['theme'], params['width'], params['height'], params['decimal_places'])
+    else:
+        svg = create_contributions_svg(username, data['contributions'], **params)
+    return encode_svg(svg)
+
+def write_atomic(path: Path, content: bytes) -> bool:
+    """Replace path with content unless it already has the same content hash; returns whether it was written"""
+    if path.exists():
+        with open(path, 'rb') as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(content).digest():
+                return False
+
+    # Write next to the target, then rename over it, so readers never see a partial file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp() creates owner-only files; exported cards are meant to be published
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return True
+
+def export_card(job: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker entry point: render and write one card"""
+    try:
+        written = write_atomic(Path(job['file']), render_card(job, data))
+    except Exception as e:
+        return {'file': job['file'], 'status': 'failed', 'error': str(e)}
+    return {'file': job['file'], 'status': 'written' if written else 'unchanged'}
+
+async def export_cards(jobs: List[Dict[str, Any]], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Fetch each user's data once, then render and write all cards across worker processes"""
+    fetched = await fetch_all(jobs)
+
+    results, pending = [], []
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for job in jobs:
+            user_data = fetched[job['username']]
+            try:
+                data = job_data(job, user_data)
+                failed = next((value for value in data.values() if isinstance(value, Exception)), None)
+                if failed is not None:
+                    raise failed
+            except Exception as e:
+                results.append({'file': job['file'], 'status': 'failed', 'error': f"Fetching data failed: {e}"})
+                continue
+            result = {'file': job['file']}
+            results.append(result)
+            pending.append((result, loop.run_in_executor(executor, export_card, job, data)))
+
+        for result, future in pending:
+            result.update(await future)
+    return results
+
+def main():
+    """Export the cards of a manifest"""
+    parser = argparse.ArgumentParser(description="Pre-render GitHub stats cards to SVG files")
+    parser.add_argument('manifest', type=Path, help="JSON manifest of cards to export")
+    parser.add_argument('--output', help="output directory (overrides the manifest's 'output')")
+    parser.add_argument('--workers', type=int, default=None, help="render processes (default: CPU count)")
+    args = parser.parse_args()
+
+    try:
+        output_dir, jobs = load_manifest(args.manifest, args.output)
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid manifest: {e}")
+        sys.exit(2)
+
+    print(f"Exporting {len(jobs)} cards to {output_dir}")
+    results = asyncio.run(export_cards(jobs, args.workers))
+
+    icons = {'written': '✅', 'unchanged': '⏭️ ', 'failed': '❌'}
+    for result in results:
+        name = os.path.relpath(result['file'], output_dir)
+        print(f"{icons[result['status']]} {name}: {result['status']}" + (f" ({result['error']})" if 'error' in result else ''))
+    counts = {status: sum(result['status'] == status for result in results) for status in icons}
+    print(f"🏁 {counts['written']} written, {counts['unchanged']} unchanged, {counts['failed']} failed")
+    if counts['failed']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
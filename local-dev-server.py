@@ -5,7 +5,8 @@ Simulates Vercel serverless functions for local testing
 """
 import sys
 import os
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse
 import importlib.util
 from dotenv import load_dotenv
@@ -13,6 +14,83 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Map endpoints to their corresponding files
+ENDPOINT_MAP = {
+    'health': 'api/health.py',
+    'account-general': 'api/account-general.py',
+    'top-languages': 'api/top-languages.py',
+    'contributions-graph': 'api/contributions-graph.py',
+    'views-counter': 'api/views-counter.py',
+    'batch': 'api/batch.py'
+}
+
+# Re-import an endpoint file when it changes on disk (set DEV_RELOAD=false for load testing)
+DEV_RELOAD = os.getenv('DEV_RELOAD', 'true').lower() == 'true'
+
+# endpoint -> (file mtime, LocalHandler class); loaded once instead of on every request
+_handler_cache = {}
+_handler_cache_lock = threading.Lock()
+
+def build_local_handler(module_path):
+    """Import an endpoint module and wrap its handler so it writes through the dev server's connection"""
+    spec = importlib.util.spec_from_file_location("handler_module", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # We'll inherit from the module's handler class and override the socket-related methods
+    class LocalHandler(module.handler):
+        def __init__(self, parent_handler):
+            # Don't call super().__init__ to avoid socket setup
+            self.path = parent_handler.path
+            self.headers = parent_handler.headers
+            self.rfile = parent_handler.rfile
+            self.command = parent_handler.command
+            self.request_version = parent_handler.request_version
+            self.parent = parent_handler
+        
+        def send_response(self, code, message=None):
+            return self.parent.send_response(code, message)
+        
+        def send_header(self, keyword, value):
+            return self.parent.send_header(keyword, value)
+        
+        def end_headers(self):
+            return self.parent.end_headers()
+        
+        @property
+        def wfile(self):
+            return self.parent.wfile
+
+        # Streamed (chunked) responses switch the status line to HTTP/1.1 and close the connection
+        @property
+        def protocol_version(self):
+            return self.parent.protocol_version
+
+        @protocol_version.setter
+        def protocol_version(self, value):
+            self.parent.protocol_version = value
+
+        @property
+        def close_connection(self):
+            return self.parent.close_connection
+
+        @close_connection.setter
+        def close_connection(self, value):
+            self.parent.close_connection = value
+
+    return LocalHandler
+
+def get_local_handler(endpoint):
+    """Return the cached handler class for an endpoint, re-importing it if its file changed"""
+    module_path = ENDPOINT_MAP[endpoint]
+    mtime = os.path.getmtime(module_path) if DEV_RELOAD else None
+    with _handler_cache_lock:
+        cached = _handler_cache.get(endpoint)
+        if cached is None or (DEV_RELOAD and cached[0] != mtime):
+            cached = (mtime, build_local_handler(module_path))
+            _handler_cache[endpoint] = cached
+        return cached[1]
+
 class LocalDevHandler(BaseHTTPRequestHandler):
     def do_GET(self):
         # Parse the URL
@@ -27,6 +105,13 @@ class LocalDevHandler(BaseHTTPRequestHandler):
             # Serve frontend files (for full-stack testing)
             self.serve_frontend()
     
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path.startswith('/api/'):
+            self.handle_api_request(path[5:], 'do_POST')
+        else:
+            self.send_error(405, "Method not allowed")
+    
     def do_OPTIONS(self):
         # Handle CORS preflight requests
         self.send_response(200)
@@ -35,54 +120,19 @@ class LocalDevHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
     
-    def handle_api_request(self, endpoint):
-        """Handle API requests by importing and calling the appropriate function"""
+    def handle_api_request(self, endpoint, method='do_GET'):
+        """Handle API requests by dispatching to the (cached) endpoint handler"""
         try:
-            # Map endpoints to their corresponding files
-            endpoint_map = {
-                'health': 'api/health.py',
-                'account-general': 'api/account-general.py',
-                'top-languages': 'api/top-languages.py',
-                'contributions-graph': 'api/contributions-graph.py',
-                'views-counter': 'api/views-counter.py'
-            }
-            
-            if endpoint not in endpoint_map:
+            if endpoint not in ENDPOINT_MAP:
                 self.send_error(404, f"Endpoint not found: {endpoint}")
                 return
             
-            # Import the module dynamically
-            module_path = endpoint_map[endpoint]
-            spec = importlib.util.spec_from_file_location("handler_module", module_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Create a temporary handler instance to access the logic
-            # We'll inherit from the module's handler class and override the socket-related methods
-            class LocalHandler(module.handler):
-                def __init__(self, parent_handler):
-                    # Don't call super().__init__ to avoid socket setup
-                    self.path = parent_handler.path
-                    self.headers = parent_handler.headers
-                    self.command = parent_handler.command
-                    self.parent = parent_handler
-                
-                def send_response(self, code, message=None):
-                    return self.parent.send_response(code, message)
-                
-                def send_header(self, keyword, value):
-                    return self.parent.send_header(keyword, value)
-                
-                def end_headers(self):
-                    return self.parent.end_headers()
-                
-                @property
-                def wfile(self):
-                    return self.parent.wfile
-            
             # Create the handler and call the method
-            handler = LocalHandler(self)
-            handler.do_GET()
+            handler = get_local_handler(endpoint)(self)
+            if not hasattr(handler, method):
+                self.send_error(405, f"Method not allowed for {endpoint}")
+                return
+            getattr(handler, method)()
             
         except Exception as e:
             print(f"Error handling {endpoint}: {e}")
@@ -114,11 +164,13 @@ def main():
     print(f"   - http://{host}:{port}/api/account-general")
     print(f"   - http://{host}:{port}/api/top-languages")
     print(f"   - http://{host}:{port}/api/contributions-graph")
+    print(f"   - http://{host}:{port}/api/batch")
     print(f"\nMake sure to run your frontend dev server on http://localhost:5173")
     print(f"Environment: {os.getenv('GITHUB_USERNAME', 'Not set')}")
     print(f"\nPress Ctrl+C to stop\n")
     
-    server = HTTPServer((host, port), LocalDevHandler)
+    # One thread per request, so slow GitHub calls do not block other requests
+    server = ThreadingHTTPServer((host, port), LocalDevHandler)
     
     try:
         server.serve_forever()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Production Server
+Hosts all API endpoints on one persistent asyncio event loop (aiohttp.web), as an
+alternative to the per-request serverless handlers in api/*.py.
+
+Requests are served concurrently and the render cache, the pooled GitHub HTTP
+session and the process itself survive between requests. The endpoints reuse the
+same parameter parsing, render_* coroutines and response building as the handlers.
+"""
+import json
+import os
+import sys
+from urllib.parse import parse_qs
+
+from aiohttp import ClientSession, TCPConnector, web
+
+# Same import layout as the serverless handlers
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from utils.account_general_generator import render_account_general_svg
+from utils.batch import parse_batch, render_batch, to_query_params
+from utils.contributions_graph_generator import render_contributions_svg
+from utils.endpoints import (
+    parse_account_general_params, parse_contributions_graph_params,
+    parse_top_languages_params, parse_views_counter_params, resolve_username,
+)
+from utils.github_client import graphql_circuit, token_pool
+from utils.http_session import set_shared_session
+from utils.render_cache import PendingSVG
+from utils.responses import SVG_STREAMING, prepare_json_response, prepare_svg_response
+from utils.top_languages_generator import render_top_languages_svg
+from utils.background import drain_background_tasks
+from utils.views_counter_generator import render_views_counter_svg
+
+# Upper bound for concurrent connections to GitHub from the shared session
+SERVER_HTTP_CONNECTIONS = int(os.getenv('SERVER_HTTP_CONNECTIONS', 20))
+
+CORS_HEADERS = {'Access-Control-Allow-Origin': '*'}
+
+def json_response(payload: dict, status: int = 200, indent: int = None) -> web.Response:
+    return web.json_response(payload, status=status, headers=CORS_HEADERS, dumps=lambda data: json.dumps(data, indent=indent))
+
+def without_content_length(headers):
+    # aiohttp frames the body itself (Content-Length or chunked)
+    return [(name, value) for name, value in headers if name != 'Content-Length']
+
+def web_response(status: int, headers, body: bytes) -> web.Response:
+    """Turn a prepared (status, headers, body) triple into an aiohttp response"""
+    return web.Response(status=status, headers=without_content_length(headers), body=body or None)
+
+async def send_svg(request: web.Request, rendered, endpoint: str, extra_headers=None) -> web.StreamResponse:
+    """aiohttp counterpart of utils.responses.send_svg"""
+    streaming = SVG_STREAMING and isinstance(rendered, PendingSVG)
+    status, headers, body = prepare_svg_response(request.headers, rendered, endpoint, extra_headers, streaming)
+
+    if status == 200 and streaming:
+        response = web.StreamResponse(status=status, headers=without_content_length(headers))
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        # Should rendering fail from here on, aiohttp logs it and closes the connection without the final chunk
+        for chunk in body:
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+    return web_response(status, headers, body)
+
+def github_endpoint(endpoint: str, parse_params, render):
+    """Build a request handler for an SVG card rendered from the configured user's GitHub data"""
+    async def handle(request: web.Request) -> web.StreamResponse:
+        query_params = parse_qs(request.query_string)
+        try:
+            username = resolve_username(query_params)
+        except ValueError as e:
+            return json_response({"error": "Invalid request parameters", "message": str(e)}, status=400)
+        if not username:
+            return json_response({
+                "error": "GitHub username not configured",
+                "message": "GITHUB_USERNAME environment variable is required"
+            }, status=500)
+        try:
+            params = parse_params(query_params)
+            rendered = await render(username=username, **params)
+        except Exception as e:
+            return json_response({"error": "Invalid request parameters", "message": str(e)}, status=400)
+        return await send_svg(request, rendered, endpoint)
+    return handle
+
+async def handle_views_counter(request: web.Request) -> web.StreamResponse:
+    try:
+        query_params = parse_qs(request.query_string)
+        params = parse_views_counter_params(query_params)
+        rendered = await render_views_counter_svg(user_agent=request.headers.get('User-Agent', ''),
+                                                  username=resolve_username(query_params), **params)
+    except Exception as e:
+        return json_response({"error": str(e)}, status=400)
+    return await send_svg(request, rendered, 'views-counter', {
+        'Pragma': 'no-cache',
+        'Expires': '0'
+    })
+
+async def handle_batch(request: web.Request) -> web.Response:
+    """Several cards in one request, as JSON (POST body or the `cards` query parameter of a GET)"""
+    try:
+        if request.method == 'POST':
+            payload = await request.json()
+        else:
+            payload = {"cards": json.loads(request.query.get('cards', 'null')), "username": request.query.get('username')}
+        cards = parse_batch(payload)
+        username = resolve_username(to_query_params({'username': payload.get('username')}))
+    except Exception as e:
+        return web_response(*prepare_json_response(request.headers, {"error": "Invalid request parameters", "message": str(e)}, 400))
+
+    if not username:
+        return json_response({
+            "error": "GitHub username not configured",
+            "message": "GITHUB_USERNAME environment variable is required"
+        }, status=500)
+
+    results = await render_batch(cards, username, request.headers.get('User-Agent', ''))
+    return web_response(*prepare_json_response(request.headers, {"cards": results}))
+
+async def handle_health(request: web.Request) -> web.Response:
+    return json_response({
+        "status": "healthy",
+        "service": "GitHub Stats Animator API",
+        "version": "1.0.0",
+        "endpoints": [
+            "/api/health",
+            "/api/account-general",
+            "/api/top-languages",
+            "/api/contributions-graph"
+        ],
+        # GraphQL budget per GitHub token (tokens are masked)
+        "github_tokens": token_pool().metrics(),
+        # Whether GitHub is currently skipped as failing (see circuit_breaker)
+        "circuits": [graphql_circuit.metrics()]
+    }, indent=2)
+
+async def handle_options(request: web.Request) -> web.Response:
+    return web.Response(headers={
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type',
+    })
+
+async def shared_session_context(app: web.Application):
+    """Keep one pooled GitHub HTTP session open for the lifetime of the server"""
+    session = ClientSession(connector=TCPConnector(limit=SERVER_HTTP_CONNECTIONS))
+    set_shared_session(session)
+    yield
+    # Background refreshes and probes still use the session
+    await drain_background_tasks()
+    set_shared_session(None)
+    await session.close()
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app.cleanup_ctx.append(shared_session_context)
+    app.router.add_get('/api/health', handle_health)
+    app.router.add_get('/api/account-general', github_endpoint('account-general', parse_account_general_params, render_account_general_svg))
+    app.router.add_get('/api/top-languages', github_endpoint('top-languages', parse_top_languages_params, render_top_languages_svg))
+    app.router.add_get('/api/contributions-graph', github_endpoint('contributions-graph', parse_contributions_graph_params, render_contributions_svg))
+    app.router.add_get('/api/views-counter', handle_views_counter)
+    app.router.add_get('/api/batch', handle_batch)
+    app.router.add_post('/api/batch', handle_batch)
+    app.router.add_route('OPTIONS', '/api/{endpoint}', handle_options)
+    return app
+
+def main():
+    """Start the production server"""
+    port = int(os.getenv('SERVER_PORT', 8080))
+    host = os.getenv('SERVER_HOST', '0.0.0.0')
+    print(f"Starting GitHub Stats Animator server on http://{host}:{port}/api/")
+    web.run_app(create_app(), host=host, port=port, print=None)
+
+if __name__ == '__main__':
+    main()
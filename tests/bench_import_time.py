@@ -0,0 +1,93 @@
+"""
+Benchmark: cold-start import time of every serverless endpoint module.
+
+- Imports each api/*.py handler in a fresh interpreter (as a cold serverless start does),
+  with the production environment (VERCEL=1), several times, and reports the median
+- Fails if a module that must stay lazy (aiohttp, psycopg2, dotenv) is imported eagerly
+- Writes a JSON + Markdown report to /tests/results for CI to track
+
+Usage: python tests/bench_import_time.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+ENDPOINTS = ['health', 'account-general', 'top-languages', 'contributions-graph', 'views-counter']
+
+# Only needed once a request actually talks to GitHub / the database / a local .env
+LAZY_MODULES = ['aiohttp', 'psycopg2', 'dotenv']
+
+# Runs in the child interpreter: import the handler file and report time and loaded modules
+IMPORT_SCRIPT = """
+import importlib.util, json, sys, time
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location('handler_module', sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - started
+print(json.dumps({'seconds': elapsed, 'modules': sorted(sys.modules)}))
+"""
+
+def measure(endpoint: str, runs: int) -> dict:
+    """Median import time of one endpoint module over several cold interpreters"""
+    env = dict(os.environ, VERCEL='1', PYTHONDONTWRITEBYTECODE='1')
+    timings, modules = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_SCRIPT, str(project_root / "api" / f"{endpoint}.py")],
+            cwd=project_root / "api", env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['seconds'])
+        modules = result['modules']
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 1),
+        'min_ms': round(min(timings) * 1000, 1),
+        'modules': len(modules),
+        'eager_heavy_imports': [name for name in LAZY_MODULES if name in modules],
+    }
+
+def bench_import_time(runs: int = 5):
+    """
+    Measure cold import time of every endpoint module.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results = {endpoint: measure(endpoint, runs) for endpoint in ENDPOINTS}
+
+    report_lines = [
+        "# Endpoint Import Time (cold interpreter, VERCEL=1)",
+        "",
+        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ({runs} runs per module)",
+        "",
+        "| Endpoint | median (ms) | min (ms) | modules | eager heavy imports |",
+        "|---|---|---|---|---|",
+    ]
+    for endpoint, result in results.items():
+        eager = ', '.join(result['eager_heavy_imports']) or '-'
+        report_lines.append(f"| {endpoint} | {result['median_ms']} | {result['min_ms']} | {result['modules']} | {eager} |")
+        status = "✅" if not result['eager_heavy_imports'] else "❌"
+        print(f"{status} {endpoint}: {result['median_ms']} ms, {result['modules']} modules, eager: {eager}")
+
+    with open(RESULTS_DIR / f"bench_import_time_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    with open(RESULTS_DIR / f"bench_import_time_{timestamp}.md", 'w', encoding='utf-8') as f:
+        f.write("\n".join(report_lines) + "\n")
+    print(f"📁 Import time report: bench_import_time_{timestamp}.md")
+
+    eager = [endpoint for endpoint, result in results.items() if result['eager_heavy_imports']]
+    assert not eager, f"Heavy modules imported eagerly by: {', '.join(eager)}"
+    return results
+
+if __name__ == "__main__":
+    bench_import_time(runs=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,172 @@
+"""
+Benchmark: concurrent load against the serverless handlers vs the long-running server.
+
+- Serves the api/*.py handlers from a stdlib HTTPServer (one request at a time, a new
+  event loop per request - as the local dev server and the serverless runtime do)
+- Serves the same endpoints from server.py (one persistent asyncio loop)
+- Fires the same concurrent request mix at both, using sample data with a simulated
+  GitHub round trip, and reports throughput and latency percentiles
+- Writes a JSON + Markdown report to /tests/results
+
+Usage: python tests/bench_server_load.py [requests] [concurrency] [latency_seconds]
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+import aiohttp
+from aiohttp import web
+
+# Add the project root and api/ to the Python path (the handlers import through utils.*)
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+
+os.environ.setdefault('GITHUB_USERNAME', 'octocat')
+
+from tests.sample_data import use_sample_data
+from utils.render_cache import render_cache
+from utils.user_cache import user_cache
+from server import create_app
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+# Request mix, cycled through by the load generator
+PATHS = [
+    '/api/account-general?theme=dark&icon=github&slot1=stars&slot2=commits_total',
+    '/api/top-languages?theme=dark&languages_count=8',
+    '/api/contributions-graph?theme=dark',
+    '/api/views-counter?theme=dark',
+]
+
+def load_handler(name: str):
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), project_root / "api" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.handler
+
+HANDLERS = {name: load_handler(name) for name in ['account-general', 'top-languages', 'contributions-graph', 'views-counter']}
+
+class HandlerDispatcher(BaseHTTPRequestHandler):
+    """Routes /api/<endpoint> to the matching serverless handler's do_GET"""
+
+    def do_GET(self):
+        HANDLERS[urlparse(self.path).path[5:]].do_GET(self)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_handlers() -> tuple:
+    server = HTTPServer(('127.0.0.1', 0), HandlerDispatcher)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+def start_async_server() -> tuple:
+    # The server gets its own loop in a background thread, like a separate process would
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    runner = web.AppRunner(create_app())
+
+    async def start():
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        return runner.addresses[0][1]
+    port = asyncio.run_coroutine_threadsafe(start(), loop).result()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+    return f"http://127.0.0.1:{port}", stop
+
+async def run_load(base_url: str, total: int, concurrency: int) -> dict:
+    """Send total requests with the given concurrency and collect latencies"""
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(PATHS[i % len(PATHS)])
+
+    async def worker(session):
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            started = time.perf_counter()
+            async with session.get(base_url + path, headers={'Accept-Encoding': 'gzip'}) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': total,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(total / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+async def bench_server_load(total: int = 200, concurrency: int = 16, latency: float = 0.05):
+    """
+    Compare the serverless handlers with the long-running server under the same load.
+    """
+    with use_sample_data('utils', latency=latency):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        results = {}
+        for name, start in [('handlers', start_handlers), ('server', start_async_server)]:
+            render_cache.clear()
+            user_cache.clear()
+            base_url, stop = start()
+            try:
+                results[name] = await run_load(base_url, total, concurrency)
+            finally:
+                stop()
+            print(f"🚀 {name}: {results[name]}")
+
+    speedup = results['server']['requests_per_second'] / results['handlers']['requests_per_second']
+    report_lines = [
+        "# Server Load Benchmark",
+        "",
+        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**Load:** {total} requests, concurrency {concurrency}, simulated GitHub latency {latency * 1000:.0f} ms",
+        "",
+        "| Target | req/s | p50 (ms) | p95 (ms) | errors |",
+        "|---|---|---|---|---|",
+    ]
+    for name, result in results.items():
+        report_lines.append(f"| {name} | {result['requests_per_second']} | {result['p50_ms']} | {result['p95_ms']} | {result['errors']} |")
+    report_lines += ["", f"**Throughput ratio (server / handlers):** {speedup:.1f}x"]
+
+    with open(RESULTS_DIR / f"bench_server_load_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    with open(RESULTS_DIR / f"bench_server_load_{timestamp}.md", 'w', encoding='utf-8') as f:
+        f.write("\n".join(report_lines) + "\n")
+    print(f"📁 Load report: bench_server_load_{timestamp}.md ({speedup:.1f}x throughput)")
+    return results
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(bench_server_load(
+        total=int(args[0]) if len(args) > 0 else 200,
+        concurrency=int(args[1]) if len(args) > 1 else 16,
+        latency=float(args[2]) if len(args) > 2 else 0.05,
+    ))
@@ -0,0 +1,83 @@
+"""
+Benchmark: SVG size regression for the compacting output stage.
+
+- Renders every SVG card from deterministic sample data, raw and compacted
+- Compares compacted sizes against tests/svg_size_baseline.json
+- Fails if any card grows beyond the allowed tolerance
+- Writes a JSON report to /tests/results
+
+Run with --update-baseline after an intentional size change.
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.bench_wire_size import ENDPOINTS
+from tests.sample_data import use_sample_data
+from api.utils import svg_output
+from api.utils.render_cache import render_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+BASELINE_PATH = project_root / "tests" / "svg_size_baseline.json"
+
+# Allowed growth over the baseline before the benchmark fails (the contributions
+# graph varies slightly with the weekday, since the current week is partial)
+SIZE_TOLERANCE = 0.05
+
+async def render_sizes(compact: bool) -> dict:
+    """Render every endpoint with compaction on or off and return body sizes"""
+    svg_output.SVG_COMPACT = compact
+    render_cache.clear()
+    try:
+        return {endpoint: (await render()).size for endpoint, render in ENDPOINTS.items()}
+    finally:
+        svg_output.SVG_COMPACT = True
+        render_cache.clear()
+
+async def bench_svg_size(update_baseline: bool = False):
+    """
+    Measure raw vs compacted SVG sizes and check them against the baseline.
+    """
+    with use_sample_data():
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        raw_sizes = await render_sizes(compact=False)
+        compact_sizes = await render_sizes(compact=True)
+
+    if update_baseline or not BASELINE_PATH.exists():
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(compact_sizes, f, indent=2)
+            f.write("\n")
+        print(f"📝 Baseline written: {BASELINE_PATH.name}")
+
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    failures = []
+    for endpoint, size in compact_sizes.items():
+        saved = (1 - size / raw_sizes[endpoint]) * 100
+        limit = baseline.get(endpoint, size) * (1 + SIZE_TOLERANCE)
+        status = "✅" if size <= limit else "❌"
+        print(f"{status} {endpoint}: raw={raw_sizes[endpoint]} compact={size} (-{saved:.1f}%) baseline={baseline.get(endpoint)}")
+        if size > limit:
+            failures.append(endpoint)
+
+    with open(RESULTS_DIR / f"bench_svg_size_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump({'raw': raw_sizes, 'compact': compact_sizes, 'baseline': baseline}, f, indent=2)
+
+    assert not failures, f"SVG size regression for: {', '.join(failures)}"
+
+if __name__ == "__main__":
+    asyncio.run(bench_svg_size(update_baseline='--update-baseline' in sys.argv))
@@ -0,0 +1,79 @@
+"""
+Benchmark: bytes on the wire per SVG endpoint and content-coding.
+
+- Renders every SVG card from deterministic sample data (no GitHub API calls)
+- Records the response body size for identity, gzip and (if installed) brotli
+- Writes a JSON + Markdown report to /tests/results
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import use_sample_data
+from api.utils.account_general_generator import render_account_general_svg
+from api.utils.contributions_graph_generator import render_contributions_svg
+from api.utils.top_languages_generator import render_top_languages_svg
+from api.utils.views_counter_generator import render_views_counter_svg
+from api.utils.compression import SUPPORTED_ENCODINGS
+from api.utils.render_cache import render_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+# Endpoint name -> coroutine factory rendering the card with default parameters
+ENDPOINTS = {
+    'account-general': lambda: render_account_general_svg(
+        'octocat', icon='github', slots=['stars', 'commits_total', 'commits_current_year', 'pull_requests', 'issues']),
+    'top-languages': lambda: render_top_languages_svg('octocat', theme='dark', languages_count=8),
+    'contributions-graph': lambda: render_contributions_svg('octocat', theme='dark'),
+    'views-counter': lambda: render_views_counter_svg(user_agent='benchmark', theme='dark'),
+}
+
+async def bench_wire_size():
+    """
+    Measure encoded response sizes for every SVG endpoint.
+    """
+    with use_sample_data():
+        render_cache.clear()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        encodings = ['identity'] + SUPPORTED_ENCODINGS
+
+        results = {}
+        for endpoint, render in ENDPOINTS.items():
+            rendered = await render()
+            results[endpoint] = {encoding: len(render_cache.encoded(rendered, encoding)) for encoding in encodings}
+
+    report_lines = [
+        "# Bytes on the Wire per Endpoint",
+        "",
+        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        "| Endpoint | " + " | ".join(encodings) + " |",
+        "|---" * (len(encodings) + 1) + "|",
+    ]
+    for endpoint, sizes in results.items():
+        cells = [f"{sizes['identity']}"] + [
+            f"{sizes[encoding]} ({sizes[encoding] / sizes['identity'] * 100:.1f}%)" for encoding in encodings[1:]
+        ]
+        report_lines.append(f"| {endpoint} | " + " | ".join(cells) + " |")
+        print(f"📦 {endpoint}: " + ", ".join(f"{encoding}={size}" for encoding, size in sizes.items()))
+
+    with open(RESULTS_DIR / f"bench_wire_size_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    with open(RESULTS_DIR / f"bench_wire_size_{timestamp}.md", 'w', encoding='utf-8') as f:
+        f.write("\n".join(report_lines) + "\n")
+    print(f"📁 Wire size report: bench_wire_size_{timestamp}.md")
+    return results
+
+if __name__ == "__main__":
+    asyncio.run(bench_wire_size())
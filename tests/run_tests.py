@@ -22,13 +22,95 @@ async def run_all_tests():
     # Import and run account general tests
     from tests.test_account_general import main as test_account_general
     from tests.test_views_counter import test_views_counter
+    from tests.test_contributions_graph import test_contributions_graph
+    from tests.test_render_cache import test_render_cache
+    from tests.test_svg_output import test_svg_output
+    from tests.test_batch import test_batch
+    from tests.test_export_cards import test_export_cards
+    from tests.test_multi_user import test_multi_user
+    from tests.test_token_pool import test_token_pool
+    from tests.test_query_planner import test_query_planner
+    from tests.test_pagination import test_pagination
+    from tests.test_language_cache import test_language_cache
+    from tests.test_language_weights import test_language_weights
+    from tests.test_chart_layout import test_chart_layout
+    from tests.test_streaks import test_streaks
+    from tests.test_contributions_range import test_contributions_range
+    from tests.test_stale_while_revalidate import test_stale_while_revalidate
+    from tests.test_circuit_breaker import test_circuit_breaker
+    from tests.sample_data import reset_caches
 
     print("Running Account General tests...")
     await test_account_general()
 
+    reset_caches()
     print("\nRunning Views Counter tests...")
     await test_views_counter()
 
+    reset_caches()
+    print("\nRunning Contributions Graph tests...")
+    await test_contributions_graph()
+
+    reset_caches()
+    print("\nRunning Render Cache tests...")
+    await test_render_cache()
+
+    reset_caches()
+    print("\nRunning SVG Output tests...")
+    await test_svg_output()
+
+    reset_caches()
+    print("\nRunning Batch tests...")
+    await test_batch()
+
+    reset_caches()
+    print("\nRunning Export tests...")
+    await test_export_cards()
+
+    reset_caches()
+    print("\nRunning Multi-User tests...")
+    await test_multi_user()
+
+    reset_caches()
+    print("\nRunning Token Pool tests...")
+    await test_token_pool()
+
+    reset_caches()
+    print("\nRunning Query Planner tests...")
+    await test_query_planner()
+
+    reset_caches()
+    print("\nRunning Pagination tests...")
+    await test_pagination()
+
+    reset_caches()
+    print("\nRunning Language Cache tests...")
+    await test_language_cache()
+
+    reset_caches()
+    print("\nRunning Language Weight tests...")
+    await test_language_weights()
+
+    reset_caches()
+    print("\nRunning Chart Layout tests...")
+    await test_chart_layout()
+
+    reset_caches()
+    print("\nRunning Streak tests...")
+    await test_streaks()
+
+    reset_caches()
+    print("\nRunning Contributions Range tests...")
+    await test_contributions_range()
+
+    reset_caches()
+    print("\nRunning Stale-While-Revalidate tests...")
+    await test_stale_while_revalidate()
+
+    reset_caches()
+    print("\nRunning Circuit Breaker tests...")
+    await test_circuit_breaker()
+
     print("\n" + "=" * 60)
     print("🏁 All test suites completed!")
     print(f"📁 Check results in: {project_root / 'tests' / 'results'}")
@@ -0,0 +1,177 @@
+"""
+Deterministic sample GitHub data for offline tests and benchmarks.
+
+Provides GraphQL-shaped payloads for every card and a context manager that points
+the generator API clients at them, so SVGs can be rendered without a GitHub token, and a local stand-in for GitHub's
+GraphQL API for the tests of the client itself.
+"""
+
+import asyncio
+import importlib
+import os
+import random
+import sys
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Handler of the fake GraphQL endpoint
+GraphQLHandler = Callable[[web.Request], Awaitable[web.Response]]
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from api.utils.contributions_graph_generator import get_contributions_year_range
+
+SAMPLE_LANGUAGES = [
+    ('Python', '#3572A5'), ('JavaScript', '#f1e05a'), ('TypeScript', '#3178c6'),
+    ('C#', '#178600'), ('Rust', '#dea584'), ('Go', '#00ADD8'), ('HTML', '#e34c26'),
+    ('CSS', '#563d7c'), ('Shell', '#89e051'), ('C++', '#f34b7d'), ('Jupyter Notebook', '#DA5B0B'),
+]
+
+def build_sample_calendar(seed: int = 42) -> dict:
+    """Build a deterministic contribution calendar covering the displayed range."""
+    rnd = random.Random(seed)
+    start_date, end_date = get_contributions_year_range()
+    day = start_date.date()
+    weeks, week, total = [], [], 0
+    while day <= end_date.date():
+        count = rnd.choice([0, 0, 0, 1, 2, 4, 7, 12])
+        total += count
+        week.append({
+            'contributionCount': count,
+            'date': day.isoformat(),
+            'weekday': (day.weekday() + 1) % 7,
+        })
+        if len(week) == 7:
+            weeks.append({'contributionDays': week})
+            week = []
+        day += timedelta(days=1)
+    if week:
+        weeks.append({'contributionDays': week})
+    return {'totalContributions': total, 'weeks': weeks}
+
+def build_sample_repositories(count: int = 40, seed: int = 42) -> list:
+    """Build repository nodes shaped like the top-languages GraphQL response."""
+    rnd = random.Random(seed)
+    repos = []
+    for i in range(count):
+        languages = rnd.sample(SAMPLE_LANGUAGES, rnd.randint(1, 4))
+        repos.append({
+            'name': f'sample-repo-{i}',
+            'pushedAt': f'2024-{i % 12 + 1:02d}-15T12:00:00Z',
+            'languages': {'edges': [
+                {'size': rnd.randint(500, 250000), 'node': {'name': name, 'color': color}}
+                for name, color in languages
+            ]},
+        })
+    return repos
+
+def build_sample_account(username: str = 'octocat') -> dict:
+    """Build consolidated account data shaped like GitHubAccountStatsAPI.fetch_account_stats output."""
+    return {
+        'login': username,
+        'name': 'Sample User',
+        'avatarUrl': None,
+        'createdAt': '2016-03-01T12:00:00Z',
+        'totalStars': 159,
+        'repositoriesContributedTo': {'totalCount': 17},
+        'pullRequests': {'totalCount': 256},
+        'issues': {'totalCount': 88},
+        'totalCommits': 4321,
+        'totalCodeReviews': 97,
+        'currentYearCommits': 612,
+        'last6MonthsCommits': 301,
+        'currentStreak': 23,
+    }
+
+@contextmanager
+def use_sample_data(package: str = 'api.utils', latency: float = 0.0):
+    """Point the generator API clients at the sample data instead of GitHub, within the block.
+
+    package selects the module tree to patch ('utils' for the handlers and server.py, which
+    import through api/ on sys.path); latency simulates the GitHub round trip in seconds.
+    The fetch methods, including wrappers added to them inside the block (count_calls), the
+    token pool and GITHUB_TOKEN are restored on exit.
+    """
+    account_general_generator = importlib.import_module(f'{package}.account_general_generator')
+    contribution_calendar = importlib.import_module(f'{package}.contribution_calendar')
+    contributions_graph_generator = importlib.import_module(f'{package}.contributions_graph_generator')
+    github_client = importlib.import_module(f'{package}.github_client')
+    top_languages_generator = importlib.import_module(f'{package}.top_languages_generator')
+
+    async def fetch_contributions(self, username, *args, **kwargs):
+        await asyncio.sleep(latency)
+        return contribution_calendar.calendar_days(build_sample_calendar())
+
+    async def fetch_top_languages_graphql(self, username, *args, **kwargs):
+        await asyncio.sleep(latency)
+        return top_languages_generator.language_matrix(
+            dict(repo, languages=top_languages_generator.language_breakdown(repo)) for repo in build_sample_repositories())
+
+    async def fetch_account_stats(self, username, needed_stats=None, *args, **kwargs):
+        await asyncio.sleep(latency)
+        return build_sample_account(username)
+
+    patches = [
+        (contributions_graph_generator.GitHubContributionsAPI, 'fetch_contributions', fetch_contributions),
+        (top_languages_generator.GitHubLanguagesGraphQL, 'fetch_top_languages_graphql', fetch_top_languages_graphql),
+        (account_general_generator.GitHubAccountStatsAPI, 'fetch_account_stats', fetch_account_stats),
+    ]
+    originals = [(cls, name, cls.__dict__[name]) for cls, name, _ in patches]
+    original_token, original_pool = os.environ.get('GITHUB_TOKEN'), github_client._token_pool
+    os.environ.setdefault('GITHUB_TOKEN', 'sample-token')
+    for cls, name, fetch in patches:
+        setattr(cls, name, fetch)
+    try:
+        yield
+    finally:
+        for cls, name, fetch in originals:
+            setattr(cls, name, fetch)
+        if original_token is None:
+            os.environ.pop('GITHUB_TOKEN', None)
+        github_client._token_pool = original_pool
+        reset_caches()
+
+def reset_caches():
+    """Clear the user data and render caches of both module trees, so tests don't serve each other's data"""
+    for package in ('api.utils', 'utils'):
+        user_cache = sys.modules.get(f'{package}.user_cache')
+        render_cache = sys.modules.get(f'{package}.render_cache')
+        if user_cache is not None:
+            user_cache.user_cache.clear()
+        if render_cache is not None:
+            render_cache.render_cache.clear()
+
+@asynccontextmanager
+async def fake_github(graphql: GraphQLHandler, tokens: Iterable[str] = ('token-a',)):
+    """Send the GraphQL requests of api.utils.github_client to graphql() on a local server, within the block.
+
+    Yields the token pool built from tokens. On exit the GraphQL URL, token pool and circuit
+    breaker are restored, the caches cleared and the server closed.
+    """
+    from api.utils import github_client
+
+    app = web.Application()
+    app.router.add_post('/graphql', graphql)
+    server = TestServer(app)
+    await server.start_server()
+    original_url, original_pool = github_client.GITHUB_GRAPHQL_URL, github_client._token_pool
+    github_client.GITHUB_GRAPHQL_URL = str(server.make_url('/graphql'))
+    pool = github_client._token_pool = github_client.TokenPool(list(tokens))
+    github_client.graphql_circuit.reset()
+    reset_caches()
+    try:
+        yield pool
+    finally:
+        github_client.GITHUB_GRAPHQL_URL, github_client._token_pool = original_url, original_pool
+        github_client.graphql_circuit.reset()
+        reset_caches()
+        await server.close()
@@ -29,8 +29,9 @@ from api.utils.account_general_generator import (
     calculate_basic_stats,
     create_account_general_svg,
     THEMES,
-    STAT_CONFIGS,
+    stat_label,
 )
+from tests.sample_data import use_sample_data
 
 # Absolute path to results directory
 RESULTS_DIR = project_root / "tests" / "results"
@@ -130,7 +131,7 @@ class AccountGeneralTester:
                     if slot is None:
                         continue
                     value = stats.get(slot, 0)
-                    label = STAT_CONFIGS.get(slot, {}).get('label', slot.replace('_', ' ').title())
+                    label = stat_label(slot)
                     from api.utils.account_general_generator import format_number, create_stat_item_svg
                     formatted_value = format_number(value)
                     x = stats_x
@@ -296,7 +297,7 @@ async def main():
     
     if not github_token:
         print("⚠️  GITHUB_TOKEN not found in environment variables")
-        print("   Tests will run but may not fetch real data")
+        print("   Rendering from sample data instead")
     
     if not github_username:
         print("⚠️  GITHUB_USERNAME not found in environment variables")
@@ -315,7 +316,11 @@ async def main():
     print()
     
     tester = AccountGeneralTester()
-    await tester.run_all_tests()
+    if github_token:
+        await tester.run_all_tests()
+    else:
+        with use_sample_data():
+            await tester.run_all_tests()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+Controlled test for batch rendering.
+
+- Renders a mixed batch of cards from deterministic sample data (no GitHub API calls)
+- Checks each GitHub dataset is fetched once per batch, even for different parameters
+- Checks invalid cards are reported without failing the rest of the batch
+- Checks the handler answers invalid or oversized request bodies with a JSON error
+- Writes the batch result to /tests/results
+"""
+
+import asyncio
+import http.client
+import importlib.util
+import json
+import sys
+import threading
+from datetime import datetime
+from http.server import HTTPServer
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import use_sample_data
+from api.utils import account_general_generator, contributions_graph_generator, top_languages_generator
+from api.utils.batch import render_batch
+from api.utils.render_cache import render_cache
+from api.utils.user_cache import user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+def count_calls(cls, name: str, calls: dict):
+    """Wrap a (patched) fetch method so its calls are counted under name"""
+    fetch = getattr(cls, name)
+
+    async def counted(self, *args, **kwargs):
+        calls[name] = calls.get(name, 0) + 1
+        return await fetch(self, *args, **kwargs)
+    setattr(cls, name, counted)
+
+def check_body_length():
+    """The serverless handler rejects invalid Content-Length headers (400) and oversized bodies (413) as JSON"""
+    spec = importlib.util.spec_from_file_location('batch_handler', project_root / "api" / "batch.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.handler.log_message = lambda *args: None
+    server = HTTPServer(('127.0.0.1', 0), module.handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for length, status in (('abc', 400), ('-5', 400), (str(module.MAX_BODY_BYTES + 1), 413)):
+            connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=5)
+            connection.putrequest('POST', '/api/batch')
+            connection.putheader('Content-Length', length)
+            connection.endheaders()
+            response = connection.getresponse()
+            body = json.loads(response.read())
+            connection.close()
+            assert response.status == status and body['error'] == "Invalid request parameters", \
+                f"Content-Length {length}: {response.status} {body}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+async def test_batch():
+    """
+    Render one batch with several configurations of every card type.
+    """
+    check_body_length()
+
+    with use_sample_data(latency=0.01):
+        render_cache.clear()
+        user_cache.clear()
+        calls = {}
+        count_calls(account_general_generator.GitHubAccountStatsAPI, 'fetch_account_stats', calls)
+        count_calls(contributions_graph_generator.GitHubContributionsAPI, 'fetch_contributions', calls)
+        count_calls(top_languages_generator.GitHubLanguagesGraphQL, 'fetch_top_languages_graphql', calls)
+
+        cards = [
+            {'id': 'stats-dark', 'type': 'account-general', 'params': {'theme': 'dark', 'slot1': 'stars'}},
+            {'id': 'stats-streak', 'type': 'account-general', 'params': {'theme': 'light', 'icon': 'streak', 'slot1': 'issues'}},
+            {'id': 'langs-5', 'type': 'top-languages', 'params': {'theme': 'dark'}},
+            {'id': 'langs-8', 'type': 'top-languages', 'params': {'theme': 'light', 'languages_count': 8, 'count_other_languages': True}},
+            {'id': 'graph-dark', 'type': 'contributions-graph', 'params': {'theme': 'dark'}},
+            {'id': 'graph-big', 'type': 'contributions-graph', 'params': {'theme': 'light', 'square_size': 14}},
+            {'id': 'views', 'type': 'views-counter', 'params': {'animated': False}},
+            {'id': 'bad-theme', 'type': 'top-languages', 'params': {'theme': 'purple'}},
+            {'id': 'bad-type', 'type': 'pie-chart'},
+        ]
+        results = await render_batch(cards, 'octocat', user_agent='batch-test')
+
+        by_id = {result['id']: result for result in results}
+        assert [result['id'] for result in results] == [card['id'] for card in cards], "Results out of order"
+        for card in cards[:7]:
+            result = by_id[card['id']]
+            assert result['status'] == 200 and result['svg'].startswith('<svg'), f"{card['id']} failed: {result.get('error')}"
+        assert by_id['bad-theme']['status'] == 400 and 'Invalid theme' in by_id['bad-theme']['error']
+        assert by_id['bad-type']['status'] == 400 and 'Invalid card type' in by_id['bad-type']['error']
+        assert calls == {'fetch_account_stats': 1, 'fetch_contributions': 1, 'fetch_top_languages_graphql': 1}, \
+            f"Shared data fetched more than once: {calls}"
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"batch_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Batch of {len(cards)} cards rendered with fetches: {calls}")
+
+if __name__ == "__main__":
+    asyncio.run(test_batch())
@@ -0,0 +1,69 @@
+"""
+Controlled test for the languages chart layout.
+
+- Renders charts of several sizes from fixed languages (no GitHub API calls)
+- Checks the layout is computed once per (width, height, language count, decimal places)
+- Checks measured labels end before the percentages column and stay inside the card
+- Writes the rendered charts to /tests/results
+"""
+
+import asyncio
+import re
+import sys
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from api.utils.text_metrics import text_width
+from api.utils.top_languages_generator import TOP_LANGUAGE_LABEL, build_language_chart_layout, create_language_bar_chart
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+LANGUAGES = [
+    ("Jupyter Notebook", 46.0, "#DA5B0B"), ("Python", 30.5, "#3572A5"), ("Vim Script", 12.25, "#199f4b"),
+    ("C", 6.0, "#555555"), ("Other", 5.25, "#858585"),
+]
+
+LABEL_PATTERN = re.compile(r'<text x="([\d.]+)" y="[\d.]+" \s*fill="[^"]+" [^>]*font-size="([\d.]+)" font-weight="(\d+)"[^>]*>([^<]+)</text>')
+
+async def test_chart_layout():
+    """
+    Lay out the same languages at several sizes.
+    """
+    # Proportional, not monospace
+    assert text_width("iiii", 10) < text_width("MMMM", 10) / 3
+    assert text_width("Python", 10, bold=True) > text_width("Python", 10)
+
+    build_language_chart_layout.cache_clear()
+    sizes = [(200, 150), (400, 300), (1000, 800)]
+    for width, height in sizes:
+        for decimal_places in (0, 5):
+            for _ in range(3):
+                svg = create_language_bar_chart(LANGUAGES, "dark", width, height, decimal_places)
+            layout = build_language_chart_layout(width, height, len(LANGUAGES), decimal_places)
+
+            labels = LABEL_PATTERN.findall(svg)
+            names = [name.replace('&#160;', ' ') for _, _, _, name in labels if 'fill="none"' not in name]
+            assert TOP_LANGUAGE_LABEL.format("Jupyter Notebook") in names and "Vim Script" in names, names
+            for x, font_size, weight, name in labels:
+                label_width = text_width(name.replace('&#160;', ' '), float(font_size), bold=weight == '600')
+                assert float(x) >= layout['padding'] - 1e-9, f"Label {name} starts outside the card at {width}x{height}"
+                assert float(x) + label_width <= layout['label_end'] + 1e-9 or float(x) == layout['padding'], \
+                    f"Label {name} runs into the percentages at {width}x{height}"
+
+            with open(RESULTS_DIR / f"chart_layout_{width}x{height}_{decimal_places}.svg", 'w', encoding='utf-8') as f:
+                f.write(svg)
+
+    info = build_language_chart_layout.cache_info()
+    assert info.misses == len(sizes) * 2, f"Layout recomputed: {info}"
+    assert info.hits >= len(sizes) * 2 * 3, f"Layout not reused: {info}"
+    print(f"✅ Chart layout checks passed: {info.misses} layouts for {info.hits + info.misses} charts")
+
+if __name__ == "__main__":
+    asyncio.run(test_chart_layout())
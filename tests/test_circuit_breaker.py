@@ -0,0 +1,162 @@
+"""
+Controlled test for the GitHub circuit breaker and last-known-good cards.
+
+- Serves contribution calendars from a local stand-in for api.github.com that can be made to fail (no GitHub API calls)
+- Checks failing requests serve the graph as last rendered instead of an error card
+- Checks GitHub isn't called anymore after repeated failures, and cached data is rendered meanwhile
+- Checks a background probe closes the circuit once GitHub answers again
+- Writes the circuit metrics to /tests/results
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import GraphQLHandler, fake_github
+from api.utils.background import drain_background_tasks
+from api.utils.circuit_breaker import CircuitBreaker, CircuitOpen
+from api.utils.contributions_graph_generator import render_contributions_svg
+from api.utils.github_client import graphql_circuit
+from api.utils.user_cache import user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+def fake_graphql(state: dict) -> GraphQLHandler:
+    """GraphQL endpoint answering the last year's calendar, or 502 while state['failing']"""
+    async def graphql(request: web.Request) -> web.Response:
+        query = (await request.json())['query']
+        state['requests'].append('probe' if 'userContributions' not in query else 'calendar')
+        if state['failing']:
+            return web.Response(status=502, text='Bad Gateway')
+        today = datetime.now(timezone.utc).date()
+        start = today - timedelta(days=365)
+        days = [{'contributionCount': (start + timedelta(days=i)).day % 4, 'date': (start + timedelta(days=i)).isoformat()}
+                for i in range(366)]
+        user = {'contributionsCollection': {'contributionCalendar': {
+            'weeks': [{'contributionDays': days[i:i + 7]} for i in range(0, len(days), 7)]}}}
+        return web.json_response({'data': {
+            'rateLimit': {'cost': 1, 'remaining': 4000, 'resetAt': '2099-01-01T00:00:00Z'},
+            'user': user if 'userContributions' in query else None,
+        }})
+
+    return graphql
+
+async def check_breaker_states():
+    """Open after the threshold, fail fast, and close after one successful background probe"""
+    healthy = [False]
+    probes = []
+
+    async def probe():
+        probes.append(time.monotonic())
+        if not healthy[0]:
+            raise Exception("still failing")
+
+    breaker = CircuitBreaker('upstream', probe, failure_threshold=3, probe_interval=0.02)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.check()
+    breaker.record_success()
+    assert breaker.failures == 0, "Success didn't reset the failure count"
+
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.is_open
+    for _ in range(10):
+        try:
+            breaker.check()
+        except CircuitOpen:
+            continue
+        raise AssertionError("Open circuit let a request through")
+    await drain_background_tasks()
+    assert probes == [], "Probed before the probe interval"
+
+    # A failed probe keeps the circuit open until the next interval
+    await asyncio.sleep(0.03)
+    for _ in range(5):
+        try:
+            breaker.check()
+        except CircuitOpen:
+            pass
+    await drain_background_tasks()
+    assert len(probes) == 1 and breaker.is_open, probes
+
+    healthy[0] = True
+    await asyncio.sleep(0.03)
+    try:
+        breaker.check()
+    except CircuitOpen:
+        pass
+    await drain_background_tasks()
+    assert len(probes) == 2 and not breaker.is_open, "Successful probe didn't close the circuit"
+    breaker.check()
+
+async def test_circuit_breaker():
+    """
+    Render a contributions graph while GitHub fails and recovers.
+    """
+    await check_breaker_states()
+
+    state = {'failing': False, 'requests': []}
+    original_breaker = graphql_circuit.failure_threshold, graphql_circuit.probe_interval
+    graphql_circuit.failure_threshold, graphql_circuit.probe_interval = 3, 0.05
+    try:
+        async with fake_github(fake_graphql(state)):
+            good = (await render_contributions_svg('octocat', theme='dark')).body
+            assert b'Error' not in good
+
+            # GitHub fails and nothing is cached: the graph as last rendered, for the same parameters only
+            state['failing'] = True
+            user_cache.clear()
+            for _ in range(3):
+                assert (await render_contributions_svg('octocat', theme='dark')).body == good, "Last good graph not served"
+            assert graphql_circuit.is_open, graphql_circuit.metrics()
+            calls = len(state['requests'])
+
+            # Open: GitHub isn't called at all, and the rendering isn't slowed down by it
+            started = time.perf_counter()
+            for _ in range(20):
+                assert (await render_contributions_svg('octocat', theme='dark')).body == good
+            other = (await render_contributions_svg('octocat', theme='light')).body
+            assert b'Error generating contributions' in other, "Unrendered parameters should get the error card"
+            assert len(state['requests']) == calls, f"GitHub called while the circuit is open: {state['requests'][calls:]}"
+            assert time.perf_counter() - started < 1
+
+            # Cached data (a snapshot of any age) is rendered while the circuit is open
+            user_cache.put('octocat', ('contributions', 'octocat'),
+                           {'start': (date.today() - timedelta(days=365)).isoformat(), 'counts': [3] * 366})
+            snapshot = (await render_contributions_svg('octocat', theme='light', text='SNAP')).body
+            assert b'Error' not in snapshot and b'3 contributions' in snapshot
+
+            # GitHub is back: a background probe closes the circuit and requests go through again
+            state['failing'] = False
+            user_cache.clear()
+            await asyncio.sleep(0.06)
+            await render_contributions_svg('octocat', theme='dark')
+            await drain_background_tasks()
+            assert not graphql_circuit.is_open and state['requests'][-1] == 'probe', state['requests'][calls:]
+            recovered = (await render_contributions_svg('octocat', theme='light')).body
+            assert b'Error' not in recovered and state['requests'][-1] == 'calendar'
+            metrics = graphql_circuit.metrics()
+    finally:
+        graphql_circuit.failure_threshold, graphql_circuit.probe_interval = original_breaker
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"circuit_breaker_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump({'metrics': metrics, 'requests': state['requests']}, f, indent=2)
+    print(f"✅ Circuit breaker checks passed: {metrics['rejected']} requests kept from GitHub over {metrics['trips']} trip(s)")
+
+if __name__ == "__main__":
+    asyncio.run(test_circuit_breaker())
@@ -0,0 +1,58 @@
+"""
+Controlled test for Contributions Graph SVG generation.
+
+- Builds a synthetic contribution calendar (no GitHub API calls needed)
+- Generates SVGs for a few controlled configurations
+- Verifies the animation skeleton is cached and reused between renders
+- Follows project testing rules: all results in /tests/results (absolute path)
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from api.utils.contributions_graph_generator import create_contributions_svg, build_contributions_skeleton
+from api.utils.contribution_calendar import calendar_days
+from tests.sample_data import build_sample_calendar
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+async def test_contributions_graph():
+    """
+    Generate contributions SVGs from sample data and check skeleton caching.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    calendar_data = calendar_days(build_sample_calendar())
+
+    configs = [
+        {'theme': 'dark', 'text': 'ADBREEKER', 'square_size': 11},
+        {'theme': 'light', 'text': 'HELLO', 'square_size': 6, 'animation_time': 4.0, 'pause_time': 2.0},
+    ]
+
+    build_contributions_skeleton.cache_clear()
+    for i, config in enumerate(configs, 1):
+        svg = create_contributions_svg('test', calendar_data, **config)
+        filename = f"contributions_graph_{i}_{config['theme']}_{timestamp}.svg"
+        with open(RESULTS_DIR / filename, 'w', encoding='utf-8') as f:
+            f.write(svg)
+        print(f"✅ Contributions graph SVG generated: {filename} ({len(svg)} bytes)")
+
+    # Same parameters with different data must reuse the cached skeleton and still differ in colours
+    first = create_contributions_svg('test', calendar_data, **configs[0])
+    other = create_contributions_svg('test', calendar_days(build_sample_calendar(seed=7)), **configs[0])
+    cache_info = build_contributions_skeleton.cache_info()
+    assert cache_info.hits >= 2, f"Skeleton cache was not reused: {cache_info}"
+    assert first != other, "Different contribution data rendered identical SVGs"
+    print(f"✅ Skeleton cache reused: {cache_info}")
+
+if __name__ == "__main__":
+    asyncio.run(test_contributions_graph())
@@ -0,0 +1,146 @@
+"""
+Controlled test for contributions graphs of a year or a from/to range.
+
+- Serves year calendars from a local stand-in for api.github.com (no GitHub API calls)
+- Checks a range is assembled from the calendars of the years it covers, fetched concurrently
+- Checks days are placed on the right squares, and days before the range stay empty
+- Checks completed years are fetched once, even after their data expired
+- Checks the year and from/to parameters are validated, by the endpoint and the generator
+- Writes the rendered graphs to /tests/results
+"""
+
+import asyncio
+import json
+import re
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import GraphQLHandler, fake_github
+from api.utils.contribution_calendar import join_days
+from api.utils.contributions_graph_generator import InvalidContributionsRange, contributions_range, render_contributions_svg
+from api.utils.endpoints import parse_contributions_graph_params
+from api.utils.user_cache import user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+SQUARE_PATTERN = re.compile(r'<rect id="square-(\d+)-(\d+)"[^>]*><title>([^<]+)</title>')
+
+def day_count(day: date) -> int:
+    """Contributions of a day in the fake calendars: its day of the month"""
+    return day.day
+
+def fake_graphql(requests: list, in_flight: list) -> GraphQLHandler:
+    """GraphQL endpoint answering year calendars, tracking the requests served at once"""
+    async def graphql(request: web.Request) -> web.Response:
+        query = (await request.json())['query']
+        year = int(re.search(r'from: "(\d{4})', query).group(1))
+        requests.append(year)
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight[1], in_flight[0])
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        start, end = date(year, 1, 1), min(date(year, 12, 31), datetime.now(timezone.utc).date())
+        days = [{'contributionCount': day_count(start + timedelta(days=i)), 'date': (start + timedelta(days=i)).isoformat()}
+                for i in range((end - start).days + 1)]
+        return web.json_response({'data': {
+            'rateLimit': {'cost': 1, 'remaining': 4000, 'resetAt': '2099-01-01T00:00:00Z'},
+            'user': {'contributionsCollection': {'contributionCalendar': {
+                'weeks': [{'contributionDays': days[i:i + 7]} for i in range(0, len(days), 7)]}}},
+        }})
+
+    return graphql
+
+def squares(svg: str) -> dict:
+    """Tooltip of every square by (week, weekday)"""
+    return {(int(week), int(day)): title for week, day, title in SQUARE_PATTERN.findall(svg)}
+
+async def test_contributions_range():
+    """
+    Render graphs of a past year and of a range across years.
+    """
+    # Chunks are placed by their first day, and days outside every chunk count 0
+    chunks = [{'start': '2021-12-30', 'counts': [1, 2, 3]}, {'start': '2022-01-03', 'counts': [5, 6]}, {'start': None, 'counts': []}]
+    assert join_days(chunks, date(2021, 12, 31), date(2022, 1, 4)) == {'start': '2021-12-31', 'counts': [2, 3, 0, 5, 6]}
+
+    # Parameters
+    params = parse_contributions_graph_params({'year': ['2023']})
+    assert (params['year'], params['date_from'], params['date_to']) == (2023, None, None)
+    params = parse_contributions_graph_params({'from': ['2022-11-01'], 'to': ['2023-02-28']})
+    assert contributions_range(params['year'], params['date_from'], params['date_to']) == (date(2022, 11, 1), date(2023, 2, 28))
+    assert contributions_range(date_to='2023-02-28')[1] == date(2023, 2, 28)
+    for invalid in ({'year': ['2007']}, {'year': ['2023'], 'from': ['2023-01-01']}, {'from': ['2023-13-01']},
+                    {'from': ['2023-03-01'], 'to': ['2023-02-01']}, {'from': ['2010-01-01'], 'to': ['2020-01-01']}):
+        try:
+            parse_contributions_graph_params(invalid)
+        except ValueError:
+            continue
+        raise AssertionError(f"Invalid parameters accepted: {invalid}")
+
+    requests, in_flight = [], [0, 0]
+    async with fake_github(fake_graphql(requests, in_flight)):
+        # The generator validates ranges on its own: they get a card saying so, not a token error
+        for invalid in ({'year': date.today().year + 1}, {'date_from': '2023-03-01', 'date_to': '2023-02-01'},
+                        {'date_from': '2010-01-01', 'date_to': '2020-01-01'}, {'date_to': '2999-01-01'}):
+            try:
+                contributions_range(**invalid)
+            except InvalidContributionsRange:
+                pass
+            else:
+                raise AssertionError(f"Invalid range accepted: {invalid}")
+            card = (await render_contributions_svg('octocat', theme='dark', **invalid)).text
+            assert 'Invalid parameters' in card and 'Token' not in card, f"Wrong card for {invalid}: {card}"
+        assert requests == [], f"GitHub called for invalid ranges: {requests}"
+
+        # A past year: January 1st 2023 is a Sunday, so the year fills 53 weeks from the first square
+        year = (await render_contributions_svg('octocat', theme='dark', year=2023)).text
+        assert requests == [2023], requests
+        year_squares = squares(year)
+        assert len(year_squares) == 365 and max(week for week, _ in year_squares) == 52
+        assert year_squares[(0, 0)] == "1 contribution on Jan 01, 2023"
+        assert year_squares[(52, 0)] == "31 contributions on Dec 31, 2023"
+
+        # A range across two years: both calendars are fetched at once, and the days of the first
+        # week before the range (November 1st 2022 is a Tuesday) stay empty
+        requests.clear()
+        user_cache.clear()
+        in_flight[1] = 0
+        ranged = (await render_contributions_svg('octocat', theme='light', date_from='2022-11-01', date_to='2023-02-28')).text
+        assert sorted(requests) == [2022, 2023] and in_flight[1] == 2, (requests, in_flight)
+        range_squares = squares(ranged)
+        assert range_squares[(0, 0)] == range_squares[(0, 1)] == "No data"
+        assert range_squares[(0, 2)] == "1 contribution on Nov 01, 2022"
+        last_week = max(week for week, _ in range_squares)
+        assert range_squares[(last_week, max(day for week, day in range_squares if week == last_week))] == \
+            "28 contributions on Feb 28, 2023"
+
+        # Completed years are served from the cache from then on, even after their data expired
+        requests.clear()
+        user_cache.ttl, ttl = 0.001, user_cache.ttl
+        await asyncio.sleep(0.01)
+        try:
+            again = (await render_contributions_svg('octocat', theme='dark', text='AGAIN', year=2022)).text
+        finally:
+            user_cache.ttl = ttl
+        assert requests == [], f"Completed years refetched: {requests}"
+        assert "1 contribution on Jan 01, 2022" in again
+
+    for name, svg in (('year_2023', year), ('range_2022_2023', ranged)):
+        with open(RESULTS_DIR / f"contributions_{name}.svg", 'w', encoding='utf-8') as f:
+            f.write(svg)
+    with open(RESULTS_DIR / f"contributions_range_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", 'w', encoding='utf-8') as f:
+        json.dump({'year_squares': len(year_squares), 'range_squares': len(range_squares)}, f, indent=2)
+    print(f"✅ Contributions range checks passed: {len(year_squares)} days of 2023, {len(range_squares)} squares across 2022-2023")
+
+if __name__ == "__main__":
+    asyncio.run(test_contributions_range())
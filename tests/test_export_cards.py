@@ -0,0 +1,109 @@
+"""
+Controlled test for the static card export.
+
+- Exports a manifest of cards for two users from deterministic sample data (no GitHub API calls)
+- Checks each user's datasets are fetched once and the files match the endpoints' output
+- Checks a second export skips unchanged files and only rewrites changed cards
+- Writes the exported cards to /tests/results
+"""
+
+import asyncio
+import json
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+import export_cards
+from tests.sample_data import use_sample_data
+from tests.test_batch import count_calls
+from utils import account_general_generator, contributions_graph_generator, top_languages_generator
+from utils.render_cache import render_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+async def test_export_cards():
+    """
+    Export a manifest twice and compare against the single-card render path.
+    """
+    with use_sample_data(package='utils'):
+        calls = {}
+        count_calls(account_general_generator.GitHubAccountStatsAPI, 'fetch_account_stats', calls)
+        count_calls(contributions_graph_generator.GitHubContributionsAPI, 'fetch_contributions', calls)
+        count_calls(top_languages_generator.GitHubLanguagesGraphQL, 'fetch_top_languages_graphql', calls)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        export_dir = RESULTS_DIR / f"export_{timestamp}"
+        export_dir.mkdir()
+        manifest = {
+            'username': 'octocat',
+            'output': 'cards',
+            'cards': [
+                {'file': 'stats-dark.svg', 'type': 'account-general', 'params': {'theme': 'dark', 'slot1': 'stars'}},
+                {'file': 'stats-flip.svg', 'type': 'account-general', 'params': {'icon': 'github+streak', 'slot1': 'issues'}},
+                {'file': 'langs.svg', 'type': 'top-languages', 'params': {'theme': 'light', 'languages_count': 8}},
+                {'file': 'graph.svg', 'type': 'contributions-graph', 'params': {'theme': 'dark'}},
+                {'file': 'other/langs.svg', 'type': 'top-languages', 'username': 'hubot', 'params': {'count_other_languages': True}},
+            ],
+        }
+        manifest_path = export_dir / "manifest.json"
+        manifest_path.write_text(json.dumps(manifest), encoding='utf-8')
+
+        output_dir, jobs = export_cards.load_manifest(manifest_path)
+        results = await export_cards.export_cards(jobs, workers=2)
+        assert [result['status'] for result in results] == ['written'] * 5, f"Export failed: {results}"
+        assert calls == {'fetch_account_stats': 1, 'fetch_contributions': 1, 'fetch_top_languages_graphql': 2}, \
+            f"User data fetched more than once: {calls}"
+        fetched = dict(calls)
+
+        # Exported files are byte-identical to what the endpoints serve
+        render_cache.clear()
+        for job in jobs:
+            render = {
+                'account-general': account_general_generator.render_account_general_svg,
+                'top-languages': top_languages_generator.render_top_languages_svg,
+                'contributions-graph': contributions_graph_generator.render_contributions_svg,
+            }[job['type']]
+            rendered = await render(username=job['username'], **job['params'])
+            assert Path(job['file']).read_bytes() == rendered.body, f"{job['file']} differs from the endpoint output"
+
+        # Unchanged content is skipped; a changed card is rewritten
+        results = await export_cards.export_cards(jobs, workers=2)
+        assert [result['status'] for result in results] == ['unchanged'] * 5, f"Unchanged files rewritten: {results}"
+        manifest['cards'][2]['params']['theme'] = 'dark'
+        manifest_path.write_text(json.dumps(manifest), encoding='utf-8')
+        _, jobs = export_cards.load_manifest(manifest_path)
+        results = await export_cards.export_cards(jobs, workers=2)
+        assert [result['status'] for result in results] == ['unchanged', 'unchanged', 'written', 'unchanged', 'unchanged'], \
+            f"Wrong files rewritten: {results}"
+        assert not list(output_dir.rglob('*.tmp')), "Temporary files left behind"
+
+    # Invalid manifests are rejected before anything is fetched
+    for card, message in [
+        ({'file': '../escape.svg', 'type': 'top-languages'}, 'invalid file'),
+        ({'file': 'views.svg', 'type': 'views-counter'}, 'invalid card type'),
+        ({'file': 'stats-dark.svg', 'type': 'top-languages'}, 'duplicate file'),
+        ({'file': 'bad.svg', 'type': 'top-languages', 'params': {'theme': 'purple'}}, 'Invalid theme'),
+    ]:
+        manifest_path.write_text(json.dumps(dict(manifest, cards=manifest['cards'] + [card])), encoding='utf-8')
+        try:
+            export_cards.load_manifest(manifest_path)
+        except ValueError as e:
+            assert message in str(e), f"Unexpected error for {card}: {e}"
+        else:
+            raise AssertionError(f"Invalid card accepted: {card}")
+
+    shutil.copytree(output_dir, RESULTS_DIR / f"export_cards_{timestamp}")
+    shutil.rmtree(export_dir)
+    print(f"✅ Exported {len(jobs)} cards with fetches: {fetched}")
+
+if __name__ == "__main__":
+    asyncio.run(test_export_cards())
@@ -0,0 +1,87 @@
+"""
+Controlled test for the per-repository language cache.
+
+- Serves GraphQL from a local stand-in for api.github.com (no GitHub API calls)
+- Checks only repositories pushed since the last fetch (or new ones) get their languages refetched
+- Checks the totals updated by difference match a full fetch, also for removed and excluded repositories
+- Writes the requests of each fetch to /tests/results
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import fake_github
+from tests.test_pagination import PUSHED_AT, fake_graphql
+from api.utils.top_languages_generator import GitHubLanguagesGraphQL, weigh_languages
+from api.utils.user_cache import user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+def sizes(matrix: dict, exclude_repos: list = None) -> dict:
+    return {name: entry['size'] for name, entry in weigh_languages(matrix, 'bytes', exclude_repos).items()}
+
+async def test_language_cache():
+    """
+    Refetch the language totals of an account after some repositories changed.
+    """
+    repositories = {index: PUSHED_AT for index in range(250)}
+    requests = []
+    log = {}
+
+    async def fetch(name: str, **kwargs) -> dict:
+        requests.clear()
+        matrix = await api.fetch_top_languages_graphql('octocat', **kwargs)
+        log[name] = [str(request) for request in requests]
+        return matrix
+
+    async with fake_github(fake_graphql(requests, repositories)):
+        api = GitHubLanguagesGraphQL()
+        await fetch('first')
+        assert sorted(log['first']) == sorted(['userRepositories'] * 3 + [str(('repositoryLanguages', 100))] * 2 + [str(('repositoryLanguages', 50))])
+
+        # Nothing pushed: only the cheap listing
+        await fetch('unchanged')
+        assert log['unchanged'] == ['userRepositories'] * 3, log['unchanged']
+
+        # Two pushed, one removed, one added: only three repositories are refetched
+        repositories[5] = repositories[120] = '2025-06-01T00:00:00Z'
+        del repositories[7]
+        repositories[300] = PUSHED_AT
+        updated = await fetch('updated')
+        assert log['updated'] == ['userRepositories'] * 3 + [str(('repositoryLanguages', 3))], log['updated']
+
+        # The same totals as a full fetch
+        user_cache.clear()
+        assert sizes(updated) == sizes(await fetch('full')), "Totals updated by difference differ from a full fetch"
+        column_sums = [0] * len(updated['languages'])
+        for row in updated['rows']:
+            for column, size in row:
+                column_sums[column] += size
+        assert len(updated['repos']) == 250 and column_sums == updated['totals'], "Matrix rows and totals out of sync"
+
+        # Excluded repositories are masked out of the matrix, as if they didn't exist
+        excluded = sizes(updated, ['repo-5', 'repo-300'])
+        del repositories[5], repositories[300]
+        user_cache.clear()
+        assert excluded == sizes(await fetch('full_excluded')), "Excluded repositories not taken out of the totals"
+        assert excluded != sizes(updated)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"language_cache_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump(log, f, indent=2)
+    print(f"✅ Language cache checks passed: {len(log['first'])} requests for the first fetch, {len(log['updated'])} after a push")
+
+if __name__ == "__main__":
+    asyncio.run(test_language_cache())
@@ -0,0 +1,119 @@
+"""
+Controlled test for the language weighting modes.
+
+- Builds a language matrix from fixed repositories (no GitHub API calls)
+- Checks each weighting mode (bytes, repos, recent, sqrt) against totals computed by hand
+- Checks excluded repositories are masked out, and the weight parameter is validated
+- Checks every count and language exclusion of a weighting is served from one cached ranking
+- Renders one card per weighting from sample data and writes them to /tests/results
+"""
+
+import asyncio
+import json
+import math
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import use_sample_data
+from api.utils import top_languages_generator
+from api.utils.endpoints import WEIGHT_OPTIONS, parse_top_languages_params
+from api.utils.top_languages_generator import (
+    RECENCY_HALF_LIFE_DAYS, aggregate_top_languages, get_top_languages_graphql, language_matrix, rank_languages,
+    render_top_languages_svg, weigh_languages,
+)
+from api.utils.user_cache import user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+def pushed(days_ago: float) -> str:
+    return datetime.fromtimestamp(time.time() - days_ago * 86400, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+# One large old repository and two small recent ones
+REPOSITORIES = [
+    {'name': 'kernel', 'pushedAt': pushed(4 * RECENCY_HALF_LIFE_DAYS), 'languages': {'C': [90000, '#555555'], 'Shell': [10000, '#89e051']}},
+    {'name': 'site', 'pushedAt': pushed(0), 'languages': {'TypeScript': [4000, '#3178c6'], 'Shell': [100, '#89e051']}},
+    {'name': 'tool', 'pushedAt': pushed(0), 'languages': {'Rust': [9000, '#dea584']}},
+]
+
+def sizes(totals: dict) -> dict:
+    return {name: round(entry['size'], 3) for name, entry in totals.items()}
+
+async def test_language_weights():
+    """
+    Weigh the same repositories in every mode.
+    """
+    matrix = language_matrix(REPOSITORIES)
+    assert json.loads(json.dumps(matrix)) == matrix, "Matrix not JSON-serializable for the cache"
+
+    expected = {
+        'bytes': {'C': 90000, 'Shell': 10100, 'TypeScript': 4000, 'Rust': 9000},
+        'repos': {'C': 1, 'Shell': 2, 'TypeScript': 1, 'Rust': 1},
+        'recent': {'C': 90000 / 16, 'Shell': 10000 / 16 + 100, 'TypeScript': 4000, 'Rust': 9000},
+        'sqrt': {'C': math.sqrt(90000), 'Shell': math.sqrt(10000) + 10, 'TypeScript': math.sqrt(4000), 'Rust': 3 * math.sqrt(1000)},
+    }
+    assert set(expected) == set(WEIGHT_OPTIONS)
+    for weight, totals in expected.items():
+        assert sizes(weigh_languages(matrix, weight)) == sizes({name: {'size': size} for name, size in totals.items()}), \
+            f"Unexpected {weight} totals: {weigh_languages(matrix, weight)}"
+    assert weigh_languages(matrix)['C']['color'] == '#555555'
+
+    # The old repository dominates by bytes, but not by recency
+    assert aggregate_top_languages(rank_languages(weigh_languages(matrix, 'bytes')), 1)[0][0] == 'C'
+    assert aggregate_top_languages(rank_languages(weigh_languages(matrix, 'recent')), 1)[0][0] == 'Rust'
+
+    # Excluded repositories are masked out, with their languages
+    assert sizes(weigh_languages(matrix, 'bytes', ['kernel'])) == {'Shell': 100, 'TypeScript': 4000, 'Rust': 9000}
+    assert sizes(weigh_languages(matrix, 'repos', ['kernel', 'tool'])) == {'Shell': 1, 'TypeScript': 1}
+
+    # Query parameters
+    params = parse_top_languages_params({'weight': ['sqrt'], 'exclude_repos': ['dotfiles,site']})
+    assert params['weight'] == 'sqrt' and params['exclude_repos'] == ['dotfiles', 'site']
+    assert parse_top_languages_params({})['weight'] == 'bytes'
+    try:
+        parse_top_languages_params({'weight': ['lines']})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Invalid weight accepted")
+
+    # One card per weighting, from sample data
+    with use_sample_data():
+        user_cache.clear()
+        bodies = {}
+        for weight in WEIGHT_OPTIONS:
+            rendered = await render_top_languages_svg('octocat', weight=weight)
+            bodies[weight] = rendered.body
+            with open(RESULTS_DIR / f"top_languages_{weight}.svg", 'wb') as f:
+                f.write(rendered.body)
+        assert len(set(bodies.values())) == len(WEIGHT_OPTIONS), "Weightings rendered the same card"
+
+        # Counts and language exclusions reuse the ranking of their weighting
+        rankings = []
+        original_rank = top_languages_generator.rank_languages
+        top_languages_generator.rank_languages = lambda totals: rankings.append(totals) or original_rank(totals)
+        try:
+            for languages_count in (1, 3, 8):
+                for exclude_languages in ([], ['Python'], ['Go', 'Rust', 'HTML']):
+                    for count_other_languages in (False, True):
+                        await get_top_languages_graphql('octocat', languages_count, exclude_languages, count_other_languages, weight='repos')
+        finally:
+            top_languages_generator.rank_languages = original_rank
+        assert len(rankings) == 0, f"Languages ranked again for a cached weighting: {len(rankings)} times"
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"language_weights_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump({weight: sizes(weigh_languages(matrix, weight)) for weight in WEIGHT_OPTIONS}, f, indent=2)
+    print(f"✅ Language weight checks passed: {', '.join(WEIGHT_OPTIONS)}")
+
+if __name__ == "__main__":
+    asyncio.run(test_language_weights())
@@ -0,0 +1,121 @@
+"""
+Controlled test for multi-user mode.
+
+- Checks the `username` parameter against GITHUB_USERNAME, the allow-list and open mode
+- Renders cards for several users from deterministic sample data (no GitHub API calls)
+- Checks fetched data is reused across requests and the per-user cache stays within its bounds
+- Writes the cache statistics to /tests/results
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import use_sample_data
+from tests.test_batch import count_calls
+from api.utils import endpoints, top_languages_generator
+from api.utils.render_cache import render_cache
+from api.utils.user_cache import UserDataCache, user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+def check_resolve_username():
+    """Username resolution in single-user, allow-list and open mode"""
+    configured = os.environ.get('GITHUB_USERNAME')
+    os.environ['GITHUB_USERNAME'] = 'octocat'
+    resolve = lambda username=None: endpoints.resolve_username({'username': [username]} if username else {})
+
+    endpoints.ALLOWED_USERNAMES = set()
+    assert resolve() == 'octocat'
+    assert resolve('OctoCat') == 'OctoCat', "The configured user is always allowed"
+    for username, message in [('hubot', 'not enabled'), ('bad name', 'Invalid username'), ('-x', 'Invalid username')]:
+        try:
+            resolve(username)
+        except ValueError as e:
+            assert message in str(e), f"Unexpected error for {username}: {e}"
+        else:
+            raise AssertionError(f"Username accepted: {username}")
+
+    endpoints.ALLOWED_USERNAMES = {'hubot', 'monalisa'}
+    assert resolve('Hubot') == 'Hubot'
+    try:
+        resolve('torvalds')
+    except ValueError as e:
+        assert 'not allowed' in str(e)
+    else:
+        raise AssertionError("Username outside the allow-list accepted")
+
+    endpoints.ALLOWED_USERNAMES = {'*'}
+    assert resolve('torvalds') == 'torvalds'
+    del os.environ['GITHUB_USERNAME']
+    try:
+        resolve()
+    except ValueError as e:
+        assert 'Missing username' in str(e)
+    else:
+        raise AssertionError("Missing username accepted in multi-user mode")
+    endpoints.ALLOWED_USERNAMES = set()
+    assert resolve() is None, "Unconfigured single-user deployment should report no username"
+    if configured is not None:
+        os.environ['GITHUB_USERNAME'] = configured
+
+def check_cache_bounds():
+    """LRU eviction by user count and byte budget, and TTL expiry"""
+    cache = UserDataCache(ttl=60, max_users=3, max_bytes=10_000)
+    for i in range(5):
+        cache.put(f'user{i}', ('data',), {'value': i})
+    assert cache.stats()['users'] == 3 and cache.get('user0', ('data',)) is None
+    assert cache.get('USER4', ('data',)) == {'value': 4}, "Usernames are case-insensitive"
+
+    cache.get('user2', ('data',))
+    cache.put('big', ('data',), 'x' * 9_000)
+    assert cache.stats()['bytes'] <= 10_000
+    assert cache.get('user2', ('data',)) is not None, "Recently used user evicted first"
+
+    expired = UserDataCache(ttl=0.01)
+    expired.put('octocat', ('data',), 1)
+    time.sleep(0.02)
+    assert expired.get('octocat', ('data',)) is None, "Expired data returned"
+
+async def test_multi_user():
+    """
+    Serve cards for several users from one process.
+    """
+    check_resolve_username()
+    check_cache_bounds()
+
+    with use_sample_data():
+        render_cache.clear()
+        user_cache.clear()
+        calls = {}
+        count_calls(top_languages_generator.GitHubLanguagesGraphQL, 'fetch_top_languages_graphql', calls)
+
+        users = ['octocat', 'hubot', 'monalisa']
+        for _ in range(3):
+            for username in users:
+                rendered = await top_languages_generator.render_top_languages_svg(username=username, theme='dark')
+                assert rendered.text.startswith('<svg'), f"Rendering failed for {username}"
+        assert calls == {'fetch_top_languages_graphql': len(users)}, f"Data refetched across requests: {calls}"
+        stats = user_cache.stats()
+        assert stats['users'] == len(users) and stats['bytes'] <= stats['max_bytes']
+        render_stats = render_cache.stats()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"multi_user_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump({'user_cache': stats, 'render_cache': render_stats, 'fetches': calls}, f, indent=2)
+    print(f"✅ Multi-user checks passed: {stats}")
+
+if __name__ == "__main__":
+    asyncio.run(test_multi_user())
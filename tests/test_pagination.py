@@ -0,0 +1,137 @@
+"""
+Controlled test for repository pagination.
+
+- Serves GraphQL from a local stand-in for api.github.com with an account of 1,050 repositories (no GitHub API calls)
+- Checks stars and language totals cover every page, not only the first 100 repositories
+- Checks the next page is requested while the current one is aggregated
+- Checks the aggregated totals are cached, so a second render makes no requests
+- Writes the request counts to /tests/results
+"""
+
+import asyncio
+import json
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from aiohttp import web
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import GraphQLHandler, fake_github
+from api.utils.account_general_generator import GitHubAccountStatsAPI, calculate_basic_stats
+from api.utils.github_client import iter_pages
+from api.utils.top_languages_generator import get_top_languages_graphql
+from api.utils.user_cache import user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+REPOSITORIES = 1050
+LANGUAGES = [('Python', '#3572A5'), ('Go', '#00ADD8'), ('Rust', '#dea584')]
+PUSHED_AT = '2024-01-01T00:00:00Z'
+
+def repository(index: int, language_edges: int, pushed_at: str = PUSHED_AT) -> dict:
+    """Deterministic repository node: stars and languages vary with the index (and size with pushedAt)"""
+    scale = 2 if pushed_at != PUSHED_AT else 1
+    edges = [{'size': (index % 5 + 1) * (position + 1) * 100 * scale, 'node': {'name': name, 'color': color}}
+             for position, (name, color) in enumerate(LANGUAGES[:index % 3 + 1])]
+    return {'id': f'R{index}', 'name': f'repo-{index}', 'pushedAt': pushed_at, 'stargazerCount': index % 7,
+            'languages': {'edges': edges[:language_edges]}}
+
+def fake_graphql(requests: list, repositories: dict = None) -> GraphQLHandler:
+    """GraphQL endpoint paginating the repositories (index -> pushedAt) of one account, 100 per page"""
+    if repositories is None:
+        repositories = {index: PUSHED_AT for index in range(REPOSITORIES)}
+
+    async def graphql(request: web.Request) -> web.Response:
+        payload = await request.json()
+        query, variables = payload['query'], payload['variables']
+        operation = re.search(r'query (\w+)', query).group(1)
+        requests.append((operation, len(variables.get('ids', []))) if 'ids' in variables else operation)
+        edges = re.search(r'languages\(first: (\d+)', query)
+        edges = int(edges.group(1)) if edges else 0
+        if operation == 'repositoryLanguages':
+            data = {'nodes': [repository(int(node_id[1:]), edges, repositories[int(node_id[1:])])
+                              for node_id in variables['ids']]}
+        else:
+            indexes = list(repositories)
+            start = int(variables.get('cursor') or 0)
+            end = min(start + 100, len(indexes))
+            data = {'user': {'repositories': {
+                'totalCount': len(indexes),
+                'pageInfo': {'hasNextPage': end < len(indexes), 'endCursor': str(end)},
+                'nodes': [repository(i, edges, repositories[i]) for i in indexes[start:end]],
+            }}}
+            if operation == 'userBasicInfo':
+                data['user'].update({'login': 'octocat', 'name': 'Octocat', 'avatarUrl': '', 'createdAt': '2020-01-01T00:00:00Z'})
+        await asyncio.sleep(0.005)
+        return web.json_response({'data': dict(data, rateLimit={'cost': 1, 'remaining': 4000, 'resetAt': '2099-01-01T00:00:00Z'})})
+
+    return graphql
+
+async def check_pipelining():
+    """The next page is fetched while the caller works on the current one"""
+    async def fetch_page(cursor):
+        await asyncio.sleep(0.05)
+        page = int(cursor or 0)
+        return {'pageInfo': {'hasNextPage': page < 9, 'endCursor': str(page + 1)}, 'nodes': [page]}
+
+    started = time.perf_counter()
+    pages = []
+    async for page in iter_pages(fetch_page):
+        await asyncio.sleep(0.05)  # Aggregation work
+        pages.extend(page['nodes'])
+    elapsed = time.perf_counter() - started
+    assert pages == list(range(10)), f"Pages out of order: {pages}"
+    assert elapsed < 0.85, f"Pages not pipelined: {elapsed:.2f}s for 10 pages (1.0s sequential)"
+    return elapsed
+
+async def test_pagination():
+    """
+    Fetch stars and languages of an account with more than 1,000 repositories.
+    """
+    pipelined = await check_pipelining()
+
+    requests = []
+    pages = -(-REPOSITORIES // 100)
+    async with fake_github(fake_graphql(requests)):
+        # Stars: the first page comes with the basic query, the rest is paginated
+        user_data = await GitHubAccountStatsAPI().fetch_account_stats('octocat', {'stars'})
+        stars = calculate_basic_stats(user_data)['stars']
+        assert stars == sum(i % 7 for i in range(REPOSITORIES)), f"Stars of later pages missing: {stars}"
+        assert requests == ['userBasicInfo'] + ['userRepositoryStars'] * (pages - 1), requests
+        assert 'repositories' not in user_data, "Repository pages kept in the account data"
+
+        # Languages: totals over every page, cached after the first render
+        requests.clear()
+        user_cache.clear()
+        languages = await get_top_languages_graphql('octocat', languages_count=3)
+        expected_requests = ['userRepositories'] * pages + [('repositoryLanguages', 100)] * (pages - 1) + [('repositoryLanguages', 50)]
+        assert sorted(map(str, requests)) == sorted(map(str, expected_requests)), requests
+        expected = {name: sum(repository(i, 3)['languages']['edges'][position]['size']
+                              for i in range(REPOSITORIES) if i % 3 >= position)
+                    for position, (name, _) in enumerate(LANGUAGES)}
+        total = sum(expected.values())
+        assert [(name, round(percentage, 6)) for name, percentage, _ in languages] == \
+            [(name, round(size / total * 100, 6)) for name, size in sorted(expected.items(), key=lambda item: -item[1])], \
+            f"Language totals don't cover every page: {languages}"
+
+        requests.clear()
+        await get_top_languages_graphql('octocat', languages_count=3)
+        assert requests == [], f"Cached totals refetched: {requests}"
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"pagination_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump({'repositories': REPOSITORIES, 'pages': pages, 'pipelined_seconds': pipelined}, f, indent=2)
+    print(f"✅ Pagination checks passed: {REPOSITORIES} repositories in {pages} pages, pipelined in {pipelined:.2f}s")
+
+if __name__ == "__main__":
+    asyncio.run(test_pagination())
@@ -0,0 +1,207 @@
+"""
+Controlled test for the GraphQL query cost planner.
+
+- Serves GraphQL from a local stand-in for api.github.com (no GitHub API calls)
+- Checks long all-time histories are split into parallel queries and merged into the same totals
+- Checks short histories and cheap stats are sent as a single aliased query
+- Checks the plan follows the estimated cost, and the estimate is logged next to the cost GitHub reports
+- Checks the streak reads the shared contribution calendar instead of an alias of its own
+- Checks queries only select the fields of the requested stats, and their text is built once per shape
+- Checks every language edge is fetched, so a language small in each repository still ranks by its total
+- Writes the query plans to /tests/results
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from aiohttp import web
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import GraphQLHandler, fake_github
+from api.utils import account_general_generator
+from api.utils.account_general_generator import GitHubAccountStatsAPI, estimate_query_cost, plan_alltime_queries
+from api.utils.query_builder import build_query
+from api.utils.top_languages_generator import MAX_LANGUAGE_EDGES, get_top_languages_graphql
+from api.utils.user_cache import user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+ALIAS_PATTERN = re.compile(r'(\w+): contributionsCollection')
+
+def fake_graphql(created_at: str, queries: list) -> GraphQLHandler:
+    """GraphQL endpoint answering the account stats queries, one point per query"""
+    calendar = {'totalContributions': 2, 'weeks': [{'contributionDays': [
+        {'contributionCount': 1, 'date': '2020-01-01'}, {'contributionCount': 1, 'date': '2020-01-02'},
+    ]}]}
+
+    async def graphql(request: web.Request) -> web.Response:
+        payload = await request.json()
+        query = payload['query']
+        aliases = ALIAS_PATTERN.findall(query)
+        queries.append((query, payload['variables']))
+        if 'userContributions' in query:
+            user = {'contributionsCollection': {'contributionCalendar': calendar}}
+        elif 'userBasicInfo' in query:
+            user = {'login': 'octocat', 'name': 'Octocat', 'avatarUrl': '', 'createdAt': created_at}
+            connections = {
+                'repositories': {'totalCount': 1, 'pageInfo': {'hasNextPage': False, 'endCursor': None},
+                                 'nodes': [{'stargazerCount': 5}]},
+                'repositoriesContributedTo': {'totalCount': 2},
+                'pullRequests': {'totalCount': 3}, 'issues': {'totalCount': 4},
+            }
+            user.update({field: value for field, value in connections.items() if f'{field}(' in query})
+        else:
+            user = {}
+            for alias in aliases:
+                if alias.startswith('year'):
+                    user[alias] = {'totalCommitContributions': int(alias[4:8]) - 2000, 'totalPullRequestReviewContributions': 1}
+                else:
+                    user[alias] = {'totalCommitContributions': 7}
+        await asyncio.sleep(0.005)
+        return web.json_response({'data': {
+            'rateLimit': {'cost': 1, 'remaining': 4000, 'resetAt': '2099-01-01T00:00:00Z'},
+            'user': user,
+        }})
+
+    return graphql
+
+def fake_languages_graphql(queries: list) -> GraphQLHandler:
+    """GraphQL endpoint listing 20 repositories with five languages of their own each, and Shell sixth in every one"""
+    def edges(index: int, count: int) -> list:
+        sizes = [(f'Lang{index}x{position}', 1000 - position * 100) for position in range(5)] + [('Shell', 500)]
+        return [{'size': size, 'node': {'name': name, 'color': None}} for name, size in sizes[:count]]
+
+    async def graphql(request: web.Request) -> web.Response:
+        payload = await request.json()
+        query = payload['query']
+        queries.append(query)
+        if 'nodes(ids:' in query:
+            count = int(re.search(r'languages\(first: (\d+)', query).group(1))
+            data = {'nodes': [{'id': node_id, 'languages': {'edges': edges(int(node_id[1:]), count)}}
+                              for node_id in payload['variables']['ids']]}
+        else:
+            data = {'user': {'repositories': {
+                'pageInfo': {'hasNextPage': False, 'endCursor': None},
+                'nodes': [{'id': f'R{i}', 'name': f'repo-{i}', 'pushedAt': '2024-01-01T00:00:00Z'} for i in range(20)],
+            }}}
+        return web.json_response({'data': dict(data, rateLimit={'cost': 1, 'remaining': 4000, 'resetAt': '2099-01-01T00:00:00Z'})})
+
+    return graphql
+
+async def fetch_with_plan(created_at: str, needed_stats: set):
+    """Fetch account stats from the fake endpoint; returns the data, the (query, variables) sent, the cost
+    log line and the contribution calendar left cached for the contributions graph"""
+    queries = []
+    log = io.StringIO()
+    async with fake_github(fake_graphql(created_at, queries)):
+        with contextlib.redirect_stdout(log):
+            user_data = await GitHubAccountStatsAPI().fetch_account_stats('octocat', needed_stats)
+        calendar = user_cache.get('octocat', ('contributions', 'octocat'))
+    return user_data, queries, log.getvalue().strip(), calendar
+
+async def test_query_planner():
+    """
+    Plan and send the all-time queries for short and long account histories.
+    """
+    # A query costs a point plus a point per year scanned
+    assert estimate_query_cost(['commits_total'] * 3 + ['commits_6_months']) == 4.5
+    assert estimate_query_cost([]) == 1
+
+    # Within the budget: one query, the cheapest plan
+    parts = [('code_reviews', 'a'), ('commits_current_year', 'b'), ('commits_total', 'c'),
+             ('commits_total', 'd'), ('commits_6_months', 'e')]
+    assert plan_alltime_queries(parts, max_cost=6) == [['a', 'b', 'c', 'd', 'e']]
+    # Over it: the fewest queries within the budget, balanced by cost
+    plan = plan_alltime_queries(parts, max_cost=4)
+    assert len(plan) == 2 and sorted(alias for aliases in plan for alias in aliases) == ['a', 'b', 'c', 'd', 'e'], plan
+    stat_of = {alias: stat for stat, alias in parts}
+    assert sorted(estimate_query_cost([stat_of[alias] for alias in aliases]) for aliases in plan) == [3, 3.5], plan
+    assert plan_alltime_queries(parts, max_cost=2) == [[alias] for alias in 'abcde']
+    assert plan_alltime_queries([]) == []
+
+    current_year = datetime.now().year
+    original = account_general_generator.QUERY_MAX_COST, account_general_generator.QUERY_COST_LOG
+    account_general_generator.QUERY_MAX_COST, account_general_generator.QUERY_COST_LOG = 7, True
+    try:
+        # Long history: one alias per year, split into parallel chunks of at most 6 years
+        needed = {'commits_total', 'code_reviews', 'streak', 'commits_current_year'}
+        user_data, sent, log, calendar = await fetch_with_plan('2008-05-01T00:00:00Z', needed)
+        queries = [ALIAS_PATTERN.findall(query) for query, _ in sent if 'userAllTimeData' in query]
+        years = range(2008, current_year + 1)
+        aliases_count = len(years) + 1
+        assert len(queries) == -(-aliases_count // 6), f"Unexpected number of queries: {queries}"
+        assert all(len(aliases) <= 6 for aliases in queries)
+        assert max(map(len, queries)) - min(map(len, queries)) <= 1, f"Unbalanced queries: {queries}"
+        assert sorted(alias for aliases in queries for alias in aliases) == sorted(
+            [f'year{year}Data' for year in years] + ['currentYearCommits'])
+        assert user_data['totalCommits'] == sum(year - 2000 for year in years)
+        assert user_data['totalCodeReviews'] == len(years)
+        assert user_data['currentYearCommits'] == 7 and user_data['currentStreak'] >= 0
+        assert len(sent) == len(queries) + 2, "Queries sent besides the basic query, the all-time chunks and the calendar"
+        # The fake endpoint charges a point per query, like GitHub
+        assert log == f"All-time stats cost for octocat: predicted {len(queries) + aliases_count}, " \
+                      f"reported {len(queries)} ({len(queries)} queries)", log
+        long_plan = queries
+
+        # The streak's calendar is the one the contributions graph reads, fetched once
+        assert sum('userContributions' in query for query, _ in sent) == 1, "Calendar not fetched once"
+        assert calendar is not None, "Calendar not cached for the contributions graph"
+
+        # Short history: everything fits in a single aliased query
+        user_data, sent, log, _ = await fetch_with_plan(f'{current_year - 2}-05-01T00:00:00Z', needed | {'commits_6_months'})
+        queries = [ALIAS_PATTERN.findall(query) for query, _ in sent if 'userAllTimeData' in query]
+        assert len(queries) == 1 and len(queries[0]) == 5, f"Short history split: {queries}"
+        assert user_data['totalCommits'] == sum(year - 2000 for year in range(current_year - 2, current_year + 1))
+        assert len(sent) == 3, f"Unexpected queries: {[query for query, _ in sent]}"
+        assert 'predicted 5.5, reported 1 (1 queries)' in log, log
+
+        # Only the variables a query uses are declared and sent
+        for query, variables in sent:
+            assert set(variables) == set(re.findall(r'\$(\w+):', query)), f"Variables don't match the query: {variables}"
+
+        # Basic stats only: no second stage, and only the connections of the requested stats
+        user_data, sent, log, _ = await fetch_with_plan('2008-05-01T00:00:00Z', {'stars', 'issues'})
+        assert len(sent) == 1 and log == '', f"Unexpected queries: {[query for query, _ in sent]}"
+        basic_query = sent[0][0]
+        assert 'repositories(' in basic_query and 'issues(' in basic_query
+        for unused in ('pullRequests', 'repositoriesContributedTo', 'followers', 'following', 'forkCount', 'isPrivate', 'primaryLanguage'):
+            assert unused not in basic_query, f"Unused field {unused} selected"
+        stats = account_general_generator.calculate_basic_stats(user_data)
+        assert stats['stars'] == 5 and stats['issues'] == 4 and 'external_contributions' not in stats
+
+        # The same shape reuses the cached query text
+        misses = build_query.cache_info().misses
+        await fetch_with_plan('2008-05-01T00:00:00Z', {'stars', 'issues'})
+        assert build_query.cache_info().misses == misses, "Query text rebuilt for a known shape"
+
+    finally:
+        account_general_generator.QUERY_MAX_COST, account_general_generator.QUERY_COST_LOG = original
+
+    # Every language edge is fetched, whatever the card shows: a language small in each
+    # repository can still lead the totals
+    language_queries = []
+    async with fake_github(fake_languages_graphql(language_queries)):
+        languages = await get_top_languages_graphql('octocat', languages_count=3)
+    assert [name for name, _, _ in languages][:1] == ['Shell'], f"Language spread over repositories missed: {languages}"
+    assert all(f'languages(first: {MAX_LANGUAGE_EDGES}' in query for query in language_queries if 'nodes(ids:' in query)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"query_planner_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump({'long_history_plan': long_plan}, f, indent=2)
+    print(f"✅ Query planner checks passed: {len(long_plan)} parallel queries for {current_year - 2007} years")
+
+if __name__ == "__main__":
+    asyncio.run(test_query_planner())
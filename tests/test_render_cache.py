@@ -0,0 +1,167 @@
+"""
+Controlled test for the rendered SVG output cache.
+
+- Checks fingerprints are stable for equivalent data/parameters
+- Checks byte-bounded LRU eviction
+- Checks streamed (chunked) misses produce the same bytes and are cached afterwards
+- Checks a card rendered without the avatar it failed to fetch isn't cached
+- Runs fully offline (no GitHub API calls needed)
+"""
+
+import asyncio
+import gzip
+import io
+import sys
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import use_sample_data
+from api.utils import account_general_generator, render_cache, svg_output
+from api.utils.render_cache import PendingSVG, RenderCache, fingerprint
+from api.utils.responses import ChunkedWriter, response_started, send_svg
+
+class StreamingHandler:
+    """Just enough of a BaseHTTPRequestHandler for send_svg, writing the raw response to wfile"""
+    request_version = 'HTTP/1.1'
+    headers = {'Accept-Encoding': 'identity'}
+
+    def __init__(self):
+        self.wfile = io.BytesIO()
+        self.close_connection = False
+
+    def send_response(self, status):
+        self.wfile.write(b'HTTP/1.1 %d\r\n' % status)
+
+    def send_header(self, name, value):
+        self.wfile.write(f'{name}: {value}\r\n'.encode())
+
+    def end_headers(self):
+        self.wfile.write(b'\r\n')
+
+async def check_avatar_fallback():
+    """A card showing the initials because its avatar failed to download is rendered again next time"""
+    avatar = {'available': False, 'fetches': 0}
+
+    async def fetch_avatar_as_data_uri(self, avatar_url):
+        avatar['fetches'] += 1
+        return 'data:image/png;base64,QVZBVEFS' if avatar['available'] else None
+
+    api = account_general_generator.GitHubAccountStatsAPI
+    with use_sample_data():
+        fetch_account_stats = api.fetch_account_stats
+
+        async def fetch_with_avatar(self, username, *args, **kwargs):
+            return dict(await fetch_account_stats(self, username, *args, **kwargs), avatarUrl='https://avatars.example/u/1')
+
+        api.fetch_account_stats = fetch_with_avatar
+        original_avatar = api.fetch_avatar_as_data_uri
+        api.fetch_avatar_as_data_uri = fetch_avatar_as_data_uri
+        try:
+            fallback = await account_general_generator.render_account_general_svg('octocat', icon='user')
+            assert fallback.key is None and 'QVZBVEFS' not in fallback.text, "Initials fallback was cached"
+            avatar['available'] = True
+            rendered = await account_general_generator.render_account_general_svg('octocat', icon='user')
+            assert 'QVZBVEFS' in rendered.text and avatar['fetches'] == 2, avatar
+            again = await account_general_generator.render_account_general_svg('octocat', icon='user')
+            assert again is rendered and avatar['fetches'] == 2, "Card with its avatar not served from the cache"
+        finally:
+            api.fetch_avatar_as_data_uri = original_avatar
+
+async def test_render_cache():
+    """
+    Exercise fingerprinting and LRU eviction of the render cache.
+    """
+    # Parameter order must not matter, parameter values must
+    key_a = fingerprint('top-languages', [('Python', 60.0, '#3572A5')], {'theme': 'dark', 'width': 400})
+    key_b = fingerprint('top-languages', [('Python', 60.0, '#3572A5')], {'width': 400, 'theme': 'dark'})
+    key_c = fingerprint('top-languages', [('Python', 60.0, '#3572A5')], {'width': 400, 'theme': 'light'})
+    assert key_a == key_b, "Fingerprint depends on parameter order"
+    assert key_a != key_c, "Fingerprint ignores parameter values"
+
+    # The key is the strong ETag, so it changes with anything that changes the rendered bytes
+    original = render_cache.RENDER_VERSION, svg_output.SVG_PRECISION, svg_output.SVG_COMPACT
+    try:
+        for setting in ((render_cache, 'RENDER_VERSION', original[0] + 1), (svg_output, 'SVG_PRECISION', 1),
+                        (svg_output, 'SVG_COMPACT', False)):
+            render_cache.RENDER_VERSION, svg_output.SVG_PRECISION, svg_output.SVG_COMPACT = original
+            setattr(*setting)
+            changed = fingerprint('top-languages', [('Python', 60.0, '#3572A5')], {'theme': 'dark', 'width': 400})
+            assert changed != key_a, f"Fingerprint ignores {setting[1]}"
+    finally:
+        render_cache.RENDER_VERSION, svg_output.SVG_PRECISION, svg_output.SVG_COMPACT = original
+
+    cache = RenderCache(max_bytes=250)
+    renders = []
+
+    def render(label):
+        renders.append(label)
+        return f'<svg>{label * 100}</svg>'
+
+    first = cache.get_or_render('a', lambda: render('a'))
+    again = cache.get_or_render('a', lambda: render('a'))
+    assert first is again and renders == ['a'], "Cached entry was re-rendered"
+    assert first.body == first.text.encode('utf-8')
+
+    # Two more ~111 byte entries exceed the 250 byte budget, evicting the least recently used one
+    cache.get_or_render('b', lambda: render('b'))
+    cache.get('a')
+    cache.get_or_render('c', lambda: render('c'))
+    stats = cache.stats()
+    assert stats['bytes'] <= 250, f"Cache exceeded its byte budget: {stats}"
+    assert cache.get('b') is None, "Least recently used entry was not evicted"
+    assert cache.get('a') is not None, "Recently used entry was evicted"
+
+    # A streamed miss yields the same bytes as an eager render and stores them (plus the gzip variant)
+    cache = RenderCache()
+    fragments = ['<svg width="10">', '\n  <rect x="1.23456"/>', '\n</svg>']
+    expected = cache.put('eager', ''.join(fragments)).body
+    pending = cache.get_or_stream('streamed', lambda: iter(fragments))
+    assert isinstance(pending, PendingSVG)
+    assert gzip.decompress(b''.join(pending.stream('gzip'))) == expected
+    cached = cache.get('streamed')
+    assert cached is not None and cached.body == expected and 'gzip' in cached.variants
+
+    # A stream too large to keep, or stopped partway, is rendered again when the whole body is needed
+    small = RenderCache(max_bytes=50)
+    big_fragments = ['<svg>', '<text>' + 'x' * 100 + '</text>', '</svg>']
+    pending = small.get_or_stream('big', lambda: iter(big_fragments))
+    streamed = b''.join(pending.stream())
+    assert small.get('big') is None and pending.body == streamed and len(streamed) > 100, pending.body
+    partial = small.get_or_stream('partial', lambda: iter(fragments))
+    stream = partial.stream()
+    next(stream)
+    stream.close()
+    assert small.get('partial') is None, "Partially streamed document was cached"
+    assert partial.body == expected and small.get('partial').body == expected
+
+    # Chunked framing: hex length, CRLF, data, CRLF and a terminating zero-length chunk
+    out = io.BytesIO()
+    writer = ChunkedWriter(out, chunk_size=4)
+    writer.write(b'<svg>')
+    writer.write(b'</svg>')
+    writer.close()
+    assert out.getvalue() == b'5\r\n<svg>\r\n6\r\n</svg>\r\n0\r\n\r\n', out.getvalue()
+
+    # A stream failing after the headers went out ends the response there, without a second one
+    def failing_fragments():
+        yield '<svg>' + ' ' * 20000
+        raise RuntimeError("renderer crashed")
+
+    handler = StreamingHandler()
+    send_svg(handler, cache.get_or_stream('failing', failing_fragments), 'top-languages')
+    sent = handler.wfile.getvalue()
+    assert sent.count(b'HTTP/1.1 ') == 1 and sent.startswith(b'HTTP/1.1 200'), sent[:200]
+    assert not sent.endswith(b'0\r\n\r\n'), "Failed stream was terminated as if complete"
+    assert response_started(handler) and handler.close_connection
+    assert cache.get('failing') is None, "Incomplete document was cached"
+
+    await check_avatar_fallback()
+    print(f"✅ Render cache checks passed: {cache.stats()}")
+
+if __name__ == "__main__":
+    asyncio.run(test_render_cache())
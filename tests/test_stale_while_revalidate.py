@@ -0,0 +1,100 @@
+"""
+Controlled test for stale-while-revalidate serving of cached GitHub data.
+
+- Fetches from a slow stand-in for a GitHub fetch (no GitHub API calls)
+- Checks recently expired data is served immediately and refreshed once in the background
+- Checks data past the max staleness is fetched again before it is served
+- Checks a failing refresh keeps serving the stale data
+- Checks TTLs are jittered within their bounds
+- Writes the cache statistics to /tests/results
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from api.utils.background import drain_background_tasks
+from api.utils.user_cache import UserDataCache, cached_fetch, user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+FETCH_SECONDS = 0.1
+
+async def test_stale_while_revalidate():
+    """
+    Serve one dataset across its expiry.
+    """
+    # Entries expire within ttl +- jitter, not all at once
+    jittered = UserDataCache(ttl=100, jitter=0.1)
+    for i in range(200):
+        jittered.put('octocat', ('data', i), i)
+    expiries = [entry[0] - time.monotonic() for entry in jittered._users['octocat'].values()]
+    assert all(89 < expires <= 110 for expires in expiries), (min(expiries), max(expiries))
+    assert max(expiries) - min(expiries) > 10, "TTLs not jittered"
+
+    versions = []
+    fail = [False]
+
+    async def fetch():
+        await asyncio.sleep(FETCH_SECONDS)
+        if fail[0]:
+            raise Exception("GitHub unavailable")
+        versions.append(len(versions) + 1)
+        return {'version': versions[-1]}
+
+    key = ('swr', 'octocat')
+    user_cache.clear()
+    original = user_cache.ttl, user_cache.jitter, user_cache.max_stale
+    user_cache.ttl, user_cache.jitter, user_cache.max_stale = 0.05, 0, 60
+    try:
+        assert await cached_fetch('octocat', key, fetch) == {'version': 1}
+        await asyncio.sleep(0.06)
+
+        # Expired: the stale data is served at once, to every request, while one refresh runs
+        started = time.perf_counter()
+        served = await asyncio.gather(*(cached_fetch('octocat', key, fetch) for _ in range(5)))
+        assert time.perf_counter() - started < FETCH_SECONDS / 2, "Stale data waited for the refresh"
+        assert served == [{'version': 1}] * 5
+        await drain_background_tasks()
+        assert versions == [1, 2], f"Refreshed {len(versions) - 1} times"
+        assert user_cache.get('octocat', key) == {'version': 2}, "Refreshed data not cached"
+
+        # A failing refresh leaves the stale data in place
+        await asyncio.sleep(0.06)
+        fail[0] = True
+        assert await cached_fetch('octocat', key, fetch) == {'version': 2}
+        await drain_background_tasks()
+        assert await cached_fetch('octocat', key, fetch) == {'version': 2}
+        await drain_background_tasks()
+        fail[0] = False
+
+        # Past the max staleness, the request waits for fresh data
+        user_cache.max_stale = 0.01
+        await asyncio.sleep(0.06)
+        started = time.perf_counter()
+        assert await cached_fetch('octocat', key, fetch) == {'version': 3}
+        assert time.perf_counter() - started >= FETCH_SECONDS, "Data past the max staleness served"
+        stats = user_cache.stats()
+    finally:
+        user_cache.ttl, user_cache.jitter, user_cache.max_stale = original
+        user_cache.clear()
+    assert stats['stale_hits'] >= 7, stats
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"stale_while_revalidate_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+    print(f"✅ Stale-while-revalidate checks passed: {stats['stale_hits']} stale hits, {len(versions)} fetches")
+
+if __name__ == "__main__":
+    asyncio.run(test_stale_while_revalidate())
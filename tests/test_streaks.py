@@ -0,0 +1,126 @@
+"""
+Controlled test for the contribution streak engine.
+
+- Checks current and longest streaks against a day-by-day reference on random calendars
+- Serves year calendars from a local stand-in for api.github.com (no GitHub API calls)
+- Checks a streak longer than the calendar continues through the years before it, fetched only then
+- Checks completed years are fetched once and served from the cache afterwards
+- Writes the streaks and requests to /tests/results
+"""
+
+import asyncio
+import json
+import random
+import re
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import GraphQLHandler, fake_github
+from api.utils.contribution_calendar import calculate_streaks, count_streaks
+from api.utils.user_cache import user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+def reference_streaks(counts: list, today: int) -> tuple:
+    """Streaks counted backwards from today and over every starting day"""
+    current = 0
+    for index in range(today, -1, -1):
+        if index < len(counts) and counts[index]:
+            current += 1
+        elif index != today:
+            break
+    longest = 0
+    for start in range(min(today + 1, len(counts))):
+        length = 0
+        while start + length <= min(today, len(counts) - 1) and counts[start + length]:
+            length += 1
+        longest = max(longest, length)
+    return current, longest
+
+def calendar(start: date, counts: list) -> dict:
+    """GraphQL contributionCalendar of consecutive days from start"""
+    days = [{'contributionCount': count, 'date': (start + timedelta(days=i)).isoformat()} for i, count in enumerate(counts)]
+    return {'weeks': [{'contributionDays': days[i:i + 7]} for i in range(0, len(days), 7)]}
+
+def fake_graphql(contributions: dict, requests: list) -> GraphQLHandler:
+    """GraphQL endpoint answering year calendars from a date -> count mapping"""
+    async def graphql(request: web.Request) -> web.Response:
+        query = (await request.json())['query']
+        year = int(re.search(r'from: "(\d{4})', query).group(1))
+        requests.append(year)
+        start, end = date(year, 1, 1), min(date(year, 12, 31), datetime.now(timezone.utc).date())
+        counts = [contributions.get(start + timedelta(days=i), 0) for i in range((end - start).days + 1)]
+        return web.json_response({'data': {
+            'rateLimit': {'cost': 1, 'remaining': 4000, 'resetAt': '2099-01-01T00:00:00Z'},
+            'user': {'contributionsCollection': {'contributionCalendar': calendar(start, counts)}},
+        }})
+
+    return graphql
+
+async def test_streaks():
+    """
+    Count streaks within a calendar and across the years before it.
+    """
+    rnd = random.Random(7)
+    for _ in range(2000):
+        counts = [rnd.choice([0, 1, 1, 2, 5]) for _ in range(rnd.randint(0, 40))]
+        today = rnd.randint(-2, len(counts) + 1)
+        assert count_streaks(counts, today) == reference_streaks(counts, today), (counts, today)
+
+    today = datetime.now(timezone.utc).date()
+    window_start = today - timedelta(days=365)
+
+    # Contributions every day for the last 800 days, except today (not counted against the streak)
+    contributions = {today - timedelta(days=i): 1 for i in range(1, 801)}
+    window = [contributions.get(window_start + timedelta(days=i), 0) for i in range(366)]
+
+    requests = []
+    async with fake_github(fake_graphql(contributions, requests)):
+        days = {'start': window_start.isoformat(), 'counts': window}
+
+        # A streak that starts within the calendar needs no other year
+        short = dict(days, counts=[0] * 100 + window[100:])
+        assert await calculate_streaks('octocat', short) == (365 - 100, 365 - 100)
+        assert requests == [], f"Years fetched for a streak within the calendar: {requests}"
+
+        # The streak runs past the calendar: the years before it are fetched until its first day
+        streak = await calculate_streaks('octocat', days, first_year=2000)
+        assert streak == (800, 800), f"Unexpected streak: {streak}"
+        year_before = (window_start - timedelta(days=1)).year
+        assert requests == list(range(year_before, (today - timedelta(days=800)).year - 1, -1)), requests
+        fetched = list(requests)
+
+        # Completed years are served from the cache, even after their data expired
+        requests.clear()
+        user_cache.ttl, ttl = 0.001, user_cache.ttl
+        await asyncio.sleep(0.01)
+        try:
+            again = await calculate_streaks('octocat', days, first_year=2000)
+        finally:
+            user_cache.ttl = ttl
+        assert again == streak and all(year == today.year for year in requests), f"Completed years refetched: {requests}"
+
+        # No year before the account's creation is fetched
+        requests.clear()
+        user_cache.clear()
+        await calculate_streaks('octocat', days, first_year=window_start.year)
+        assert requests == [year for year in [year_before] if year >= window_start.year], requests
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"streaks_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump({'streak': streak, 'years_fetched': fetched}, f, indent=2)
+    print(f"✅ Streak checks passed: {streak[0]}-day streak over {len(fetched)} extra years")
+
+if __name__ == "__main__":
+    asyncio.run(test_streaks())
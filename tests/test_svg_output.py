@@ -0,0 +1,62 @@
+"""
+Controlled test for the SVG output stage.
+
+- Checks comments and insignificant whitespace are dropped
+- Checks rounded path data keeps every number, at any precision (numbers written as "1.229-.39" or "17.125.9")
+- Runs fully offline (no GitHub API calls needed)
+- Writes the compacted path data to /tests/results
+"""
+
+import asyncio
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from api.utils.svg_output import compact_svg
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+# Path data as written by icon sets: numbers separated only by a sign or a leading point
+ICON_PATH = "M20 2c0 7.969 5.167 14.729 12.329 17.125.9.165 1.229-.39 1.229-.867"
+
+# Numbers of SVG path data, as a path parser reads them
+PATH_NUMBER_PATTERN = re.compile(r'-?(?:\d+\.?\d*|\.\d+)')
+
+def path_numbers(d: str) -> list:
+    return [float(number) for number in PATH_NUMBER_PATTERN.findall(d)]
+
+async def test_svg_output():
+    """
+    Compact an icon path at every precision and read its numbers back.
+    """
+    svg = f'<svg  width="10.0" >\n  <!-- icon -->\n  <path d="{ICON_PATH}"  />\n</svg>'
+    assert compact_svg(svg, precision=3) == f'<svg width="10"><path d="{ICON_PATH}"/></svg>', compact_svg(svg, precision=3)
+
+    original = path_numbers(ICON_PATH)
+    compacted = {}
+    for precision in (0, 1, 2, 3):
+        d = re.search(r'd="([^"]*)"', compact_svg(svg, precision)).group(1)
+        numbers = path_numbers(d)
+        assert len(numbers) == len(original), f"Numbers run together at precision {precision}: {d}"
+        assert all(abs(after - before) <= 0.5 * 10 ** -precision + 1e-9 for before, after in zip(original, numbers)), \
+            f"Numbers changed beyond rounding at precision {precision}: {d}"
+        compacted[precision] = d
+    assert compacted[0] == "M20 2c0 8 5 15 12 17 .9 0 1 0 1-1", compacted[0]
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"svg_output_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump(compacted, f, indent=2)
+    print(f"✅ SVG output checks passed: {ICON_PATH} -> {compacted[0]} at precision 0")
+
+if __name__ == "__main__":
+    asyncio.run(test_svg_output())
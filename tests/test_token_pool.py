@@ -0,0 +1,102 @@
+"""
+Controlled test for the GitHub token pool.
+
+- Serves GraphQL from a local stand-in for api.github.com with a point budget per token (no GitHub API calls)
+- Checks requests go to the token with the most headroom and rate-limited tokens are retried on others
+- Checks exhausted tokens raise RateLimitExceeded, and cached data is served instead
+- Writes the per-token metrics to /tests/results
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+# Add the project root and api/utils to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "api"))
+sys.path.insert(0, str(project_root / "api" / "utils"))
+
+from tests.sample_data import GraphQLHandler, fake_github
+from api.utils.github_client import RateLimitExceeded, graphql_request
+from api.utils.user_cache import cached_fetch, user_cache
+
+# Absolute path to results directory
+RESULTS_DIR = project_root / "tests" / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+QUERY = "query { rateLimit { cost remaining resetAt } viewer { login } }"
+
+def fake_graphql(budgets: dict, cost: int = 1) -> GraphQLHandler:
+    """GraphQL endpoint answering with the rateLimit of the request's token"""
+    reset_at = datetime.fromtimestamp(time.time() + 3600, timezone.utc)
+
+    async def graphql(request: web.Request) -> web.Response:
+        token = request.headers['Authorization'].split()[-1]
+        headers = {'X-RateLimit-Limit': '5000', 'X-RateLimit-Reset': str(int(reset_at.timestamp()))}
+        if budgets[token] < cost:
+            headers['X-RateLimit-Remaining'] = '0'
+            return web.json_response({'message': 'API rate limit exceeded'}, status=403, headers=headers)
+        budgets[token] -= cost
+        await asyncio.sleep(0.005)
+        headers['X-RateLimit-Remaining'] = str(budgets[token])
+        return web.json_response({'data': {
+            'rateLimit': {'cost': cost, 'remaining': budgets[token], 'resetAt': reset_at.isoformat().replace('+00:00', 'Z')},
+            'viewer': {'login': token},
+        }}, headers=headers)
+
+    return graphql
+
+async def test_token_pool():
+    """
+    Spend the budgets of three tokens through graphql_request.
+    """
+    budgets = {'token-a': 40, 'token-b': 25, 'token-c': 0}
+    async with fake_github(fake_graphql(budgets), tokens=budgets) as pool:
+        # The exhausted token is rejected once, then everything goes to the tokens with points left
+        results = await asyncio.gather(*(graphql_request(QUERY, {}) for _ in range(60)))
+        used = [result['data']['viewer']['login'] for result in results]
+        assert 'rateLimit' not in results[0]['data'], "rateLimit should be consumed by the client"
+        assert used.count('token-c') == 0 and used.count('token-a') + used.count('token-b') == 60, \
+            f"Unexpected token distribution: a={used.count('token-a')} b={used.count('token-b')}"
+        metrics = {entry['token']: entry for entry in pool.metrics()}
+        assert metrics['...en-c']['rate_limited'] >= 1, "Exhausted token not detected"
+        assert all(entry['in_flight'] == 0 for entry in metrics.values())
+
+        # With known budgets, the remaining points are spent on the token that has them
+        while any(budgets.values()):
+            expected = max(pool.budgets, key=lambda budget: budget.remaining).token
+            result = await graphql_request(QUERY, {})
+            assert result['data']['viewer']['login'] == expected, "Request not routed to the token with the most headroom"
+        assert budgets == {'token-a': 0, 'token-b': 0, 'token-c': 0}, f"Budget left unused: {budgets}"
+
+        # Once every token is spent, requests fail fast instead of waiting an hour for the reset
+        started = time.perf_counter()
+        try:
+            await graphql_request(QUERY, {})
+        except RateLimitExceeded:
+            assert time.perf_counter() - started < 1, "Exhausted pool should not queue for a distant reset"
+        else:
+            raise AssertionError("Request succeeded with all tokens exhausted")
+
+        # Cached data (even expired) is served while the rate limit is exhausted
+        user_cache.clear()
+        user_cache.put('octocat', ('viewer', 'octocat'), {'login': 'cached'})
+        user_cache.ttl, ttl = 0.001, user_cache.ttl
+        await asyncio.sleep(0.01)
+        cached = await cached_fetch('octocat', ('viewer', 'octocat'), lambda: graphql_request(QUERY, {}))
+        user_cache.ttl = ttl
+        assert cached == {'login': 'cached'}, "Stale data not served while rate limited"
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(RESULTS_DIR / f"token_pool_{timestamp}.json", 'w', encoding='utf-8') as f:
+        json.dump(pool.metrics(), f, indent=2)
+    print(f"✅ Token pool checks passed: {[(entry['token'], entry['requests'], entry['remaining']) for entry in pool.metrics()]}")
+
+if __name__ == "__main__":
+    asyncio.run(test_token_pool())
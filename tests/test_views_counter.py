@@ -18,6 +18,7 @@ sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "api"))
 sys.path.insert(0, str(project_root / "api" / "utils"))
 
+from api.utils import views_counter_generator
 from api.utils.views_counter_generator import generate_views_counter_svg
 
 # Absolute path to results directory
@@ -43,6 +44,17 @@ async def test_views_counter():
     with open(filepath_static, 'w', encoding='utf-8') as f:
         f.write(svg_static)
 
+    # The view is counted for the requested user (multi-user mode), GITHUB_USERNAME's counter otherwise
+    counted = []
+    count_view = views_counter_generator.count_view
+    views_counter_generator.count_view = lambda user_agent, username=None: counted.append(username) or 42
+    try:
+        await generate_views_counter_svg(user_agent='github-camo', theme='dark', username='octocat')
+        await generate_views_counter_svg(user_agent='github-camo', theme='dark')
+    finally:
+        views_counter_generator.count_view = count_view
+    assert counted == ['octocat', None], counted
+
     print(f"✅ Views counter SVGs generated: {filename_animated}, {filename_static}")
 
 if __name__ == "__main__":